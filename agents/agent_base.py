@@ -21,6 +21,14 @@ class Agent(ABC):
         """
         pass
 
+    def new_game(self) -> None:
+        """Called before a new game starts; agents with per-game state reset it here."""
+        pass
+
+    def stop_pondering(self) -> None:
+        """Stop any background thinking on the opponent's time (no-op by default)."""
+        pass
+
     @abstractmethod
     def name(self) -> str:
         """Return a human-readable name for this agent."""
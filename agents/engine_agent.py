@@ -1,6 +1,8 @@
 """Engine agent: uses chess engine (alpha-beta + iterative deepening)."""
 import asyncio
-from typing import Optional, Any
+import threading
+import time
+from typing import Optional, Any, Dict, List
 from .agent_base import Agent
 
 
@@ -8,17 +10,44 @@ class EngineAgent(Agent):
     """Agent using the Xadrez_AI_Final chess engine.
     
     Calls engine.search_root() with configurable time and depth limits.
+    The search state (TT, history) is kept across moves of a game and aged
+    per search; new_game() resets it.
+
+    With ponder=True the agent keeps thinking on the opponent's time: after
+    each move it searches the position after the expected reply (second PV
+    move) on a background thread. If the opponent plays that reply the
+    search continues with a fresh time budget (ponder hit); otherwise it is
+    stopped and a normal search runs on the TT it warmed (ponder miss).
+    Front-ends call stop_pondering() when a game ends. GameManager turns
+    pondering off when both players are engines in the same process.
     """
 
-    def __init__(self, max_time_ms: int = 1000, max_depth: int = 3):
+    def __init__(self, max_time_ms: int = 1000, max_depth: int = 3, book_path: Optional[str] = None,
+                 ponder: bool = False):
         """Initialize EngineAgent.
         
         Args:
             max_time_ms: time budget in milliseconds.
             max_depth: maximum search depth.
+            book_path: optional Polyglot .bin book; book moves are played without searching.
+            ponder: search the expected reply while the opponent thinks.
         """
         self.max_time_ms = max_time_ms
         self.max_depth = max_depth
+        self.ponder = ponder
+        from engine.search.impl import SearchState
+        self.search_state = SearchState()
+        self.book = None
+        if book_path:
+            from engine.book import open_book
+            self.book = open_book(book_path)
+
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self._ponder_thread: Optional[threading.Thread] = None
+        self._ponder_controller = None
+        self._ponder_key: Optional[int] = None
+        self._ponder_result: List[Dict] = []
 
     async def get_move(self, board: Any) -> Optional[object]:
         """Use engine to decide move.
@@ -30,20 +59,36 @@ class EngineAgent(Agent):
             Best move found by engine or None if search failed.
         """
         try:
+            loop = asyncio.get_event_loop()
+            result = None
+            if self._ponder_thread is not None:
+                if getattr(board, 'zobrist_key', None) == self._ponder_key:
+                    result = await loop.run_in_executor(None, self._ponder_hit)
+                else:
+                    await loop.run_in_executor(None, self.stop_pondering)
+                    self.ponder_misses += 1
+
+            if result is None and self.book is not None:
+                book_move = self.book.choose_move(board)
+                if book_move is not None:
+                    return book_move
+
             from engine import search_root
             from core.moves.legal_movegen import generate_legal_moves
 
             def _run_search(b, t, d):
-                return search_root(b, max_time_ms=t, max_depth=d)
+                return search_root(b, max_time_ms=t, max_depth=d, state=self.search_state)
 
             bcopy = board.copy() if hasattr(board, 'copy') else board
-            # Python 3.8 compatible: use run_in_executor instead of to_thread
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, _run_search, bcopy, self.max_time_ms, self.max_depth)
+            if result is None:
+                # Python 3.8 compatible: use run_in_executor instead of to_thread
+                result = await loop.run_in_executor(None, _run_search, bcopy, self.max_time_ms, self.max_depth)
             
             if isinstance(result, dict):
                 best_move = result.get('best_move')
                 if best_move:
+                    if self.ponder:
+                        self._start_pondering(bcopy, result)
                     return best_move
                 
                 # Fallback: se engine nao retornar move, usar primeiro legal move
@@ -58,5 +103,64 @@ class EngineAgent(Agent):
         except Exception:
             return None
 
+    def _start_pondering(self, board: Any, result: Dict) -> None:
+        """Search the position after our move and the expected reply in the background."""
+        pv = result.get('pv') or []
+        if len(pv) < 2 or pv[0] != result.get('best_move'):
+            return
+        from engine import SearchLimits, iter_search
+        from engine.search.impl import SearchController
+
+        pboard = board.copy()
+        try:
+            pboard.make_move(pv[0])
+            pboard.make_move(pv[1])
+        except Exception:
+            return
+
+        # no deadline while pondering: the clock only starts at the ponder hit
+        ctrl = SearchController()
+        out: List[Dict] = []
+        limits = SearchLimits(max_time_ms=None, max_depth=self.max_depth)
+
+        def _run():
+            for item in iter_search(pboard, limits, ctrl, self.search_state):
+                out.append(item)
+
+        self._ponder_controller = ctrl
+        self._ponder_key = pboard.zobrist_key
+        self._ponder_result = out
+        self._ponder_thread = threading.Thread(target=_run, name="engine-ponder", daemon=True)
+        self._ponder_thread.start()
+
+    def _ponder_hit(self) -> Optional[Dict]:
+        """Give the running ponder search the normal budget and wait for it."""
+        thread, ctrl, out = self._ponder_thread, self._ponder_controller, self._ponder_result
+        if thread.is_alive():
+            ctrl.deadline = time.time() + self.max_time_ms / 1000.0
+            thread.join()
+        self._clear_ponder()
+        self.ponder_hits += 1
+        return out[-1] if out else None
+
+    def stop_pondering(self) -> None:
+        """Cancel a running ponder search (its TT entries are kept)."""
+        if self._ponder_thread is None:
+            return
+        self._ponder_controller.stop = True
+        self._ponder_thread.join()
+        self._clear_ponder()
+
+    def _clear_ponder(self) -> None:
+        self._ponder_thread = None
+        self._ponder_controller = None
+        self._ponder_key = None
+        self._ponder_result = []
+
+    def new_game(self) -> None:
+        """Forget TT/history from the previous game."""
+        self.stop_pondering()
+        self.search_state.reset()
+
     def name(self) -> str:
         return f"Engine (d={self.max_depth}, t={self.max_time_ms}ms)"
@@ -1,17 +1,15 @@
 """MCTS agent using a policy+value neural network (PUCT).
 
-This is a compact, self-contained implementation intended for integration
-and testing. It performs a fixed number of simulations and selects the
-most-visited root child as the chosen move.
-
-Not a highly-optimized production search, but good for experiments and
-as a stronger replacement for raw policy-only play.
+The search is training.mcts.MCTS (the one self-play uses): a fixed number
+of simulations per move, then the most-visited root child is played. The
+subtree below that move is kept and, once the opponent's reply is seen on
+the next call, the search continues from the reply's subtree, so visits
+spent on the expected line are not thrown away.
 """
 from __future__ import annotations
-from typing import Any, Optional, Dict, Tuple
-import math
-import time
+from typing import Any, Optional
 import os
+import warnings
 
 try:
     import torch
@@ -22,12 +20,17 @@ from .agent_base import Agent
 
 try:
     from training.model import make_model
-    from training.encoder import board_to_tensor, move_to_index, ACTION_SIZE
+    from training.encoder import ACTION_SIZE, check_input_layout
+    from training.mcts import MCTS
+    from training.net import make_net_predictor
+    from training.eval_cache import EvalCache
 except Exception:
     make_model = None
-    board_to_tensor = None
-    move_to_index = None
     ACTION_SIZE = None
+    check_input_layout = None
+    MCTS = None
+    make_net_predictor = None
+    EvalCache = None
 
 
 class MCTSAgent(Agent):
@@ -38,9 +41,15 @@ class MCTSAgent(Agent):
       attempt to construct an uninitialized model via `make_model`).
     - sims: number of MCTS simulations per move.
     - cpuct: exploration constant.
+    - book_path: optional Polyglot .bin book; book moves skip the search.
+    - reuse_tree: carry the searched subtree over to the next move;
+      `last_search` holds the effective simulations of the last search.
+    - eval_cache_mb: memory cap of the network evaluation cache kept for the
+      agent's lifetime (0 disables it); `eval_cache.stats()` gives hit rates.
     """
 
-    def __init__(self, model_path: Optional[str] = None, sims: int = 128, cpuct: float = 1.0, device: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, sims: int = 128, cpuct: float = 1.0, device: Optional[str] = None,
+                 book_path: Optional[str] = None, reuse_tree: bool = True, eval_cache_mb: float = 32.0):
         if device is None and torch is not None:
             device = 'cuda' if torch.cuda.is_available() else 'cpu'
         self.device = device
@@ -48,6 +57,17 @@ class MCTSAgent(Agent):
         self.cpuct = float(cpuct)
         self.model = None
         self.model_path = model_path
+        self.book = None
+        self.reuse_tree = bool(reuse_tree)
+        self.last_search = {}
+        self.eval_cache = None
+        if eval_cache_mb > 0 and EvalCache is not None:
+            self.eval_cache = EvalCache(max_bytes=int(eval_cache_mb * (1 << 20)))
+        self._search = None
+        self._after_move = None  # position after our last move, root of the kept subtree
+        if book_path:
+            from engine.book import open_book
+            self.book = open_book(book_path)
         if make_model is not None and torch is not None:
             try:
                 kwargs = {}
@@ -56,7 +76,7 @@ class MCTSAgent(Agent):
                 self.model = make_model(device=self.device, **kwargs)
                 if model_path and os.path.exists(model_path):
                     ckpt = torch.load(model_path, map_location=self.device)
-                    sd = ckpt.get('state_dict', ckpt) if isinstance(ckpt, dict) else ckpt
+                    sd = check_input_layout(ckpt, model_path)
                     try:
                         self.model.load_state_dict(sd)
                     except Exception:
@@ -66,10 +86,22 @@ class MCTSAgent(Agent):
                             pass
                 if self.model is not None:
                     self.model.eval()
+            except ValueError as exc:
+                warnings.warn(f"MCTSAgent: not loading {model_path}: {exc}")
+                self.model = None
             except Exception:
                 self.model = None
 
     async def get_move(self, board: Any) -> Optional[object]:
+        if self.book is not None:
+            try:
+                book_move = self.book.choose_move(board)
+            except Exception:
+                book_move = None
+            if book_move is not None:
+                self._after_move = None
+                return book_move
+
         # collect legal moves
         try:
             moves = list(board.generate_legal_moves())
@@ -84,169 +116,55 @@ class MCTSAgent(Agent):
             return None
 
         # if no model, fallback to first legal move
-        if self.model is None or board_to_tensor is None or move_to_index is None:
+        search = self._get_search()
+        if search is None:
             return moves[0]
 
-        # node structure keyed by zobrist (or id) -> node dict
-        class Node(dict):
-            pass
-
-        def make_node(prior: float = 0.0) -> Node:
-            return Node(N=0, W=0.0, P=float(prior), children={}, expanded=False)
-
-        # root node
-        root = make_node(0.0)
+        # re-root at the opponent's reply to our last move, when it was searched
+        prev, self._after_move = self._after_move, None
+        if prev is not None:
+            search.advance_to(prev, board)
+        else:
+            search.reset()
 
-        # helper: evaluate network on a board and return priors dict(move->p) and value (float)
-        def evaluate_network(b):
-            try:
-                import numpy as np
-                arr = board_to_tensor(b)
-                t = torch.from_numpy(arr).unsqueeze(0).to(self.device)
-                with torch.no_grad():
-                    pi, v = self.model(t)
-                logits = pi.squeeze(0).cpu().numpy()
-                val = float(v.squeeze().cpu().numpy())
-                return logits, val
-            except Exception:
-                return None, 0.0
+        try:
+            with torch.no_grad():
+                search.run(board)
+        except Exception:
+            search.reset()
+            return moves[0]
+        self.last_search = dict(search.last_run)
 
-        # expand root with network priors
-        logits, v = evaluate_network(board)
-        if logits is None:
+        # choose move with highest visit count
+        actions, edge_moves, visits = search.root_children()
+        if len(actions) == 0:
+            return moves[0]
+        k = int(visits.argmax())
+        best_mv = edge_moves[k]
+        if best_mv is None:
+            search.reset()
             return moves[0]
 
-        # map legal moves to priors using logits softmax over legal indices
-        idxs = []
-        for m in moves:
+        if self.reuse_tree:
             try:
-                idxs.append(move_to_index(m))
+                after = board.copy()
+                after.make_move(best_mv)
             except Exception:
-                idxs.append(None)
-
-        legal_logits = []
-        for idx in idxs:
-            if idx is None:
-                legal_logits.append(-1e9)
+                search.reset()
             else:
-                try:
-                    legal_logits.append(float(logits[idx]))
-                except Exception:
-                    legal_logits.append(-1e9)
-
-        # softmax
-        maxl = max(legal_logits)
-        exps = [math.exp(x - maxl) for x in legal_logits]
-        s = sum(exps)
-        if s <= 0:
-            priors = [1.0 / len(moves)] * len(moves)
-        else:
-            priors = [e / s for e in exps]
-
-        # attach children to root
-        total_N = 0
-        for m, p in zip(moves, priors):
-            root['children'][m] = make_node(p)
-
-        # run simulations
-        for sim in range(self.sims):
-            b_sim = board.copy() if hasattr(board, 'copy') else board
-            node = root
-            path = []  # list of (parent_node, move, child_node)
-
-            # selection
-            while node.get('expanded', False) and node['children']:
-                # select child maximizing U = Q + cpuct * P * sqrt(sum_N)/(1+N)
-                sum_N = sum(child['N'] for child in node['children'].values())
-                best_u = None
-                best_move = None
-                best_child = None
-                for mv, child in node['children'].items():
-                    N = child['N']
-                    Q = 0.0 if N == 0 else child['W'] / N
-                    U = Q + self.cpuct * child['P'] * (math.sqrt(sum_N) / (1 + N))
-                    if best_u is None or U > best_u:
-                        best_u = U
-                        best_move = mv
-                        best_child = child
-                if best_move is None:
-                    break
-                # play the move on b_sim
-                try:
-                    b_sim.make_move(best_move)
-                except Exception:
-                    # if we cannot play this move, mark child visited to avoid reuse
-                    best_child['N'] += 1
-                    best_child['W'] += 0.0
-                    path.append((node, best_move, best_child))
-                    break
-                path.append((node, best_move, best_child))
-                node = best_child
-
-            # expansion
-            if not node.get('expanded', False):
-                # evaluate network at this leaf
-                logits_l, val_l = evaluate_network(b_sim)
-                if logits_l is None:
-                    leaf_val = 0.0
-                    node['expanded'] = True
-                else:
-                    # build priors for this node
-                    try:
-                        legal_here = list(b_sim.generate_legal_moves())
-                    except Exception:
-                        from core.moves.legal_movegen import generate_legal_moves as core_gen
-                        legal_here = list(core_gen(b_sim))
-
-                    idxs_here = []
-                    for m in legal_here:
-                        try:
-                            idxs_here.append(move_to_index(m))
-                        except Exception:
-                            idxs_here.append(None)
-
-                    legal_logits_here = []
-                    for idx in idxs_here:
-                        if idx is None:
-                            legal_logits_here.append(-1e9)
-                        else:
-                            try:
-                                legal_logits_here.append(float(logits_l[idx]))
-                            except Exception:
-                                legal_logits_here.append(-1e9)
-
-                    maxlh = max(legal_logits_here) if legal_logits_here else 0.0
-                    exps_h = [math.exp(x - maxlh) for x in legal_logits_here]
-                    s_h = sum(exps_h)
-                    if s_h <= 0:
-                        pri_h = [1.0 / len(legal_here)] * len(legal_here) if legal_here else []
-                    else:
-                        pri_h = [e / s_h for e in exps_h]
-
-                    # attach children
-                    for m2, p2 in zip(legal_here, pri_h):
-                        if m2 not in node['children']:
-                            node['children'][m2] = make_node(p2)
-                    leaf_val = float(val_l)
-                    node['expanded'] = True
-
-            # backpropagate
-            v_back = leaf_val
-            for parent, mv, child in reversed(path):
-                child['N'] += 1
-                child['W'] += v_back
-                v_back = -v_back
-
-        # choose move with highest visit count
-        best_mv = None
-        best_N = -1
-        for mv, child in root['children'].items():
-            if child['N'] > best_N:
-                best_N = child['N']
-                best_mv = mv
-
+                if search.advance(int(actions[k]), after):
+                    self._after_move = after
         return best_mv
 
+    def _get_search(self):
+        """Shared training.mcts search over the model, built on first use (None without a model)."""
+        if self._search is None:
+            if self.model is None or MCTS is None or make_net_predictor is None:
+                return None
+            self._search = MCTS(make_net_predictor(self.model, cache=self.eval_cache), action_size=ACTION_SIZE,
+                                c_puct=self.cpuct, sims=self.sims, reuse_tree=self.reuse_tree)
+        return self._search
+
     def name(self) -> str:
         base = f"MCTS(sims={self.sims},cpuct={self.cpuct})"
         if self.model_path:
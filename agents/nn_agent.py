@@ -6,18 +6,24 @@ chooses the highest-probability legal move according to the network policy.
 from __future__ import annotations
 from typing import Optional, Any, List, Tuple
 import os
+import warnings
 import torch
 
 from .agent_base import Agent
 
 try:
     from training.model import make_model
-    from training.encoder import board_to_tensor, move_to_index, ACTION_SIZE
+    from training.encoder import board_to_tensor, move_to_index, ACTION_SIZE, check_input_layout
+    from training.eval_cache import EvalCache
+    from training.net import make_net_predictor
 except Exception:
+    EvalCache = None
+    make_net_predictor = None
     make_model = None
     board_to_tensor = None
     move_to_index = None
     ACTION_SIZE = None
+    check_input_layout = None
 
 
 class NeuralAgent(Agent):
@@ -27,9 +33,13 @@ class NeuralAgent(Agent):
     highest-scoring legal move. If no model is provided or loading fails,
     the agent will still attempt to call the model factory (if available)
     and otherwise will return a random legal move via fallback.
+
+    Evaluations go through an EvalCache of `eval_cache_mb` MB (0 disables it),
+    so positions seen again (repetitions, re-analysis) skip the network.
     """
 
-    def __init__(self, model_path: Optional[str] = None, device: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, device: Optional[str] = None,
+                 eval_cache_mb: float = 8.0):
         if device is None:
             device = 'cuda' if torch.cuda.is_available() else 'cpu'
         self.device = torch.device(device)
@@ -44,19 +54,24 @@ class NeuralAgent(Agent):
                 self.model = make_model(device=self.device, **kwargs)
                 if model_path and os.path.exists(model_path):
                     ckpt = torch.load(model_path, map_location=self.device)
-                    # support both state_dict and full model dumps
-                    if isinstance(ckpt, dict) and 'state_dict' in ckpt:
-                        sd = ckpt['state_dict']
-                    else:
-                        sd = ckpt
+                    # checkpoint dicts and bare state_dicts; refuses other input layouts
+                    sd = check_input_layout(ckpt, model_path)
                     try:
                         self.model.load_state_dict(sd)
                     except Exception:
                         # try relaxed loading
                         self.model.load_state_dict(sd, strict=False)
                 self.model.eval()
+            except ValueError as exc:
+                warnings.warn(f"NeuralAgent: not loading {model_path}: {exc}")
+                self.model = None
             except Exception:
                 self.model = None
+        self.eval_cache = None
+        self._predict = None
+        if self.model is not None and make_net_predictor is not None and eval_cache_mb > 0:
+            self.eval_cache = EvalCache(max_bytes=int(eval_cache_mb * (1 << 20)))
+            self._predict = make_net_predictor(self.model, cache=self.eval_cache)
 
     async def get_move(self, board: Any) -> Optional[object]:
         # collect legal moves
@@ -77,23 +92,28 @@ class NeuralAgent(Agent):
         if self.model is None or board_to_tensor is None or move_to_index is None:
             return moves[0]
 
-        # prepare input
-        try:
-            import numpy as np
-            arr = board_to_tensor(board)
-            t = torch.from_numpy(arr).unsqueeze(0).to(self.device)
-        except Exception:
-            return moves[0]
-
-        with torch.no_grad():
+        if self._predict is not None:
             try:
-                pi, v = self.model(t)
+                logits, _ = self._predict(board)
             except Exception:
-                # model forward failed
                 return moves[0]
+        else:
+            # prepare input
+            try:
+                arr = board_to_tensor(board)
+                t = torch.from_numpy(arr).unsqueeze(0).to(self.device)
+            except Exception:
+                return moves[0]
+
+            with torch.no_grad():
+                try:
+                    pi, v = self.model(t)
+                except Exception:
+                    # model forward failed
+                    return moves[0]
 
-        # pi is logits of shape (1, ACTION_SIZE)
-        logits = pi.squeeze(0).cpu().numpy()
+            # pi is logits of shape (1, ACTION_SIZE)
+            logits = pi.squeeze(0).cpu().numpy()
 
         # build mapping (move -> score)
         best_move = None
@@ -0,0 +1,26 @@
+"""Configuração comum da suíte (tests/ e engine/tests/).
+
+O import do gerador de lances grava o cache das tabelas magic; durante os
+testes ele vai para um diretório temporário em vez de ~/.cache.
+"""
+import os
+import shutil
+import tempfile
+
+# magic_cache.CACHE_ENV; importar o módulo aqui já leria o cache padrão
+CACHE_ENV = "XADREZ_MAGIC_CACHE"
+
+_cache_dir = None
+
+
+def pytest_configure(config):
+    global _cache_dir
+    if CACHE_ENV not in os.environ:
+        _cache_dir = tempfile.mkdtemp(prefix="xadrez_magic_")
+        os.environ[CACHE_ENV] = os.path.join(_cache_dir, "magic_tables.bin")
+
+
+def pytest_unconfigure(config):
+    if _cache_dir is not None:
+        os.environ.pop(CACHE_ENV, None)
+        shutil.rmtree(_cache_dir, ignore_errors=True)
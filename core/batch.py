@@ -0,0 +1,123 @@
+"""Utilitários de processamento em lote sobre arquivos FEN/EPD.
+
+Compartilhados pelo runner de perft (core.perft.epd), pela análise em lote
+(engine.analyze) e pela suíte tática (engine.tactics):
+
+- parse_epd / iter_positions: leitura incremental de linhas FEN ou EPD;
+- warm_up: constrói as tabelas de ataque/magic/Zobrist antes de medir;
+- run_pool: distribui jobs num pool de processos com janela limitada, sem
+  carregar a entrada inteira na memória.
+"""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.board.board import Board
+
+
+# ============================================================
+#   PARSER FEN/EPD
+# ============================================================
+
+def parse_epd(line: str) -> Optional[Tuple[str, Dict[str, List[str]]]]:
+    """
+    Separa uma linha FEN/EPD em (fen, operações).
+
+    Registros EPD não trazem os contadores de lances: as operações
+    `hmvc`/`fmvn` (ou "0 1") completam o FEN. Aspas dos operandos são
+    removidas. Linhas vazias e comentários (#) retornam None.
+
+    Raises:
+        ValueError: se a linha tiver menos de 4 campos de FEN.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    tokens = line.split(None, 4)
+    if len(tokens) < 4:
+        raise ValueError(f"invalid FEN/EPD line: {line!r}")
+    board_fields, rest = tokens[:4], (tokens[4] if len(tokens) > 4 else "")
+
+    counters = rest.split(None, 2)
+    if len(counters) >= 2 and counters[0].isdigit() and counters[1].isdigit():
+        board_fields += counters[:2]
+        rest = counters[2] if len(counters) > 2 else ""
+
+    ops: Dict[str, List[str]] = {}
+    for op in rest.split(";"):
+        parts = op.split()
+        if parts:
+            ops[parts[0]] = [p.strip('"') for p in parts[1:]]
+
+    if len(board_fields) == 4:
+        board_fields += [ops.get("hmvc", ["0"])[0], ops.get("fmvn", ["1"])[0]]
+    return " ".join(board_fields), ops
+
+
+def iter_positions(stream: Iterable[str]) -> Iterator[Tuple[int, str, Dict[str, List[str]]]]:
+    """Itera (índice, fen, operações) sob demanda; linhas inválidas vêm com a operação `error`."""
+    index = 0
+    for line in stream:
+        try:
+            parsed = parse_epd(line)
+        except ValueError as exc:
+            parsed = (line.strip(), {"error": [str(exc)]})
+        if parsed is None:
+            continue
+        yield index, parsed[0], parsed[1]
+        index += 1
+
+
+# ============================================================
+#   POOL DE PROCESSOS
+# ============================================================
+
+def warm_up() -> None:
+    """Constrói tabelas de ataque/magic/Zobrist uma vez por processo, fora do cronômetro."""
+    from core.moves.tables.attack_tables import init as init_attack_tables
+    from core.moves.legal_movegen import generate_legal_moves
+    init_attack_tables()
+    list(generate_legal_moves(Board()))
+
+
+def run_pool(fn: Callable, jobs: Iterable, workers: int = 1, ordered: bool = True) -> Iterator:
+    """
+    Aplica `fn` a cada job e produz os resultados.
+
+    Com workers <= 1 roda no próprio processo. Caso contrário no máximo
+    2 * workers jobs ficam em voo ao mesmo tempo, então a entrada é consumida
+    sob demanda. ordered=False produz cada resultado assim que fica pronto.
+    `fn` e os jobs precisam ser serializáveis (funções de módulo).
+    """
+    if workers <= 1:
+        warm_up()
+        for job in jobs:
+            yield fn(job)
+        return
+
+    window = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_up) as pool:
+        if ordered:
+            queue: deque = deque()
+            for job in jobs:
+                queue.append(pool.submit(fn, job))
+                if len(queue) >= window:
+                    yield queue.popleft().result()
+            while queue:
+                yield queue.popleft().result()
+            return
+
+        pending = set()
+        for job in jobs:
+            pending.add(pool.submit(fn, job))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
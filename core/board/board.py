@@ -11,7 +11,7 @@ from core.moves.tables.attack_tables import knight_attacks, king_attacks
 from core.moves.magic.magic_bitboards import bishop_attacks, rook_attacks
 from core.moves.move import Move
 from utils.constants import (
-    CASTLE_WHITE_K, CASTLE_WHITE_Q, CASTLE_BLACK_K, CASTLE_BLACK_Q,
+    CASTLE_WHITE_K, CASTLE_WHITE_Q, CASTLE_BLACK_K, CASTLE_BLACK_Q, CASTLING_ALL,
     PIECE_COUNT, COLOR_COUNT, NOT_FILE_H, NOT_FILE_A, square_index
 )
 from utils.enums import Color, PieceType
@@ -89,6 +89,7 @@ class Board:
     def compute_zobrist(self) -> int:
         """Recalcula o hash Zobrist completo do tabuleiro."""
         h = 0
+        psq = Zobrist.piece_square_flat
 
         # Peças
         for color in Color:
@@ -96,12 +97,11 @@ class Board:
             for piece in PieceType:
                 pi = int(piece)
                 bb = self.bitboards[ci][pi]
-                piece_index = ci * 6 + pi  # 0..11
+                base = (ci * 6 + pi) << 6  # piece_index 0..11
 
                 while bb:
                     lsb = bb & -bb
-                    sq = lsb.bit_length() - 1
-                    h = Zobrist.xor_piece(h, piece_index, sq)
+                    h ^= psq[base | (lsb.bit_length() - 1)]
                     bb ^= lsb
 
         # Castling
@@ -160,6 +160,7 @@ class Board:
         new.en_passant_square = self.en_passant_square
         new.halfmove_clock = self.halfmove_clock
         new.fullmove_number = self.fullmove_number
+        new.zobrist_key = self.zobrist_key
 
         # State stack is not copied (fresh undo stack)
         new._state_stack = []
@@ -414,6 +415,7 @@ class Board:
 
         self.all_occupancy = self.occupancy[0] | self.occupancy[1]
         self.side_to_move = Color.WHITE
+        self.castling_rights = CASTLING_ALL
         self.validate()
 
     def set_startpos(self) -> None:
@@ -532,10 +534,11 @@ class Board:
         old_castling = self.castling_rights
         old_ep = self.en_passant_square
 
-        # remover estado antigo do hash
-        self.zobrist_key = Zobrist.xor_castling(self.zobrist_key, old_castling)
+        # hash acumulado localmente; tabelas planas evitam chamadas de classmethod
+        h = self.zobrist_key ^ Zobrist.side_to_move
+        ep_keys = Zobrist.enpassant
         if old_ep is not None:
-            self.zobrist_key = Zobrist.xor_enpassant(self.zobrist_key, old_ep)
+            h ^= ep_keys[old_ep]
 
         stm = self.side_to_move
         enemy = Color.BLACK if stm == Color.WHITE else Color.WHITE
@@ -544,29 +547,30 @@ class Board:
         to_sq = move.to_sq
         piece = move.piece
 
-        old_ep = self.en_passant_square
         self.en_passant_square = None
 
         # ====================================================
         # CAPTURA (normal + en-passant)
         # ====================================================
-        self._do_capture(move, stm, enemy, to_sq, old_ep)
+        if move.is_capture:
+            h ^= self._do_capture(move, stm, enemy, to_sq, old_ep)
 
         # ====================================================
         # MOVIMENTO PRINCIPAL
         # ====================================================
-        self._do_move_piece(stm, piece, from_sq, to_sq)
+        h ^= self._do_move_piece(stm, piece, from_sq, to_sq)
 
         # ====================================================
         # ROQUE
         # ====================================================
         if piece == PieceType.KING and abs(to_sq - from_sq) == 2:
-            self._do_castling(stm, from_sq, to_sq)
+            h ^= self._do_castling(stm, from_sq, to_sq)
 
         # ====================================================
         # PROMOÇÃO
         # ====================================================
-        self._do_promotion(stm, move, to_sq)
+        if move.promotion is not None:
+            h ^= self._do_promotion(stm, move, to_sq)
 
         # ====================================================
         # CASTLING RIGHTS
@@ -596,12 +600,12 @@ class Board:
         # ====================================================
         # ZOBRIST: aplicar novos estados
         # ====================================================
-        self.zobrist_key = Zobrist.xor_castling(self.zobrist_key, self.castling_rights)
-
+        # delta 16x16 (zero quando os direitos não mudam)
+        h ^= Zobrist.castling_delta[((old_castling & 0xF) << 4) | (self.castling_rights & 0xF)]
         if self.en_passant_square is not None:
-            self.zobrist_key = Zobrist.xor_enpassant(self.zobrist_key, self.en_passant_square)
+            h ^= ep_keys[self.en_passant_square]
 
-        self.zobrist_key = Zobrist.xor_side(self.zobrist_key)
+        self.zobrist_key = h
 
     def unmake_move(self) -> None:
         """Restore board state to before last move."""
@@ -928,8 +932,9 @@ class Board:
 
         self.all_occupancy = self.occupancy[0] | self.occupancy[1]
 
-    def _do_capture(self, move: Move, stm: Color, enemy: Color, to_sq: int, old_ep: Optional[int]) -> None:
-        """Executa captura normal ou en-passant, com atualização Zobrist."""
+    def _do_capture(self, move: Move, stm: Color, enemy: Color, to_sq: int, old_ep: Optional[int]) -> int:
+        """Executa captura normal ou en-passant e retorna o delta Zobrist."""
+        psq = Zobrist.piece_square_flat
 
         # En passant capture
         if (move.piece == PieceType.PAWN and move.is_capture and
@@ -938,32 +943,33 @@ class Board:
             self._clear_square(cap_sq)
 
             cap_index = int(enemy) * 6 + int(PieceType.PAWN)
-            self.zobrist_key = Zobrist.xor_piece(self.zobrist_key, cap_index, cap_sq)
-            return
+            return psq[(cap_index << 6) | cap_sq]
 
         # Captura normal
+        delta = 0
         if move.is_capture:
             captured = self.mailbox[to_sq]  # leitura real do board
             if captured is not None:
                 cap_color, cap_piece = captured
                 cap_index = int(cap_color) * 6 + int(cap_piece)
-                self.zobrist_key = Zobrist.xor_piece(self.zobrist_key, cap_index, to_sq)
+                delta = psq[(cap_index << 6) | to_sq]
 
             self._clear_square(to_sq)
+        return delta
 
-    def _do_move_piece(self, stm: Color, piece: PieceType, from_sq: int, to_sq: int) -> None:
-        """Execute the main piece move (clear source, place on dest) and update Zobrist."""
+    def _do_move_piece(self, stm: Color, piece: PieceType, from_sq: int, to_sq: int) -> int:
+        """Execute the main piece move (clear source, place on dest) and return the Zobrist delta."""
         # clear origem e coloca destino usando helpers já existentes
         self._clear_square(from_sq)
         self._place_piece(stm, piece, to_sq)
 
-        # atualizar hash: remove peça na origem, adiciona no destino
-        piece_index = int(stm) * 6 + int(piece)
-        self.zobrist_key = Zobrist.xor_piece(self.zobrist_key, piece_index, from_sq)
-        self.zobrist_key = Zobrist.xor_piece(self.zobrist_key, piece_index, to_sq)
+        # hash: remove peça na origem, adiciona no destino
+        base = (int(stm) * 6 + int(piece)) << 6
+        psq = Zobrist.piece_square_flat
+        return psq[base | from_sq] ^ psq[base | to_sq]
 
-    def _do_castling(self, stm: Color, from_sq: int, to_sq: int) -> None:
-        """Executa roque, atualizando bitboards, mailbox e Zobrist.
+    def _do_castling(self, stm: Color, from_sq: int, to_sq: int) -> int:
+        """Executa roque, atualizando bitboards e mailbox; retorna o delta Zobrist da torre.
 
         Pré-condição: chamada somente quando piece == KING e abs(to_sq - from_sq) == 2.
         """
@@ -976,30 +982,29 @@ class Board:
             elif to_sq == 2:  # O-O-O (e1 -> c1)
                 rook_from, rook_to = 0, 3  # a1 -> d1
             else:
-                return
+                return 0
         else:  # BLACK
             if to_sq == 62:  # O-O (e8 -> g8)
                 rook_from, rook_to = 63, 61  # h8 -> f8
             elif to_sq == 58:  # O-O-O (e8 -> c8)
                 rook_from, rook_to = 56, 59  # a8 -> d8
             else:
-                return
+                return 0
 
-        # remover torre da origem
+        # remover torre da origem e colocar no destino
         self._clear_square(rook_from)
-        self.zobrist_key = Zobrist.xor_piece(self.zobrist_key, rook_index, rook_from)
-
-        # colocar torre no destino
         self._place_piece(stm, PieceType.ROOK, rook_to)
-        self.zobrist_key = Zobrist.xor_piece(self.zobrist_key, rook_index, rook_to)
 
-    def _do_promotion(self, stm: Color, move: Move, to_sq: int) -> None:
+        psq = Zobrist.piece_square_flat
+        return psq[(rook_index << 6) | rook_from] ^ psq[(rook_index << 6) | rook_to]
+
+    def _do_promotion(self, stm: Color, move: Move, to_sq: int) -> int:
         """Executa promoção: remove o peão e coloca a peça promovida.
-           Atualiza Zobrist exatamente como no código original.
+           Retorna o delta Zobrist (remove PAWN no destino, adiciona promoção).
         """
         promo = move.promotion
         if promo is None:
-            return
+            return 0
 
         # remover o peão que chegou no destino
         self._clear_square(to_sq)
@@ -1010,9 +1015,8 @@ class Board:
         pawn_index = int(stm) * 6 + int(PieceType.PAWN)
         promo_index = int(stm) * 6 + int(promo)
 
-        # atualizar Zobrist: remove PAWN no destino, adiciona promoção
-        self.zobrist_key = Zobrist.xor_piece(self.zobrist_key, pawn_index, to_sq)
-        self.zobrist_key = Zobrist.xor_piece(self.zobrist_key, promo_index, to_sq)
+        psq = Zobrist.piece_square_flat
+        return psq[(pawn_index << 6) | to_sq] ^ psq[(promo_index << 6) | to_sq]
 
     def _do_castling_rights_update(self, stm: Color, piece: PieceType, from_sq: int, to_sq: int, move: Move) -> None:
         """Atualiza direitos de roque exatamente como no código original."""
@@ -11,9 +11,12 @@ Features:
 - Incremental XOR helpers used by Board.
 - Diagnostic helpers used by tests (entropy, signature).
 - Small micro-optimizations (local lookups) in hot helpers.
+- Flat, immutable tables for hot paths (Board.make_move):
+    piece_square_flat[piece_index * 64 + sq]
+    castling_delta[(old_rights << 4) | new_rights] = castling[old] ^ castling[new]
 """
 
-from typing import ClassVar, List, Optional
+from typing import ClassVar, List, Optional, Tuple
 import threading
 import random
 
@@ -51,6 +54,10 @@ class Zobrist:
     # Backwards-compatible alias some code/tests may expect
     piece_keys: ClassVar[List[List[int]]] = []
 
+    # Flat views for hot paths (rebuilt by init())
+    piece_square_flat: ClassVar[Tuple[int, ...]] = ()
+    castling_delta: ClassVar[Tuple[int, ...]] = ()
+
     # ---------------------------------------------------------
     # Initialization
     # ---------------------------------------------------------
@@ -88,6 +95,8 @@ class Zobrist:
             # alias
             cls.piece_keys = cls.piece_square
 
+            cls._build_flat_tables()
+
             _initialized = True
 
     @classmethod
@@ -104,8 +113,21 @@ class Zobrist:
             cls.enpassant = []
             cls.side_to_move = 0
             cls.piece_keys = []
+            cls.piece_square_flat = ()
+            cls.castling_delta = ()
             _initialized = False
 
+    @classmethod
+    def _build_flat_tables(cls) -> None:
+        """Derive the flat piece table and the 16x16 castling transition deltas."""
+        cls.piece_square_flat = tuple(k for row in cls.piece_square for k in row)
+        castling = cls.castling
+        cls.castling_delta = tuple(
+            castling[old] ^ castling[new]
+            for old in range(_CASTLING_STATES)
+            for new in range(_CASTLING_STATES)
+        )
+
     @classmethod
     def ensure_initialized(cls, seed: int = 0xC0FFEE) -> None:
         """Convenience: initialize if not already done (idempotent)."""
@@ -120,9 +142,7 @@ class Zobrist:
         XOR a piece at `square` into hash `h` and return new hash.
         Accepts either PieceIndex enum or integer index (0..11).
         """
-        # micro-opt: local lookup to avoid repeated attribute access
-        idx = int(piece_index)
-        return (h ^ cls.piece_square[idx][square]) & U64
+        return (h ^ cls.piece_square_flat[(int(piece_index) << 6) | square]) & U64
 
     @classmethod
     def xor_castling(cls, h: int, castling_rights: int) -> int:
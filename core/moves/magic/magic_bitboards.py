@@ -21,6 +21,8 @@ Características:
 - Implementação em Python puro; sem dependência de bitops nativos.
 - Placeholders seguros que chamam init() e delegam para as implementações rápidas.
 - Expõe utilitários de debug/validação (index_to_occupancy, mask_bits_positions, _rook_attacks_from_occupancy, ...).
+- Tabelas de ataque persistidas em cache binário (magic_cache); se o cache for válido
+  elas são carregadas já no import, senão são geradas no primeiro init() e gravadas.
 """
 
 from typing import Callable, Dict, List, Tuple, Optional, Union
@@ -28,6 +30,7 @@ import threading
 
 from utils.constants import SQUARE_TO_FILE, SQUARE_TO_RANK, U64
 from .magic_autogen import ROOK_MAGICS, BISHOP_MAGICS
+from . import magic_cache
 
 # ------------------------
 # Bit-scan helpers
@@ -277,8 +280,38 @@ def _validate_magics() -> None:
             if not isinstance(v, int) or v == 0:
                 raise RuntimeError(f"Invalid {name}_MAGIC at {i}: {v!r}")
 
-def init(validate: bool = True) -> None:
-    """Thread-safe lazy initialization. Idempotent."""
+def _load_cached_tables() -> Optional[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+    path = magic_cache.default_cache_path()
+    if not path:
+        return None
+    return magic_cache.load_tables(
+        path,
+        ROOK_ATTACK_OFFSETS[63] + (1 << ROOK_RELEVANT_BITS[63]),
+        BISHOP_ATTACK_OFFSETS[63] + (1 << BISHOP_RELEVANT_BITS[63]),
+        magic_cache.magics_checksum(ROOK_MAGICS, BISHOP_MAGICS),
+    )
+
+def _save_cached_tables() -> None:
+    path = magic_cache.default_cache_path()
+    if not path:
+        return
+    try:
+        magic_cache.save_tables(
+            path, _ROOK_ATT_TABLE, _BISHOP_ATT_TABLE,
+            magic_cache.magics_checksum(ROOK_MAGICS, BISHOP_MAGICS),
+        )
+    except OSError:
+        # cache é só otimização: diretório sem permissão não é erro
+        pass
+
+def init(validate: bool = True, use_cache: bool = True) -> None:
+    """Thread-safe lazy initialization. Idempotent.
+
+    Args:
+        validate: validate the autogenerated magics first.
+        use_cache: load attack tables from the binary cache when valid, and
+            write the cache after building them.
+    """
     global _INITIALIZED
     global ROOK_MASKS, BISHOP_MASKS
     global ROOK_RELEVANT_BITS, BISHOP_RELEVANT_BITS
@@ -343,25 +376,31 @@ def init(validate: bool = True) -> None:
             off += 1 << BISHOP_RELEVANT_BITS[sq]
         BISHOP_ATTACK_OFFSETS = tuple(bishop_offsets)
 
-        # build per-square tables and flatten
-        rook_table_list: List[int] = []
-        bishop_table_list: List[int] = []
-        for sq in range(64):
-            rpos = _MASK_POSITIONS[(sq, True)]
-            bpos = _MASK_POSITIONS[(sq, False)]
-
-            rtab = _build_attack_table_for_square(
-                sq, ROOK_MASKS[sq], rpos, True, ROOK_MAGICS[sq], ROOK_SHIFTS[sq]
-            )
-            rook_table_list.extend(rtab)
-
-            btab = _build_attack_table_for_square(
-                sq, BISHOP_MASKS[sq], bpos, False, BISHOP_MAGICS[sq], BISHOP_SHIFTS[sq]
-            )
-            bishop_table_list.extend(btab)
-
-        _ROOK_ATT_TABLE = tuple(rook_table_list)
-        _BISHOP_ATT_TABLE = tuple(bishop_table_list)
+        cached = _load_cached_tables() if use_cache else None
+        if cached is not None:
+            _ROOK_ATT_TABLE, _BISHOP_ATT_TABLE = cached
+        else:
+            # build per-square tables and flatten
+            rook_table_list: List[int] = []
+            bishop_table_list: List[int] = []
+            for sq in range(64):
+                rpos = _MASK_POSITIONS[(sq, True)]
+                bpos = _MASK_POSITIONS[(sq, False)]
+
+                rtab = _build_attack_table_for_square(
+                    sq, ROOK_MASKS[sq], rpos, True, ROOK_MAGICS[sq], ROOK_SHIFTS[sq]
+                )
+                rook_table_list.extend(rtab)
+
+                btab = _build_attack_table_for_square(
+                    sq, BISHOP_MASKS[sq], bpos, False, BISHOP_MAGICS[sq], BISHOP_SHIFTS[sq]
+                )
+                bishop_table_list.extend(btab)
+
+            _ROOK_ATT_TABLE = tuple(rook_table_list)
+            _BISHOP_ATT_TABLE = tuple(bishop_table_list)
+            if use_cache:
+                _save_cached_tables()
 
         # create fast callables and bind to impl slots
         fast_rook = _make_fast_rook_attacks(ROOK_MASKS, tuple(ROOK_MAGICS), ROOK_SHIFTS, ROOK_ATTACK_OFFSETS, _ROOK_ATT_TABLE)
@@ -374,6 +413,14 @@ def init(validate: bool = True) -> None:
 
         _INITIALIZED = True
 
+def _init_from_cache_only() -> None:
+    """Import-time init: só inicializa se o cache existir e for válido (barato)."""
+    path = magic_cache.default_cache_path()
+    if path and magic_cache.is_cache_file(path):
+        init()
+
+_init_from_cache_only()
+
 # ------------------------
 # Debug helper
 # ------------------------
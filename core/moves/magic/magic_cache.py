@@ -0,0 +1,175 @@
+"""
+Cache binário das tabelas de ataque magic (torre/bispo).
+
+Construir as tabelas em Python puro custa centenas de ms por processo; este
+módulo grava as tabelas já achatadas num arquivo versionado e as recarrega
+via mmap + array.frombytes.
+
+Formato (little-endian):
+    header  : <8s I I I I I  -> assinatura, versão, len(rook), len(bishop),
+                                crc32 dos magics, crc32 do payload
+    payload : rook_table (uint64 * len) + bishop_table (uint64 * len)
+
+O arquivo é descartado (e regenerado pelo chamador) se a assinatura, versão,
+tamanhos, magics ou checksum não baterem.
+
+Local padrão: $XADREZ_MAGIC_CACHE, ou ~/.cache/xadrez_ai/magic_tables_v<versão>.bin.
+Definir XADREZ_MAGIC_CACHE como string vazia desativa o cache. Sem HOME
+resolvível o cache fica desativado, e um diretório sem permissão de escrita
+só impede a gravação (as tabelas são construídas normalmente).
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from typing import Optional, Sequence, Tuple
+
+CACHE_SIGNATURE = b"XAIMAGIC"
+CACHE_VERSION = 1
+CACHE_ENV = "XADREZ_MAGIC_CACHE"
+
+_HEADER = struct.Struct("<8sIIIII")
+
+
+def default_cache_path() -> Optional[str]:
+    """Resolve o caminho do cache; None quando desativado via ambiente."""
+    env = os.environ.get(CACHE_ENV)
+    if env is not None:
+        return env or None
+    base = os.environ.get("XDG_CACHE_HOME")
+    if not base:
+        home = os.path.expanduser("~")
+        if home.startswith("~"):
+            # HOME ausente e sem entrada no passwd: nada de gravar em ./~
+            return None
+        base = os.path.join(home, ".cache")
+    return os.path.join(base, "xadrez_ai", f"magic_tables_v{CACHE_VERSION}.bin")
+
+
+def magics_checksum(rook_magics: Sequence[int], bishop_magics: Sequence[int]) -> int:
+    """crc32 dos magics: tabelas geradas com outros magics são inválidas."""
+    packed = array("Q", list(rook_magics) + list(bishop_magics))
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return zlib.crc32(packed.tobytes())
+
+
+def _to_bytes(values: Sequence[int]) -> bytes:
+    arr = array("Q", values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def save_tables(
+    path: str,
+    rook_table: Sequence[int],
+    bishop_table: Sequence[int],
+    magics_crc: int,
+) -> None:
+    """Grava o cache de forma atômica (arquivo temporário + os.replace)."""
+    payload = _to_bytes(rook_table) + _to_bytes(bishop_table)
+    header = _HEADER.pack(
+        CACHE_SIGNATURE, CACHE_VERSION, len(rook_table), len(bishop_table),
+        magics_crc, zlib.crc32(payload),
+    )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".magic_", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(header)
+            fh.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def is_cache_file(path: str) -> bool:
+    """Checagem barata (só a assinatura) usada no import."""
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(len(CACHE_SIGNATURE)) == CACHE_SIGNATURE
+    except OSError:
+        return False
+
+
+def load_tables(
+    path: str,
+    rook_len: int,
+    bishop_len: int,
+    magics_crc: int,
+) -> Optional[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+    """
+    Carrega (rook_table, bishop_table) do cache.
+
+    Retorna None se o arquivo não existir ou estiver inválido/desatualizado.
+    """
+    try:
+        fh = open(path, "rb")
+    except OSError:
+        return None
+
+    with fh:
+        expected_size = _HEADER.size + 8 * (rook_len + bishop_len)
+        if os.fstat(fh.fileno()).st_size != expected_size:
+            return None
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            sig, version, rlen, blen, mcrc, pcrc = _HEADER.unpack_from(mm, 0)
+            if (sig != CACHE_SIGNATURE or version != CACHE_VERSION
+                    or rlen != rook_len or blen != bishop_len or mcrc != magics_crc):
+                return None
+
+            view = memoryview(mm)
+            payload = view[_HEADER.size:]
+            try:
+                if zlib.crc32(payload) != pcrc:
+                    return None
+                split = 8 * rook_len
+                rook = array("Q")
+                rook.frombytes(payload[:split])
+                bishop = array("Q")
+                bishop.frombytes(payload[split:])
+            finally:
+                # memoryviews precisam ser liberadas antes de fechar o mmap
+                payload.release()
+                view.release()
+
+    if sys.byteorder != "little":
+        rook.byteswap()
+        bishop.byteswap()
+    return tuple(rook), tuple(bishop)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    p = argparse.ArgumentParser(description="Regenera o cache das tabelas magic")
+    p.add_argument("--path", help="arquivo de cache (padrão: %s ou ~/.cache)" % CACHE_ENV)
+    args = p.parse_args(argv)
+
+    from core.moves.magic import magic_bitboards as mb
+
+    path = args.path or default_cache_path()
+    if not path:
+        print("cache desativado")
+        return 1
+    mb.init(use_cache=False)
+    save_tables(path, mb._ROOK_ATT_TABLE, mb._BISHOP_ATT_TABLE,
+                magics_checksum(mb.ROOK_MAGICS, mb.BISHOP_MAGICS))
+    print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# core/moves/san.py
+"""Leitura de lances em notação algébrica padrão (SAN).
+
+Usado pelas suítes EPD (`bm`/`am`), que escrevem os lances em SAN:
+    Nf3, exd5, Raxd1, e8=Q, O-O, Qxf7#
+
+A estratégia é casar o texto contra os lances legais da posição, em vez de
+reimplementar as regras: a peça, a casa de destino, a promoção e a
+desambiguação (coluna/linha de origem) filtram a lista até sobrar um lance.
+Lances em UCI (e2e4) também são aceitos, pois algumas suítes os usam.
+"""
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+from core.moves.legal_movegen import generate_legal_moves
+from core.moves.move import FILES, RANKS, Move
+from utils.enums import PieceType
+
+PIECE_LETTERS = {
+    "N": PieceType.KNIGHT,
+    "B": PieceType.BISHOP,
+    "R": PieceType.ROOK,
+    "Q": PieceType.QUEEN,
+    "K": PieceType.KING,
+}
+
+_SAN_RE = re.compile(
+    r"^(?P<piece>[NBRQK])?(?P<file>[a-h])?(?P<rank>[1-8])?x?"
+    r"(?P<to>[a-h][1-8])(?:=?(?P<promo>[NBRQ]))?$"
+)
+_UCI_RE = re.compile(r"^[a-h][1-8][a-h][1-8][nbrq]?$")
+
+
+def _square(name: str) -> int:
+    return RANKS.index(name[1]) * 8 + FILES.index(name[0])
+
+
+def parse_san(board, san: str) -> Move:
+    """
+    Converte `san` no lance legal correspondente da posição.
+
+    Sufixos de xeque/mate e anotações (+ # ! ?) são ignorados.
+
+    Raises:
+        ValueError: se o texto não for SAN válido, não corresponder a nenhum
+            lance legal ou for ambíguo.
+    """
+    text = san.strip().rstrip("+#!?")
+    legal = list(generate_legal_moves(board))
+
+    if _UCI_RE.match(text):
+        for m in legal:
+            if m.to_uci() == text:
+                return m
+
+    if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        to_file = 6 if len(text) == 3 else 2
+        for m in legal:
+            if m.piece == PieceType.KING and abs(m.to_sq - m.from_sq) == 2 and (m.to_sq & 7) == to_file:
+                return m
+        raise ValueError(f"roque ilegal: {san!r}")
+
+    match = _SAN_RE.match(text)
+    if match is None:
+        raise ValueError(f"SAN inválido: {san!r}")
+
+    piece = PIECE_LETTERS.get(match.group("piece") or "", PieceType.PAWN)
+    to_sq = _square(match.group("to"))
+    promo = PIECE_LETTERS.get(match.group("promo") or "")
+    from_file = match.group("file")
+    from_rank = match.group("rank")
+
+    candidates = [
+        m for m in legal
+        if m.piece == piece
+        and m.to_sq == to_sq
+        and m.promotion == promo
+        and (from_file is None or FILES[m.from_sq & 7] == from_file)
+        and (from_rank is None or RANKS[m.from_sq >> 3] == from_rank)
+    ]
+    if len(candidates) != 1:
+        what = "ambíguo" if candidates else "ilegal"
+        raise ValueError(f"lance {what}: {san!r}")
+    return candidates[0]
+
+
+def try_parse_san(board, san: str) -> Optional[Move]:
+    """Como parse_san, mas retorna None em vez de levantar ValueError."""
+    try:
+        return parse_san(board, san)
+    except ValueError:
+        return None
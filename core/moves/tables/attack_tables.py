@@ -14,6 +14,8 @@ Projeto design:
  - inicialização é idempotente e thread-safe (double-checked locking).
  - os ponteiros _magic_rook_attacks / _magic_bishop_attacks são None
    antes de init() e apontam para uma função chamável após init().
+ - tabelas geométricas (RAYS, BETWEEN, LINE) também são preenchidas por
+   init(); servem para pins, xeques descobertos, x-rays (SEE) e evasões.
 """
 
 import threading
@@ -38,6 +40,19 @@ PAWN_ATTACKS: Dict[Color, List[int]] = {
 ROOK_GEOMETRY_RAYS: List[int] = [0] * 64
 BISHOP_GEOMETRY_RAYS: List[int] = [0] * 64
 
+# Raios direcionais: RAYS[dir][sq] = casas a partir de sq (exclusive) até a borda
+DIR_N, DIR_S, DIR_E, DIR_W, DIR_NE, DIR_NW, DIR_SE, DIR_SW = range(8)
+RAY_DIRECTIONS: Tuple[Tuple[int, int], ...] = (
+    (0, 1), (0, -1), (1, 0), (-1, 0),     # ortogonais (torre)
+    (1, 1), (-1, 1), (1, -1), (-1, -1),   # diagonais (bispo)
+)
+RAYS: List[List[int]] = [[0] * 64 for _ in range(8)]
+
+# BETWEEN[a][b]: casas estritamente entre a e b (0 se não alinhadas)
+# LINE[a][b]: linha inteira (borda a borda) que passa por a e b (0 se não alinhadas)
+BETWEEN: List[List[int]] = [[0] * 64 for _ in range(64)]
+LINE: List[List[int]] = [[0] * 64 for _ in range(64)]
+
 # Ponteiros para implementação de sliding attacks (magic ou fallback).
 # Observação: mantemos nomes _magic_* para compatibilidade com testes/codebase.
 _magic_rook_attacks = None  # Setado em init() para função (sq, occ) -> attacks
@@ -154,6 +169,41 @@ def _build_pawn_attack_tables() -> Dict[Color, List[int]]:
     return {Color.WHITE: white, Color.BLACK: black}
 
 
+def _build_ray_tables() -> None:
+    """
+    Preenche RAYS, BETWEEN e LINE in-place.
+
+    Para cada casa e direção, caminha até a borda uma única vez; cada casa
+    alcançada define BETWEEN (acumulado do caminho) e LINE (raio para frente
+    | raio oposto | origem) para o par (origem, alvo).
+    """
+    for d, (df, dr) in enumerate(RAY_DIRECTIONS):
+        for sq in range(64):
+            f, r = (sq & 7) + df, (sq >> 3) + dr
+            ray = 0
+            while 0 <= f < 8 and 0 <= r < 8:
+                ray |= 1 << (r * 8 + f)
+                f += df
+                r += dr
+            RAYS[d][sq] = ray
+
+    # direção oposta de cada índice (N<->S, E<->W, NE<->SW, NW<->SE)
+    opposite = (DIR_S, DIR_N, DIR_W, DIR_E, DIR_SW, DIR_SE, DIR_NW, DIR_NE)
+
+    for d, (df, dr) in enumerate(RAY_DIRECTIONS):
+        for sq in range(64):
+            full = RAYS[d][sq] | RAYS[opposite[d]][sq] | (1 << sq)
+            f, r = (sq & 7) + df, (sq >> 3) + dr
+            path = 0
+            while 0 <= f < 8 and 0 <= r < 8:
+                target = r * 8 + f
+                BETWEEN[sq][target] = path
+                LINE[sq][target] = full
+                path |= 1 << target
+                f += df
+                r += dr
+
+
 # ============================================================
 # Fallback sliding attacks (usados caso Magic falhe/ausente)
 # ============================================================
@@ -270,6 +320,9 @@ def init() -> None:
         for color in (Color.WHITE, Color.BLACK):
             PAWN_ATTACKS[color][:] = pawn_tables[color]
 
+        # Tabelas geométricas (raios, entre, linha)
+        _build_ray_tables()
+
         # Tabelas dependentes de ocupação (Magic ou fallback)
         try:
             # Import dinâmico: pode falhar em ambientes sem magics compilados
@@ -351,6 +404,34 @@ def queen_attacks(sq: int, occ: int) -> int:
     return _magic_rook_attacks(sq, occ) | _magic_bishop_attacks(sq, occ)
 
 
+def ray(direction: int, sq: int) -> int:
+    """Raio a partir de `sq` (exclusive) na direção `direction` (DIR_*) até a borda."""
+    if not _INITIALIZED:
+        init()
+    return RAYS[direction][sq]
+
+
+def between(a: int, b: int) -> int:
+    """Casas estritamente entre `a` e `b`; 0 se não estiverem alinhadas."""
+    if not _INITIALIZED:
+        init()
+    return BETWEEN[a][b]
+
+
+def line(a: int, b: int) -> int:
+    """Linha/coluna/diagonal completa que passa por `a` e `b`; 0 se não alinhadas."""
+    if not _INITIALIZED:
+        init()
+    return LINE[a][b]
+
+
+def aligned(a: int, b: int, c: int) -> bool:
+    """True se `c` está na mesma linha que `a` e `b` (ex.: peça cravada contra o rei)."""
+    if not _INITIALIZED:
+        init()
+    return bool(LINE[a][b] >> c & 1)
+
+
 # ============================================================
 # Exports
 # ============================================================
@@ -363,10 +444,19 @@ __all__ = [
     "rook_attacks",
     "bishop_attacks",
     "queen_attacks",
+    "ray",
+    "between",
+    "line",
+    "aligned",
     "KNIGHT_ATTACKS",
     "KING_ATTACKS",
     "PAWN_ATTACKS",
     "ROOK_GEOMETRY_RAYS",
     "BISHOP_GEOMETRY_RAYS",
+    "RAYS",
+    "RAY_DIRECTIONS",
+    "BETWEEN",
+    "LINE",
+    "DIR_N", "DIR_S", "DIR_E", "DIR_W", "DIR_NE", "DIR_NW", "DIR_SE", "DIR_SW",
     "_INITIALIZED",
 ]
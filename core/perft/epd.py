@@ -0,0 +1,257 @@
+"""Runner de regressão perft sobre arquivos EPD.
+
+Formato aceito (padrão das suítes perft):
+
+    <fen> ;D1 20 ;D2 400 ;D3 8902
+
+Cada linha é lida de forma incremental (stream), as posições são distribuídas
+num pool de processos (core.batch) e o resultado de cada uma é emitido como
+uma linha JSON na ordem de entrada. Ao final é emitido um resumo JSON, feito
+com contadores acumulados (os resultados não ficam na memória).
+
+O baseline guarda a profundidade com que foi medido; comparar com outra
+profundidade não faz sentido (o nps muda com a profundidade) e é recusado.
+
+Uso:
+  python -m core.perft.epd core/perft/data/standard.epd --depth 3 --workers 4
+  python -m core.perft.epd suite.epd --baseline nps.json --threshold 0.2
+  python -m core.perft.epd suite.epd --save-baseline nps.json
+
+Códigos de saída:
+  0 -> tudo ok
+  1 -> divergência de contagem de nós
+  2 -> regressão de nodes/sec acima do limiar em relação ao baseline
+  3 -> baseline medido com outra profundidade (ou sem profundidade)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from core.batch import parse_epd, run_pool
+from core.board.board import Board
+from core.perft.perft import perft
+
+EXIT_OK = 0
+EXIT_MISMATCH = 1
+EXIT_NPS_REGRESSION = 2
+EXIT_BASELINE_DEPTH = 3
+
+DEFAULT_SUITE = os.path.join(os.path.dirname(__file__), "data", "standard.epd")
+
+
+# ============================================================
+#   PARSER EPD
+# ============================================================
+
+def parse_epd_line(line: str) -> Optional[Tuple[str, Dict[int, int]]]:
+    """
+    Converte uma linha `fen ;D1 n ;D2 n ...` em (fen, {depth: nodes}).
+    Linhas vazias e comentários (#) retornam None.
+
+    Raises:
+        ValueError: se algum campo `Dn` estiver malformado.
+    """
+    parsed = parse_epd(line)
+    if parsed is None:
+        return None
+
+    fen, ops = parsed
+    expected: Dict[int, int] = {}
+
+    for name, operands in ops.items():
+        if len(operands) != 1 or not name.upper().startswith("D") or not name[1:].isdigit():
+            raise ValueError(f"Campo EPD inválido: {' '.join([name] + operands)!r}")
+        expected[int(name[1:])] = int(operands[0])
+
+    return fen, expected
+
+
+def iter_epd(stream: Iterable[str]) -> Iterator[Tuple[int, str, Dict[int, int]]]:
+    """Itera (índice, fen, esperado) sem carregar o arquivo inteiro."""
+    index = 0
+    for line in stream:
+        parsed = parse_epd_line(line)
+        if parsed is None:
+            continue
+        fen, expected = parsed
+        yield index, fen, expected
+        index += 1
+
+
+# ============================================================
+#   EXECUÇÃO DE UMA POSIÇÃO (roda no worker)
+# ============================================================
+
+def run_position(index: int, fen: str, expected: Dict[int, int], max_depth: int) -> dict:
+    """
+    Executa perft para cada profundidade esperada <= max_depth.
+
+    Para na primeira divergência: profundidades maiores dependem das menores.
+    """
+    board = Board.from_fen(fen)
+    depths: List[dict] = []
+    total_nodes = 0
+    total_time = 0.0
+    passed = True
+
+    for depth in sorted(d for d in expected if d <= max_depth):
+        start = time.perf_counter()
+        nodes = perft(board, depth)
+        elapsed = time.perf_counter() - start
+
+        ok = nodes == expected[depth]
+        total_nodes += nodes
+        total_time += elapsed
+        depths.append({
+            "depth": depth,
+            "expected": expected[depth],
+            "nodes": nodes,
+            "ok": ok,
+            "seconds": round(elapsed, 6),
+            "nps": int(nodes / elapsed) if elapsed > 0 else 0,
+        })
+        if not ok:
+            passed = False
+            break
+
+    return {
+        "index": index,
+        "fen": fen,
+        "ok": passed,
+        "nodes": total_nodes,
+        "seconds": round(total_time, 6),
+        "nps": int(total_nodes / total_time) if total_time > 0 else 0,
+        "depths": depths,
+    }
+
+
+def _run_position_args(args: Tuple[int, str, Dict[int, int], int]) -> dict:
+    return run_position(*args)
+
+
+# ============================================================
+#   SUÍTE (streaming + paralelo)
+# ============================================================
+
+def run_suite(stream: Iterable[str], max_depth: int, workers: int = 1) -> Iterator[dict]:
+    """
+    Roda a suíte inteira e produz resultados na ordem de entrada.
+
+    A entrada é consumida sob demanda: no máximo 2 * workers posições ficam em
+    voo ao mesmo tempo, então arquivos grandes não são carregados na memória.
+    """
+    jobs = ((i, fen, exp, max_depth) for i, fen, exp in iter_epd(stream))
+    return run_pool(_run_position_args, jobs, workers)
+
+
+# ============================================================
+#   BASELINE DE NPS
+# ============================================================
+
+def load_baseline(path: str) -> Tuple[Optional[int], Dict[str, int]]:
+    """Carrega (profundidade, {fen: nps}) salvo por uma execução anterior."""
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    depth = data.get("max_depth")
+    return (int(depth) if depth is not None else None,
+            {str(k): int(v) for k, v in data.get("nps", {}).items()})
+
+
+def save_baseline(path: str, nps: Dict[str, int], max_depth: int) -> None:
+    """Grava {fen: nps} das posições corretas, com a profundidade da medição."""
+    data = {
+        "max_depth": max_depth,
+        "nps": nps,
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+
+
+def nps_regression(result: dict, baseline: Dict[str, int], threshold: float) -> Optional[float]:
+    """
+    Retorna a queda relativa de nps (0..1) se exceder `threshold`, senão None.
+    Posições ausentes no baseline nunca são consideradas regressão.
+    """
+    ref = baseline.get(result["fen"])
+    if not ref or result["nps"] <= 0:
+        return None
+    drop = 1.0 - result["nps"] / ref
+    return drop if drop > threshold else None
+
+
+# ============================================================
+#   CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None, out: TextIO = sys.stdout) -> int:
+    p = argparse.ArgumentParser(description="Perft EPD regression runner")
+    p.add_argument("epd", nargs="?", default=DEFAULT_SUITE,
+                   help="arquivo EPD ('-' para stdin)")
+    p.add_argument("--depth", type=int, default=3, help="profundidade máxima")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--baseline", help="JSON de nps para comparação")
+    p.add_argument("--threshold", type=float, default=0.25,
+                   help="queda relativa de nps tolerada (0.25 = 25%%)")
+    p.add_argument("--save-baseline", help="grava o nps desta execução como baseline")
+    args = p.parse_args(argv)
+
+    baseline: Dict[str, int] = {}
+    if args.baseline:
+        base_depth, baseline = load_baseline(args.baseline)
+        if base_depth != args.depth:
+            sys.stderr.write(f"baseline {args.baseline} medido com profundidade {base_depth}, "
+                             f"execução com {args.depth}: comparação recusada\n")
+            return EXIT_BASELINE_DEPTH
+    stream = sys.stdin if args.epd == "-" else open(args.epd, "r", encoding="utf-8")
+
+    positions = mismatches = regressions = total_nodes = 0
+    measured: Dict[str, int] = {}
+    start = time.perf_counter()
+    try:
+        for res in run_suite(stream, args.depth, args.workers):
+            drop = nps_regression(res, baseline, args.threshold)
+            if drop is not None:
+                res["nps_regression"] = round(drop, 4)
+                regressions += 1
+            if not res["ok"]:
+                mismatches += 1
+            elif args.save_baseline:
+                measured[res["fen"]] = res["nps"]
+            positions += 1
+            total_nodes += res["nodes"]
+            out.write(json.dumps(res) + "\n")
+            out.flush()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    wall = time.perf_counter() - start
+    summary = {
+        "summary": True,
+        "positions": positions,
+        "passed": positions - mismatches,
+        "mismatches": mismatches,
+        "nps_regressions": regressions,
+        "nodes": total_nodes,
+        "wall_seconds": round(wall, 6),
+        "nps": int(total_nodes / wall) if wall > 0 else 0,
+    }
+    out.write(json.dumps(summary) + "\n")
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, measured, args.depth)
+
+    if mismatches:
+        return EXIT_MISMATCH
+    if regressions:
+        return EXIT_NPS_REGRESSION
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,9 +7,14 @@ Example:
 	from engine import search_root
 	result = search_root(board, max_time_ms=1000, max_depth=8)
 	best_move = result['best_move']
+
+Streaming progress (one dict per completed depth; break to cancel):
+	from engine import iter_search, SearchLimits
+	for info in iter_search(board, SearchLimits(max_time_ms=1000, max_depth=8)):
+		print(info['depth'], info['score'], info['pv'])
 """
 from . import search
-from .iterdeep import search_root
+from .iterdeep import search_root, iter_search, aiter_search, SearchLimits
 
-__all__ = ["search_root", "search"]
+__all__ = ["search_root", "iter_search", "aiter_search", "SearchLimits", "search"]
 
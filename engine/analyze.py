@@ -0,0 +1,184 @@
+"""Batch position analysis over FEN/EPD input.
+
+Usage:
+  python -m engine.analyze positions.epd --depth 4 --workers 4
+  cat positions.fen | python -m engine.analyze - --nodes 20000 --unordered
+  python -m engine.analyze positions.epd --depth 3 --scaling 4
+  python -m engine.analyze positions.epd --depth 4 --stats
+
+Input lines are either a FEN (4 or 6 fields) or an EPD record
+(`<4 fields> opcode operand...; opcode ...;`); blank lines and `#` comments
+are skipped. Input is read as a stream and positions are spread over a
+process pool whose workers build the attack/Zobrist tables once at start-up
+(parsing and the pool driver live in core.batch, shared with the perft
+runner and the tactics suite). Only running totals are kept for the summary.
+
+Each position produces one JSON line: index, fen, id (EPD `id`, if any),
+best_move, score, pv (UCI), depth, nodes and seconds (--stats adds the
+per-iteration search statistics under `stats`). Results come out in input
+order unless --unordered is given, in which case each one is written as
+soon as it is ready. A final summary line reports positions/sec;
+--scaling N reruns the file with 1, 2, 4 ... N workers and reports only the
+summaries, to see how throughput scales.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from core.batch import iter_positions, parse_epd, run_pool
+from core.board.board import Board
+from .iterdeep import SearchLimits, search_root
+
+__all__ = ["analyze_position", "iter_positions", "main", "parse_epd", "run_batch"]
+
+
+# ------------------------------------------------------------
+# Worker side
+# ------------------------------------------------------------
+def analyze_position(index: int, fen: str, ops: Dict[str, List[str]], limits: SearchLimits) -> dict:
+    """Search one position with a fresh SearchState and return its JSON record."""
+    record = {"index": index, "fen": fen}
+    if "id" in ops:
+        record["id"] = " ".join(ops["id"])
+    if "error" in ops:
+        record["error"] = ops["error"][0]
+        return record
+    try:
+        board = Board.from_fen(fen)
+    except Exception as exc:
+        record["error"] = f"invalid FEN: {exc}"
+        return record
+
+    start = time.perf_counter()
+    res = search_root(board, max_time_ms=limits.max_time_ms, max_depth=limits.max_depth,
+                      max_nodes=limits.max_nodes, stats=limits.stats)
+    best = res["best_move"]
+    record.update({
+        "best_move": best.to_uci() if best is not None else None,
+        "score": res["score"],
+        "pv": [m.to_uci() for m in res["pv"]],
+        "depth": res["depth"],
+        "nodes": res["nodes"],
+        "seconds": round(time.perf_counter() - start, 6),
+    })
+    if limits.stats:
+        record["stats"] = res["stats"]
+    return record
+
+
+def _analyze_args(args: Tuple[int, str, Dict[str, List[str]], SearchLimits]) -> dict:
+    return analyze_position(*args)
+
+
+# ------------------------------------------------------------
+# Batch driver
+# ------------------------------------------------------------
+def run_batch(
+    stream: Iterable[str],
+    limits: SearchLimits,
+    workers: int = 1,
+    ordered: bool = True,
+) -> Iterator[dict]:
+    """Analyse every position of `stream`, yielding one record per position.
+
+    At most 2 * workers positions are in flight, so large inputs are never
+    loaded whole. With ordered=False records are yielded as they complete.
+    """
+    jobs = ((i, fen, ops, limits) for i, fen, ops in iter_positions(stream))
+    return run_pool(_analyze_args, jobs, workers, ordered)
+
+
+class _Totals:
+    """Running counters for the summary line (records are not kept)."""
+
+    def __init__(self):
+        self.positions = self.errors = self.nodes = 0
+
+    def add(self, rec: dict) -> None:
+        self.positions += 1
+        self.errors += "error" in rec
+        self.nodes += rec.get("nodes", 0)
+
+    def summary(self, workers: int, wall: float) -> dict:
+        return {
+            "summary": True,
+            "workers": workers,
+            "positions": self.positions,
+            "errors": self.errors,
+            "nodes": self.nodes,
+            "wall_seconds": round(wall, 6),
+            "positions_per_sec": round(self.positions / wall, 3) if wall > 0 else 0.0,
+            "nps": int(self.nodes / wall) if wall > 0 else 0,
+        }
+
+
+def _worker_counts(max_workers: int) -> List[int]:
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main(argv: Optional[List[str]] = None, out: TextIO = sys.stdout) -> int:
+    p = argparse.ArgumentParser(description="Batch FEN/EPD analysis")
+    p.add_argument("input", help="FEN/EPD file ('-' for stdin)")
+    p.add_argument("--depth", type=int, default=4, help="max depth per position")
+    p.add_argument("--nodes", type=int, default=None, help="node budget per position")
+    p.add_argument("--movetime", type=int, default=None, help="time budget per position (ms)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--unordered", action="store_true",
+                   help="write results as they finish instead of in input order")
+    p.add_argument("--scaling", type=int, default=None, metavar="N",
+                   help="rerun with 1, 2, 4 ... N workers and report positions/sec only")
+    p.add_argument("--stats", action="store_true",
+                   help="add per-iteration search statistics to each record")
+    args = p.parse_args(argv)
+
+    limits = SearchLimits(max_time_ms=args.movetime, max_depth=args.depth, max_nodes=args.nodes,
+                          stats=args.stats)
+
+    if args.scaling:
+        if args.input == "-":
+            p.error("--scaling needs a file (the input is read once per worker count)")
+        base = None
+        for n in _worker_counts(args.scaling):
+            totals = _Totals()
+            start = time.perf_counter()
+            with open(args.input, "r", encoding="utf-8") as fh:
+                for rec in run_batch(fh, limits, n, ordered=not args.unordered):
+                    totals.add(rec)
+            summary = totals.summary(n, time.perf_counter() - start)
+            base = base or summary["positions_per_sec"]
+            summary["speedup"] = round(summary["positions_per_sec"] / base, 3) if base else 0.0
+            out.write(json.dumps(summary) + "\n")
+            out.flush()
+        return 0
+
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    totals = _Totals()
+    start = time.perf_counter()
+    try:
+        for rec in run_batch(stream, limits, args.workers, ordered=not args.unordered):
+            totals.add(rec)
+            out.write(json.dumps(rec) + "\n")
+            out.flush()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    out.write(json.dumps(totals.summary(args.workers, time.perf_counter() - start)) + "\n")
+    return 1 if totals.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""Endgame bitbases (KPK, KRK, KQK): win/draw per position, built by retrograde analysis.
+
+Generate once with `python -m engine.bitbase.generate`; probing loads the
+files lazily from the default directory (see probe.default_dir) and answers
+None for positions it does not cover.
+"""
+from .probe import (
+    BITBASE_WIN,
+    DRAW,
+    LOSS,
+    WIN,
+    Bitbase,
+    available,
+    default_dir,
+    load,
+    probe,
+    probe_score,
+    unload,
+)
+from .generate import generate_all
+
+__all__ = [
+    "BITBASE_WIN", "DRAW", "LOSS", "WIN", "Bitbase", "available", "default_dir",
+    "load", "probe", "probe_score", "unload", "generate_all",
+]
@@ -0,0 +1,247 @@
+"""Retrograde generation of K+X vs K bitbases (X = pawn, rook or queen).
+
+Usage:
+  python -m engine.bitbase.generate                 # into the default directory
+  python -m engine.bitbase.generate --out DIR --workers 2
+
+Positions are normalised so the strong side is White. A position is the
+triple (wk, bk, x) plus the side to move; the index is wk << 12 | bk << 6 | x.
+For each side to move one bit says whether White (the strong side) wins.
+
+Algorithm (retrograde analysis):
+  1. every Black-to-move position gets a counter of its legal king moves;
+     positions where Black can take the piece are draws for good, mates are
+     the first wins;
+  2. wins are propagated backwards: the White-to-move predecessors of a won
+     Black-to-move position are wins; each won White-to-move position
+     decrements the counters of its Black-to-move predecessors, which become
+     wins at zero (every defence loses).
+KPK seeds White-to-move wins from promotions, so it needs KQK and KRK first.
+KQK and KRK are independent and are built in parallel processes.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.moves.tables import attack_tables
+from utils.enums import Color
+
+SIZE = 64 * 64 * 64
+MATERIALS = ("KQK", "KRK", "KPK")
+
+_DRAWN = 255  # counter marker: Black can capture the piece, never lost
+
+
+def index(wk: int, bk: int, x: int) -> int:
+    return (wk << 12) | (bk << 6) | x
+
+
+def _piece_attacks(material: str) -> Callable[[int, int], int]:
+    if material == "KQK":
+        return attack_tables.queen_attacks
+    if material == "KRK":
+        return attack_tables.rook_attacks
+    pawn = attack_tables.PAWN_ATTACKS[Color.WHITE]
+    return lambda sq, occ: pawn[sq]
+
+
+def _valid(material: str, wk: int, bk: int, x: int, king_att: List[int]) -> bool:
+    if wk == bk or wk == x or bk == x:
+        return False
+    if king_att[wk] >> bk & 1:
+        return False
+    if material == "KPK" and not 8 <= x < 56:
+        return False
+    return True
+
+
+def generate(material: str, promotions: Optional[Dict[str, Tuple[bytearray, bytearray]]] = None
+             ) -> Tuple[bytearray, bytearray]:
+    """Build one bitbase; returns (white_to_move_wins, black_to_move_wins), one byte per index.
+
+    Args:
+        material: "KQK", "KRK" or "KPK"
+        promotions: for KPK, the finished {"KQK": ..., "KRK": ...} tables
+    """
+    attack_tables.init()
+    king_att = attack_tables.KING_ATTACKS
+    king_sq = [[t for t in range(64) if king_att[s] >> t & 1] for s in range(64)]
+    attacks = _piece_attacks(material)
+    is_pawn = material == "KPK"
+    if is_pawn and not promotions:
+        raise ValueError("KPK needs the KQK and KRK tables for promotions")
+
+    wtm = bytearray(SIZE)
+    btm = bytearray(SIZE)
+    counter = bytearray(SIZE)
+    valid_w = bytearray(SIZE)
+    queue: deque = deque()
+
+    # 1. counters, mates and promotion seeds
+    for wk in range(64):
+        wk_bit = 1 << wk
+        for bk in range(64):
+            bk_bit = 1 << bk
+            for x in range(64):
+                if not _valid(material, wk, bk, x, king_att):
+                    continue
+                idx = (wk << 12) | (bk << 6) | x
+                covered = attacks(x, wk_bit) | king_att[wk]
+                in_check = bool(covered & bk_bit)
+                if not in_check:
+                    valid_w[idx] = 1
+
+                moves = 0
+                drawn = False
+                for t in king_sq[bk]:
+                    if t == x:
+                        if not king_att[wk] >> x & 1:
+                            drawn = True
+                    elif not covered >> t & 1:
+                        moves += 1
+                if drawn:
+                    counter[idx] = _DRAWN
+                elif moves:
+                    counter[idx] = moves
+                elif in_check:
+                    btm[idx] = 1
+                    queue.append((0, idx))
+
+                if is_pawn and not in_check and x >= 48:
+                    promo = x + 8
+                    if promo != wk and promo != bk:
+                        p_idx = (wk << 12) | (bk << 6) | promo
+                        if promotions["KQK"][1][p_idx] or promotions["KRK"][1][p_idx]:
+                            if not wtm[idx]:
+                                wtm[idx] = 1
+                                queue.append((1, idx))
+
+    # 2. propagate wins backwards
+    while queue:
+        white_to_move, idx = queue.popleft()
+        wk, bk, x = idx >> 12, (idx >> 6) & 63, idx & 63
+        if white_to_move:
+            # Black king moved last (never a capture)
+            for bk2 in king_sq[bk]:
+                if bk2 == wk or bk2 == x or king_att[wk] >> bk2 & 1:
+                    continue
+                p = (wk << 12) | (bk2 << 6) | x
+                c = counter[p]
+                if c == _DRAWN or btm[p] or c == 0:
+                    continue
+                counter[p] = c - 1
+                if c == 1:
+                    btm[p] = 1
+                    queue.append((0, p))
+            continue
+
+        # White moved last: the king or the piece
+        occ = (1 << wk) | (1 << bk)
+        for wk2 in king_sq[wk]:
+            if wk2 == bk or wk2 == x:
+                continue
+            q = (wk2 << 12) | (bk << 6) | x
+            if valid_w[q] and not wtm[q]:
+                wtm[q] = 1
+                queue.append((1, q))
+        if is_pawn:
+            origins = []
+            if x >= 16 and not occ >> (x - 8) & 1:
+                origins.append(x - 8)
+                if 24 <= x < 32 and not occ >> (x - 16) & 1:
+                    origins.append(x - 16)
+        else:
+            back = attacks(x, occ) & ~occ
+            origins = []
+            while back:
+                low = back & -back
+                origins.append(low.bit_length() - 1)
+                back ^= low
+        for x2 in origins:
+            q = (wk << 12) | (bk << 6) | x2
+            if valid_w[q] and not wtm[q]:
+                wtm[q] = 1
+                queue.append((1, q))
+
+    return wtm, btm
+
+
+def pack_bits(values: bytearray) -> bytes:
+    """One byte per index -> one bit per index (index i is bit i & 7 of byte i >> 3)."""
+    out = bytearray(len(values) // 8)
+    for i in range(0, len(values), 8):
+        chunk = values[i:i + 8]
+        if any(chunk):
+            b = 0
+            for j, v in enumerate(chunk):
+                if v:
+                    b |= 1 << j
+            out[i >> 3] = b
+    return bytes(out)
+
+
+def _build(material: str, promotions=None) -> Tuple[str, bytes, bytes, float]:
+    start = time.perf_counter()
+    wtm, btm = generate(material, promotions)
+    return material, pack_bits(wtm), pack_bits(btm), time.perf_counter() - start
+
+
+def _unpack(bits: bytes) -> bytearray:
+    out = bytearray(len(bits) * 8)
+    for i, b in enumerate(bits):
+        if b:
+            for j in range(8):
+                if b >> j & 1:
+                    out[(i << 3) | j] = 1
+    return out
+
+
+def generate_all(out_dir: str, workers: int = 2, log: Callable[[str], None] = print) -> Dict[str, str]:
+    """Build KQK and KRK (in parallel when workers > 1), then KPK; returns {material: path}."""
+    from .probe import save_bitbase
+
+    paths: Dict[str, str] = {}
+    built: Dict[str, Tuple[bytes, bytes]] = {}
+
+    def _store(material, w_bits, b_bits, seconds):
+        built[material] = (w_bits, b_bits)
+        paths[material] = save_bitbase(os.path.join(out_dir, f"{material.lower()}.bb"),
+                                       material, w_bits, b_bits)
+        log(f"{material}: {seconds:.1f}s -> {paths[material]}")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, 2)) as pool:
+            for res in pool.map(_build, ("KQK", "KRK")):
+                _store(*res)
+    else:
+        for material in ("KQK", "KRK"):
+            _store(*_build(material))
+
+    promotions = {m: (_unpack(built[m][0]), _unpack(built[m][1])) for m in ("KQK", "KRK")}
+    _store(*_build("KPK", promotions))
+    return paths
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .probe import default_dir
+
+    p = argparse.ArgumentParser(description="Generate KPK/KRK/KQK bitbases")
+    p.add_argument("--out", default=None, help="output directory (default: %(default)s -> cache dir)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = p.parse_args(argv)
+
+    out_dir = args.out or default_dir()
+    if not out_dir:
+        p.error("no output directory (XADREZ_BITBASE_DIR is empty)")
+    generate_all(out_dir, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""Bitbase files and probing.
+
+File format (little-endian):
+    header  : <8s I 4s I I  -> signature, version, material ("KQK\\0"),
+                               bits per side, crc32 of the payload
+    payload : White-to-move bits + Black-to-move bits (SIZE / 8 bytes each)
+
+Files are memory-mapped and read one byte per probe. Default directory:
+$XADREZ_BITBASE_DIR, or ~/.cache/xadrez_ai/bitbases; an empty
+XADREZ_BITBASE_DIR disables loading. Missing files simply mean "not covered".
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from typing import Dict, Optional
+
+from utils.enums import Color, PieceType
+from ..utils.constants import MATE_SCORE
+from .generate import MATERIALS, SIZE
+
+SIGNATURE = b"XAIBBASE"
+VERSION = 1
+DIR_ENV = "XADREZ_BITBASE_DIR"
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+# below every mate score, above any material evaluation
+BITBASE_WIN = MATE_SCORE // 2
+
+_HEADER = struct.Struct("<8sI4sII")
+_PIECES = {PieceType.PAWN: "KPK", PieceType.ROOK: "KRK", PieceType.QUEEN: "KQK"}
+
+_TABLES: Dict[str, "Bitbase"] = {}
+_default_loaded = False
+
+
+def default_dir() -> Optional[str]:
+    """Directory holding the .bb files; None when disabled via the environment."""
+    env = os.environ.get(DIR_ENV)
+    if env is not None:
+        return env or None
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "xadrez_ai", "bitbases")
+
+
+def save_bitbase(path: str, material: str, white_bits: bytes, black_bits: bytes) -> str:
+    """Write a bitbase atomically (temporary file + os.replace); returns `path`."""
+    payload = white_bits + black_bits
+    header = _HEADER.pack(SIGNATURE, VERSION, material.encode("ascii"), SIZE, zlib.crc32(payload))
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".bitbase_", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(header)
+            fh.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+class Bitbase:
+    """One memory-mapped K+X vs K bitbase (strong side normalised to White)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._fh.close()
+            raise ValueError(f"empty bitbase file: {path}")
+        try:
+            sig, version, material, size, crc = _HEADER.unpack_from(self._mm, 0)
+            if sig != SIGNATURE or version != VERSION or size != SIZE:
+                raise ValueError(f"not a v{VERSION} bitbase: {path}")
+            if len(self._mm) != _HEADER.size + 2 * (SIZE // 8):
+                raise ValueError(f"truncated bitbase: {path}")
+            if zlib.crc32(self._mm[_HEADER.size:]) != crc:
+                raise ValueError(f"bitbase checksum mismatch: {path}")
+        except BaseException:
+            self.close()
+            raise
+        self.material = material.decode("ascii")
+        self._white = _HEADER.size
+        self._black = _HEADER.size + SIZE // 8
+
+    def wins(self, white_to_move: bool, wk: int, bk: int, x: int) -> bool:
+        """True if White (the strong side) wins the normalised position."""
+        idx = (wk << 12) | (bk << 6) | x
+        base = self._white if white_to_move else self._black
+        return bool(self._mm[base + (idx >> 3)] >> (idx & 7) & 1)
+
+    def close(self) -> None:
+        try:
+            self._mm.close()
+        except AttributeError:
+            pass
+        self._fh.close()
+
+
+def load(directory: Optional[str] = None) -> int:
+    """Load every bitbase file found in `directory` (default_dir() if None); returns how many."""
+    global _default_loaded
+    if directory is None:
+        _default_loaded = True
+        directory = default_dir()
+    if not directory:
+        return 0
+    count = 0
+    for material in MATERIALS:
+        path = os.path.join(directory, f"{material.lower()}.bb")
+        if not os.path.exists(path):
+            continue
+        try:
+            table = Bitbase(path)
+        except (OSError, ValueError):
+            continue
+        old = _TABLES.pop(material, None)
+        if old is not None:
+            old.close()
+        _TABLES[material] = table
+        count += 1
+    return count
+
+
+def unload() -> None:
+    """Close all tables (the default directory is not reloaded automatically afterwards)."""
+    global _default_loaded
+    for table in _TABLES.values():
+        table.close()
+    _TABLES.clear()
+    _default_loaded = True
+
+
+def available() -> bool:
+    if not _default_loaded:
+        load()
+    return bool(_TABLES)
+
+
+def _lookup(board):
+    """(table, white_to_move, wk, bk, x, strong_color) after normalisation, or None."""
+    if bin(board.all_occupancy).count("1") != 3:
+        return None
+    if not _default_loaded:
+        load()
+    if not _TABLES:
+        return None
+    for strong in (Color.WHITE, Color.BLACK):
+        bbs = board.bitboards[strong]
+        for piece, material in _PIECES.items():
+            bb = bbs[piece]
+            if bb:
+                table = _TABLES.get(material)
+                if table is None:
+                    return None
+                weak = Color.BLACK if strong == Color.WHITE else Color.WHITE
+                x = bb.bit_length() - 1
+                wk = bbs[PieceType.KING].bit_length() - 1
+                bk = board.bitboards[weak][PieceType.KING].bit_length() - 1
+                if wk < 0 or bk < 0:
+                    return None
+                if strong == Color.BLACK:
+                    # mirror ranks so the strong side plays up the board as White
+                    wk, bk, x = wk ^ 56, bk ^ 56, x ^ 56
+                return table, board.side_to_move == strong, wk, bk, x, strong
+    return None
+
+
+def probe(board) -> Optional[int]:
+    """WIN / DRAW / LOSS for the side to move, or None if no bitbase covers the position."""
+    found = _lookup(board)
+    if found is None:
+        return None
+    table, strong_to_move, wk, bk, x, _ = found
+    if not table.wins(strong_to_move, wk, bk, x):
+        return DRAW
+    return WIN if strong_to_move else LOSS
+
+
+def probe_score(board, ply: int = 0) -> Optional[int]:
+    """Exact search score for the side to move (draw = 0), or None if not covered.
+
+    Wins score BITBASE_WIN plus a small progress term (lone king to the edge,
+    kings close, pawn advanced) so the search still makes progress towards mate;
+    nearer wins score higher.
+    """
+    found = _lookup(board)
+    if found is None:
+        return None
+    table, strong_to_move, wk, bk, x, _ = found
+    if not table.wins(strong_to_move, wk, bk, x):
+        return 0
+    score = BITBASE_WIN + _progress(table.material, wk, bk, x) - ply
+    return score if strong_to_move else -score
+
+
+def _progress(material: str, wk: int, bk: int, x: int) -> int:
+    bf, br = bk & 7, bk >> 3
+    edge = max(3 - bf, bf - 4) + max(3 - br, br - 4)
+    kings = max(abs((wk & 7) - bf), abs((wk >> 3) - br))
+    score = 10 * edge + 4 * (7 - kings)
+    if material == "KPK":
+        score += 20 * (x >> 3)
+    return score
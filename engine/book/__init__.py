@@ -0,0 +1,4 @@
+"""Opening book package"""
+from .polyglot_book import PolyglotBook, BookEntry, ENTRY_STRUCT, decode_move, encode_move, open_book
+
+__all__ = ["PolyglotBook", "BookEntry", "ENTRY_STRUCT", "decode_move", "encode_move", "open_book"]
@@ -0,0 +1,182 @@
+"""Polyglot (.bin) opening book reader.
+
+The book file is memory-mapped and binary-searched by Polyglot key, so opening
+a multi-megabyte book is O(1) and each probe is O(log n) without reading the
+whole file into memory.
+
+Entry layout (16 bytes, big-endian): key u64, move u16, weight u16, learn u32.
+Entries are sorted by key; several entries may share the same key.
+"""
+import mmap
+import os
+import random
+import struct
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from core.hash.polyglot import polyglot_key
+from core.moves.legal_movegen import generate_legal_moves
+from utils.enums import PieceType
+
+ENTRY_STRUCT = struct.Struct(">QHHI")
+ENTRY_SIZE = ENTRY_STRUCT.size
+_KEY_STRUCT = struct.Struct(">Q")
+
+# Polyglot promotion codes (bits 12..14 of the raw move)
+_PROMOTIONS = {
+    1: PieceType.KNIGHT,
+    2: PieceType.BISHOP,
+    3: PieceType.ROOK,
+    4: PieceType.QUEEN,
+}
+_PROMOTION_CODES = {v: k for k, v in _PROMOTIONS.items()}
+
+# Polyglot encodes castling as "king takes own rook"
+_CASTLING_FROM_BOOK = {
+    (4, 7): 6, (4, 0): 2,        # e1h1 -> e1g1, e1a1 -> e1c1
+    (60, 63): 62, (60, 56): 58,  # e8h8 -> e8g8, e8a8 -> e8c8
+}
+_CASTLING_TO_BOOK = {(f, t): rook for (f, rook), t in _CASTLING_FROM_BOOK.items()}
+
+
+class BookEntry(NamedTuple):
+    """Raw book entry."""
+    key: int
+    raw_move: int
+    weight: int
+    learn: int
+
+
+def decode_move(raw: int) -> Tuple[int, int, Optional[PieceType]]:
+    """Decode a raw Polyglot move into (from_sq, to_sq, promotion)."""
+    to_sq = raw & 0x3F
+    from_sq = (raw >> 6) & 0x3F
+    promotion = _PROMOTIONS.get((raw >> 12) & 0x7)
+    return from_sq, to_sq, promotion
+
+
+def encode_move(move: object) -> int:
+    """Encode a core Move as a raw Polyglot move (inverse of decode_move)."""
+    from_sq = move.from_sq
+    to_sq = move.to_sq
+    if move.piece == PieceType.KING:
+        to_sq = _CASTLING_TO_BOOK.get((from_sq, to_sq), to_sq)
+    promo = _PROMOTION_CODES.get(move.promotion, 0) if move.promotion is not None else 0
+    return (promo << 12) | (from_sq << 6) | to_sq
+
+
+class PolyglotBook:
+    """Memory-mapped Polyglot opening book."""
+
+    def __init__(self, path: str):
+        """Open and memory-map `path`.
+
+        Args:
+            path: Polyglot .bin file
+
+        Raises:
+            OSError: if the file cannot be opened
+        """
+        self.path = path
+        self._fh = open(path, "rb")
+        size = os.fstat(self._fh.fileno()).st_size
+        if size:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # mmap refuses empty files; an empty book simply never hits
+            self._mm = b""
+        self._count = size // ENTRY_SIZE
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "PolyglotBook":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the mapping and the file handle."""
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._mm = b""
+        self._count = 0
+        self._fh.close()
+
+    # ------------------------------------------------------------
+    # Raw access
+    # ------------------------------------------------------------
+    def _key_at(self, index: int) -> int:
+        return _KEY_STRUCT.unpack_from(self._mm, index * ENTRY_SIZE)[0]
+
+    def _lower_bound(self, key: int) -> int:
+        lo, hi = 0, self._count
+        key_at = self._key_at
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def entries(self, key: int) -> Iterator[BookEntry]:
+        """Iterate over all entries stored for `key`."""
+        i = self._lower_bound(key)
+        mm = self._mm
+        while i < self._count:
+            entry = BookEntry(*ENTRY_STRUCT.unpack_from(mm, i * ENTRY_SIZE))
+            if entry.key != key:
+                break
+            yield entry
+            i += 1
+
+    # ------------------------------------------------------------
+    # Board-level API
+    # ------------------------------------------------------------
+    def find_all(self, board: object, minimum_weight: int = 1) -> List[Tuple[object, int]]:
+        """Return [(legal Move, weight)] for `board`, skipping unknown/illegal moves.
+
+        Args:
+            board: core Board
+            minimum_weight: entries with a lower weight are ignored
+        """
+        book = [e for e in self.entries(polyglot_key(board)) if e.weight >= minimum_weight]
+        if not book:
+            return []
+
+        legal = {}
+        for m in generate_legal_moves(board):
+            legal[(m.from_sq, m.to_sq, m.promotion)] = m
+
+        out: List[Tuple[object, int]] = []
+        for e in book:
+            from_sq, to_sq, promo = decode_move(e.raw_move)
+            cell = board.mailbox[from_sq]
+            if cell is not None and cell[1] == PieceType.KING:
+                to_sq = _CASTLING_FROM_BOOK.get((from_sq, to_sq), to_sq)
+            mv = legal.get((from_sq, to_sq, promo))
+            if mv is not None:
+                out.append((mv, e.weight))
+        return out
+
+    def choose_move(self, board: object, rng: Optional[random.Random] = None,
+                    minimum_weight: int = 1) -> Optional[object]:
+        """Pick a book move with probability proportional to its weight.
+
+        Returns:
+            A legal Move, or None when the position is not in the book.
+        """
+        candidates = self.find_all(board, minimum_weight=minimum_weight)
+        if not candidates:
+            return None
+        moves = [m for m, _ in candidates]
+        weights = [w for _, w in candidates]
+        return (rng or random).choices(moves, weights=weights, k=1)[0]
+
+
+def open_book(path: Optional[str]) -> Optional[PolyglotBook]:
+    """Open `path` as a book if it exists, otherwise return None."""
+    if not path or not os.path.exists(path):
+        return None
+    return PolyglotBook(path)
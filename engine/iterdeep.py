@@ -1,42 +1,116 @@
 """Iterative deepening driver that exposes `search_root`.
 
 Implements depth-increasing loop, time controller, PV extraction and stop support.
+
+`iter_search` is the streaming form: it yields one result dict per completed
+depth and stops when the consumer closes it (or breaks out of the loop).
+`aiter_search` wraps it for asyncio UIs; `search_root` returns its last item.
+
+MultiPV: with `multipv=K` each depth searches the root K times, excluding the
+best moves already found at that depth, so the result ranks the top K moves.
+All lines share one TT; `line_nodes` reports what each line cost.
+
+Mate search: `search_root(..., mate_in=N)` runs the df-pn solver from
+engine.search.mate instead of alpha-beta and returns the mating line.
+
+Statistics: with `stats=True` each depth runs the instrumented clones from
+engine.search.stats and the result carries `stats`, one dict per completed
+iteration (see SearchStats.as_dict); `stats_out` also receives each one as a
+JSON line. Without it the plain search functions run unchanged.
 """
-from typing import Any, Dict, List, Optional
-from .search.impl import alpha_beta, SearchState, build_pv_from_tt, SearchController
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, TextIO
+from .search.impl import alpha_beta, root_search, SearchState, build_pv_from_tt, SearchController
+from .search.mate import MateSolver
+from .search.stats import Instrumentation, to_json_line
+from .tt import EXACT
+from .utils.constants import MATE_SCORE, MAX_DEPTH
+import asyncio
 import time
 
 
-def search_root(board: Any, max_time_ms: Optional[int] = None, max_depth: Optional[int] = 4) -> Dict:
-    ctrl = SearchController()
-    state = SearchState()
+@dataclass
+class SearchLimits:
+    """Limits for one search; None means unlimited (max_depth=None: up to MAX_DEPTH)."""
+    max_time_ms: Optional[int] = None
+    max_depth: Optional[int] = 4
+    max_nodes: Optional[int] = None
+    multipv: int = 1
+    stats: bool = False
+
+
+def iter_search(
+    board: Any,
+    limits: Optional[SearchLimits] = None,
+    controller: Optional[SearchController] = None,
+    state: Optional[SearchState] = None,
+) -> Iterator[Dict]:
+    """Iterative deepening as a generator.
+
+    Yields after each completed depth a dict with best_move, score (side to
+    move, centipawns), depth, nodes, pv, nps, elapsed (seconds), multipv (a
+    ranked list of (move, score, pv), one per line) and line_nodes (nodes
+    spent on each line, summed over depths); with limits.stats also stats
+    (per-iteration statistics, see engine.search.stats). The board
+    is searched in place (make/unmake balanced); pass a copy if another
+    thread uses it.
+
+    Args:
+        board: position to search
+        limits: time/depth/node limits (time is enforced inside the search)
+        controller: shared SearchController; another thread may set `stop`
+            (or move `deadline`) to end the search early
+        state: SearchState kept by the caller across moves of one game
+            (TT/history are aged, not cleared); a fresh one if None
+    """
+    limits = limits if limits is not None else SearchLimits()
+    ctrl = controller if controller is not None else SearchController()
+    if state is None:
+        state = SearchState()
+    else:
+        state.new_search()
+    state.controller = ctrl
     start = time.time()
-    deadline = None if max_time_ms is None else start + max_time_ms / 1000.0
+    if limits.max_time_ms is not None:
+        ctrl.deadline = start + limits.max_time_ms / 1000.0
+    if limits.max_nodes is not None:
+        ctrl.max_nodes = limits.max_nodes
 
     best_move = None
-    best_score = 0
-    nodes = 0
-    depth_reached = 0
-    pv_line: List[object] = []
+    multipv = max(1, limits.multipv)
+    line_nodes: List[int] = []
+
+    # statistics switch: pick the function set once, not per node
+    ab, rs = alpha_beta, root_search
+    inst = None
+    stats: List[Dict] = []
+    if limits.stats:
+        inst = Instrumentation()
+        ab, rs = inst.alpha_beta, inst.root_search
 
     # root iterative loop
-    for depth in range(1, (max_depth or 1) + 1):
-        if deadline is not None and time.time() >= deadline:
+    last_depth = MAX_DEPTH if limits.max_depth is None else max(1, limits.max_depth)
+    for depth in range(1, last_depth + 1):
+        if ctrl.stop or (ctrl.deadline is not None and time.time() >= ctrl.deadline):
             break
+        lines = []
+        iter_nodes, iter_start = state.nodes, time.time()
+        if inst is not None:
+            inst.stats.reset()
         try:
-            # run search at this depth
-            state.controller = ctrl
-            score = alpha_beta(board, depth, -32000, 32000, state, ply=0)
+            if multipv > 1:
+                lines = _search_lines(board, depth, multipv, state, line_nodes, rs)
+            if lines:
+                score = lines[0][1]
+            else:
+                # run search at this depth
+                score = ab(board, depth, -32000, 32000, state, ply=0)
         except TimeoutError:
             break
         except Exception:
             # other errors shouldn't stop whole loop
             break
 
-        nodes = state.nodes
-        depth_reached = depth
-        best_score = score
-
         # probe TT at root for best move
         try:
             entry = state.tt.probe(getattr(board, 'zobrist_key', 0))
@@ -47,15 +121,176 @@ def search_root(board: Any, max_time_ms: Optional[int] = None, max_depth: Option
 
         # reconstruct PV from TT
         pv_line = build_pv_from_tt(board, state.tt, max_depth=depth)
+        if not lines:
+            lines = [(best_move, score, list(pv_line))]
+            line_nodes[:1] = [state.nodes]
+
+        res = _result(best_move, score, depth, state.nodes, pv_line, time.time() - start,
+                      lines, line_nodes)
+        if inst is not None:
+            prev = stats[-1]["nodes"] if stats else None
+            stats.append(inst.stats.as_dict(depth, state.nodes - iter_nodes, prev,
+                                             time.time() - iter_start))
+            res['stats'] = list(stats)
+        yield res
+
 
-        # time check
-        if deadline is not None and time.time() >= deadline:
+def _search_lines(board: Any, depth: int, multipv: int, state: SearchState,
+                  line_nodes: List[int], search=root_search) -> List:
+    """Search the `multipv` best root lines at `depth`, best first."""
+    lines = []
+    for k in range(multipv):
+        before = state.nodes
+        score, move = search(board, depth, state, exclude=[l[0] for l in lines])
+        if move is None:
             break
+        board.make_move(move)
+        try:
+            pv = [move] + build_pv_from_tt(board, state.tt, max_depth=depth - 1)
+        finally:
+            board.unmake_move()
+        lines.append((move, score, pv))
+        if len(line_nodes) <= k:
+            line_nodes.append(0)
+        line_nodes[k] += state.nodes - before
+    # a later line can come out above an earlier one when the TT sharpened it
+    lines.sort(key=lambda l: l[1], reverse=True)
+    if lines:
+        # root entry = best line, used for best_move/PV and by the next depth
+        state.tt.store(getattr(board, 'zobrist_key', 0), depth, lines[0][1], EXACT, lines[0][0])
+    return lines
+
+
+async def aiter_search(
+    board: Any,
+    limits: Optional[SearchLimits] = None,
+    controller: Optional[SearchController] = None,
+    state: Optional[SearchState] = None,
+) -> AsyncIterator[Dict]:
+    """Async wrapper around iter_search for event-loop UIs (Textual).
+
+    The search runs in the default executor; results are delivered as they
+    are produced. Leaving the `async for` early (break, task cancellation)
+    stops the search thread.
+    """
+    loop = asyncio.get_running_loop()
+    ctrl = controller if controller is not None else SearchController()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def _worker():
+        try:
+            for item in iter_search(board, limits, ctrl, state):
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    # Python 3.8 compatible: use run_in_executor instead of to_thread
+    fut = loop.run_in_executor(None, _worker)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        ctrl.stop = True
+        await asyncio.wait([fut])
+
+
+def search_root(
+    board: Any,
+    max_time_ms: Optional[int] = None,
+    max_depth: Optional[int] = 4,
+    max_nodes: Optional[int] = None,
+    controller: Optional[SearchController] = None,
+    on_iteration: Optional[Callable[[Dict], None]] = None,
+    state: Optional[SearchState] = None,
+    multipv: int = 1,
+    mate_in: Optional[int] = None,
+    stats: bool = False,
+    stats_out: Optional[TextIO] = None,
+) -> Dict:
+    """Search `board` and return the last iteration yielded by iter_search.
+
+    Args:
+        board: position to search (searched in place; make/unmake balanced)
+        max_time_ms: time budget; enforced inside the search, not only between depths
+        max_depth: last depth to search
+        max_nodes: node budget
+        controller: shared SearchController (see iter_search)
+        on_iteration: called with the result dict after each completed depth
+        state: persistent SearchState (see iter_search)
+        multipv: number of ranked root lines to return in `multipv`
+        mate_in: look only for a forced mate in at most this many moves
+            (df-pn solver; max_depth, multipv and state are not used)
+        stats: collect per-iteration search statistics into `stats`
+        stats_out: stream receiving each iteration's statistics as a JSON
+            line (implies stats)
+
+    Returns:
+        Dict with best_move, score, depth, nodes, pv, nps, elapsed, multipv
+        and line_nodes; depth 0 and best_move None if no iteration completed.
+        With mate_in, also `mate` (moves to mate, or None if no mate was
+        proven, in which case best_move is None). With stats, also `stats`.
+    """
+    if mate_in is not None:
+        res = _mate_search(board, mate_in, max_time_ms, max_nodes, controller)
+        if on_iteration is not None and res['best_move'] is not None:
+            on_iteration(res)
+        return res
+
+    limits = SearchLimits(max_time_ms=max_time_ms, max_depth=max_depth, max_nodes=max_nodes,
+                          multipv=multipv, stats=stats or stats_out is not None)
+    last = _result(None, 0, 0, 0, [], 0.0)
+    if limits.stats:
+        last['stats'] = []
+    for last in iter_search(board, limits, controller, state):
+        if stats_out is not None:
+            stats_out.write(to_json_line(last['stats'][-1]))
+            stats_out.flush()
+        if on_iteration is not None:
+            on_iteration(last)
+    return last
+
+
+def _mate_search(board, mate_in, max_time_ms, max_nodes, controller) -> Dict:
+    ctrl = controller if controller is not None else SearchController()
+    start = time.time()
+    if max_time_ms is not None:
+        ctrl.deadline = start + max_time_ms / 1000.0
+    if max_nodes is not None:
+        ctrl.max_nodes = max_nodes
+
+    solver = MateSolver(ctrl)
+    try:
+        found = solver.solve(board, mate_in)
+    except TimeoutError:
+        found = None
+    elapsed = time.time() - start
+
+    if not found or not found[0]:
+        res = _result(None, 0, 0, solver.nodes, [], elapsed)
+        res['mate'] = None
+        return res
+    line, moves = found
+    plies = 2 * moves - 1
+    score = MATE_SCORE - plies
+    res = _result(line[0], score, plies, solver.nodes, line, elapsed,
+                  [(line[0], score, list(line))], [solver.nodes])
+    res['mate'] = moves
+    return res
+
 
+def _result(best_move, score, depth, nodes, pv, elapsed, lines=(), line_nodes=()) -> Dict:
     return {
         'best_move': best_move,
-        'score': best_score,
-        'depth': depth_reached,
+        'score': score,
+        'depth': depth,
         'nodes': nodes,
-        'pv': pv_line,
+        'pv': list(pv),
+        'nps': int(nodes / elapsed) if elapsed > 0 else 0,
+        'elapsed': elapsed,
+        'multipv': list(lines),
+        'line_nodes': list(line_nodes),
     }
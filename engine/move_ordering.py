@@ -60,3 +60,11 @@ class HistoryTable:
         """
         key = getattr(move, 'uci', None) or repr(move)
         return self.table.get(key, 0)
+
+    def age(self, shift: int = 1) -> None:
+        """Decay all scores (divide by 2**shift) so older searches weigh less."""
+        self.table = {k: v >> shift for k, v in self.table.items() if v >> shift}
+
+    def clear(self) -> None:
+        """Remove all history."""
+        self.table.clear()
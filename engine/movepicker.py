@@ -47,6 +47,11 @@ class Killers:
             return (None, None)
         return tuple(self.killers[ply])
 
+    def clear(self) -> None:
+        """Forget all killers (they are only meaningful within one search)."""
+        for slot in self.killers:
+            slot[0] = slot[1] = None
+
 
 class MovePicker:
     """Orders and returns moves in priority order for search."""
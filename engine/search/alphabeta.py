@@ -106,7 +106,7 @@ def alpha_beta(board: Any, depth: int, alpha: int, beta: int, state: SearchState
     # Probe transposition table
     key = getattr(board, 'zobrist_key', None)
     if key is not None:
-        entry = state.tt.probe(key)
+        entry = state.tt.probe(key, ply)
         if entry is not None and entry.depth >= depth:
             if entry.flag == EXACT:
                 return entry.score
@@ -162,7 +162,7 @@ def alpha_beta(board: Any, depth: int, alpha: int, beta: int, state: SearchState
                     state.killers.add(ply, m)
             except Exception:
                 pass
-            state.tt.store(getattr(board, 'zobrist_key', 0), depth, score, LOWERBOUND, m)
+            state.tt.store(getattr(board, 'zobrist_key', 0), depth, score, LOWERBOUND, m, ply)
             return score
 
         if score > best_score:
@@ -173,6 +173,6 @@ def alpha_beta(board: Any, depth: int, alpha: int, beta: int, state: SearchState
 
     # Store result in transposition table
     flag = EXACT if best_score > alpha else UPPERBOUND
-    state.tt.store(getattr(board, 'zobrist_key', 0), depth, best_score, flag, best_move)
+    state.tt.store(getattr(board, 'zobrist_key', 0), depth, best_score, flag, best_move, ply)
 
     return best_score
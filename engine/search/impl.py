@@ -3,29 +3,66 @@
 Contains alpha_beta, quiescence, PV builder and search state classes.
 """
 from typing import Any, Optional, List
+import time
 from ..tt import TranspositionTable, TTEntry, EXACT, LOWERBOUND, UPPERBOUND
 from ..movepicker import MovePicker, Killers
 from ..move_ordering import HistoryTable
 from ..eval import evaluate
 from core.rules.game_status import get_game_status
+from core.moves.legal_movegen import generate_legal_moves
 from .pv import PVTable
 from .time_manager import TimeManager
 from ..utils.constants import MATE_SCORE
+from ..bitbase import probe_score
 
 
 class SearchController:
-    def __init__(self):
+    """Stop signal shared between the search and its driver.
+
+    `stop` may be set from another thread (e.g. UCI `stop`). Optional
+    `deadline` (time.time() based) and `max_nodes` are enforced by poll(),
+    which the search calls on every node.
+    """
+    def __init__(self, deadline: Optional[float] = None, max_nodes: Optional[int] = None):
         self.stop = False
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+
+    def poll(self, nodes: int) -> bool:
+        if self.stop:
+            return True
+        if self.max_nodes is not None and nodes >= self.max_nodes:
+            self.stop = True
+        elif self.deadline is not None and (nodes & 63) == 0 and time.time() >= self.deadline:
+            self.stop = True
+        return self.stop
 
 
 class SearchState:
-    def __init__(self):
-        self.tt = TranspositionTable()
+    """TT, killers, history and counters for a search.
+
+    A state may be reused for consecutive searches of the same game: call
+    new_search() before each one (ages TT/history) and reset() on a new game.
+    """
+    def __init__(self, tt_size_mb: int = 16):
+        self.tt = TranspositionTable(tt_size_mb)
         self.killers = Killers()
         self.history = HistoryTable()
         self.nodes = 0
         self.controller = SearchController()
 
+    def new_search(self) -> None:
+        self.tt.new_search()
+        self.history.age()
+        self.killers.clear()
+        self.nodes = 0
+
+    def reset(self) -> None:
+        self.tt.clear()
+        self.history.clear()
+        self.killers.clear()
+        self.nodes = 0
+
 
 def build_pv_from_tt(board: Any, tt: TranspositionTable, max_depth: int = 64) -> List[object]:
     pv = []
@@ -63,22 +100,32 @@ def build_pv_from_tt(board: Any, tt: TranspositionTable, max_depth: int = 64) ->
     return pv
 
 
+def _legal_moves(board: Any) -> List[object]:
+    """Legal moves from the board's own generator if it has one, else core movegen."""
+    gen = getattr(board, 'generate_legal_moves', None)
+    if gen is not None:
+        try:
+            return list(gen())
+        except Exception:
+            pass
+    return list(generate_legal_moves(board))
+
+
 def quiescence(board: Any, alpha: int, beta: int, state: SearchState, ply: int) -> int:
     state.nodes += 1
-    if state.controller.stop:
+    if state.controller.poll(state.nodes):
         raise TimeoutError()
 
+    # evaluate() is White-relative; negamax needs side-to-move relative scores
     stand_pat = evaluate(board)
+    if getattr(board, 'side_to_move', 0) == 1:
+        stand_pat = -stand_pat
     if stand_pat >= beta:
         return stand_pat
     if alpha < stand_pat:
         alpha = stand_pat
 
-    try:
-        moves = list(board.generate_legal_moves())
-    except Exception:
-        from core.moves.legal_movegen import generate_legal_moves as core_gen
-        moves = list(core_gen(board))
+    moves = _legal_moves(board)
 
     captures = [m for m in moves if getattr(m, 'is_capture', False)]
     mp = MovePicker(board, captures, ply=ply, tt_move=None, killers=state.killers, history=state.history)
@@ -115,11 +162,11 @@ def quiescence(board: Any, alpha: int, beta: int, state: SearchState, ply: int)
 
 def alpha_beta(board: Any, depth: int, alpha: int, beta: int, state: SearchState, ply: int = 0) -> int:
     state.nodes += 1
-    if state.controller.stop:
+    if state.controller.poll(state.nodes):
         raise TimeoutError()
 
     key = getattr(board, 'zobrist_key', 0)
-    entry = state.tt.probe(key)
+    entry = state.tt.probe(key, ply)
     if entry is not None and entry.depth >= depth:
         if entry.flag == EXACT:
             return entry.score
@@ -139,14 +186,16 @@ def alpha_beta(board: Any, depth: int, alpha: int, beta: int, state: SearchState
     except Exception:
         pass
 
+    if ply > 0:
+        # exact win/draw from the endgame bitbases (None when not covered)
+        known = probe_score(board, ply)
+        if known is not None:
+            return known
+
     if depth <= 0:
         return quiescence(board, alpha, beta, state, ply)
 
-    try:
-        moves = list(board.generate_legal_moves())
-    except Exception:
-        from core.moves.legal_movegen import generate_legal_moves as core_gen
-        moves = list(core_gen(board))
+    moves = _legal_moves(board)
 
     if not moves:
         if board.is_in_check(board.side_to_move):
@@ -185,9 +234,10 @@ def alpha_beta(board: Any, depth: int, alpha: int, beta: int, state: SearchState
             if not getattr(m, 'is_capture', False):
                 try:
                     state.killers.add(ply, m)
+                    state.history.add(m, depth)
                 except Exception:
                     pass
-            state.tt.store(key, depth, score, LOWERBOUND, m)
+            state.tt.store(key, depth, score, LOWERBOUND, m, ply)
             return score
 
         if score > best_score:
@@ -197,5 +247,47 @@ def alpha_beta(board: Any, depth: int, alpha: int, beta: int, state: SearchState
             alpha = score
 
     flag = EXACT if best_score > alpha else UPPERBOUND
-    state.tt.store(key, depth, best_score, flag, best_move)
+    state.tt.store(key, depth, best_score, flag, best_move, ply)
     return best_score
+
+
+def root_search(board: Any, depth: int, state: SearchState, exclude: Optional[List[object]] = None):
+    """Search the root moves except `exclude` (MultiPV); returns (score, move).
+
+    Unlike alpha_beta this never answers from the root TT entry, since that
+    entry describes the best line, which may be excluded. Returns (None, None)
+    when every legal move is excluded.
+    """
+    state.nodes += 1
+    if state.controller.poll(state.nodes):
+        raise TimeoutError()
+
+    exclude = exclude or []
+    moves = _legal_moves(board)
+    moves = [m for m in moves if m not in exclude]
+    if not moves:
+        return None, None
+
+    entry = state.tt.probe(getattr(board, 'zobrist_key', 0))
+    tt_move = entry.best_move if entry is not None and entry.best_move not in exclude else None
+    mp = MovePicker(board, moves, ply=0, tt_move=tt_move, killers=state.killers, history=state.history)
+
+    alpha, beta = -32000, 32000
+    best_score = -99999999
+    best_move = None
+    while True:
+        m = mp.next()
+        if m is None:
+            break
+        board.make_move(m)
+        try:
+            score = -alpha_beta(board, depth - 1, -beta, -alpha, state, 1)
+        finally:
+            board.unmake_move()
+        if score > best_score:
+            best_score = score
+            best_move = m
+        if score > alpha:
+            alpha = score
+
+    return best_score, best_move
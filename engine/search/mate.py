@@ -0,0 +1,213 @@
+"""Depth-first proof-number (df-pn) mate solver.
+
+Dedicated mate search used by `search_root(..., mate_in=N)` and UCI
+`go mate N`. It never calls evaluate() or the move picker: at attacker (OR)
+nodes only checking moves are tried, at defender (AND) nodes every evasion.
+A position is proven when every defence leads to mate within the bound.
+
+Nodes carry the (phi, delta) pair of the phi/delta formulation of df-pn
+(phi = proof number at OR nodes, disproof number at AND nodes). Entries are
+keyed by (zobrist key, plies left), which also makes cycles impossible
+because the remaining depth strictly decreases. The table is bounded: when
+full, unresolved entries are dropped and at most half of it is kept for
+solved ones (those with the most plies left first).
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.moves.legal_movegen import generate_legal_moves
+from .impl import SearchController
+
+INF = 10 ** 9
+
+# (phi, delta) of solved nodes, seen from the side to move at that node
+_OR_DISPROVEN = (INF, 0)
+_AND_PROVEN = (INF, 0)
+_AND_DISPROVEN = (0, INF)
+
+
+class MateSolver:
+    """df-pn search for a forced mate of the side to move.
+
+    Args:
+        controller: SearchController polled on every node (stop/deadline/nodes)
+        tt_size: max number of table entries before unresolved ones are dropped
+    """
+
+    def __init__(self, controller: Optional[SearchController] = None, tt_size: int = 1_000_000):
+        self.controller = controller if controller is not None else SearchController()
+        self.capacity = max(1, tt_size)
+        self.tt: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self.children: Dict[Tuple[int, int], Any] = {}
+        self.nodes = 0
+
+    def solve(self, board: Any, mate_in: int) -> Optional[Tuple[List[object], int]]:
+        """Return (mating line, moves to mate) for the shortest mate <= mate_in, else None.
+
+        Bounds are tried from 1 upwards so the first proof is the shortest
+        mate; the table is shared between bounds. Raises TimeoutError when
+        the controller stops the search.
+        """
+        for n in range(1, mate_in + 1):
+            plies = 2 * n - 1
+            phi, _ = self._mid(board, plies, INF, INF)
+            if phi == 0:
+                return self._line(board, plies), n
+        return None
+
+    # ------------------------------------------------------------
+    # df-pn
+    # ------------------------------------------------------------
+    def _mid(self, board: Any, plies: int, th_phi: int, th_delta: int) -> Tuple[int, int]:
+        self.nodes += 1
+        if self.controller.poll(self.nodes):
+            raise TimeoutError()
+
+        key = (board.zobrist_key, plies)
+        children = self._expand(board, key, plies)
+        if isinstance(children, tuple):
+            return children
+
+        while True:
+            phi = INF
+            delta = 0
+            best = -1
+            best_phi = 0
+            delta2 = INF
+            for i, (_, ckey) in enumerate(children):
+                c_phi, c_delta = self.tt.get(ckey, (1, 1))
+                delta += c_phi
+                if c_delta < phi:
+                    delta2 = phi
+                    phi = c_delta
+                    best = i
+                    best_phi = c_phi
+                elif c_delta < delta2:
+                    delta2 = c_delta
+            delta = min(delta, INF)
+
+            if phi >= th_phi or delta >= th_delta:
+                self._store(key, (phi, delta))
+                return phi, delta
+
+            move = children[best][0]
+            c_th_phi = min(INF, th_delta - delta + best_phi)
+            c_th_delta = min(th_phi, delta2 + 1)
+            board.make_move(move)
+            try:
+                self._mid(board, plies - 1, c_th_phi, c_th_delta)
+            finally:
+                board.unmake_move()
+
+    def _expand(self, board: Any, key: Tuple[int, int], plies: int, use_solved: bool = True):
+        """Children (move, child key) of a node, or its (phi, delta) if it is solved."""
+        solved = self.tt.get(key)
+        if use_solved and solved is not None and (solved[0] == 0 or solved[1] == 0):
+            return solved
+        children = self.children.get(key)
+        if children is not None:
+            return children
+
+        attacker = plies & 1
+        moves = list(generate_legal_moves(board))
+        if not moves:
+            if attacker:
+                result = _OR_DISPROVEN
+            elif board.is_in_check(board.side_to_move):
+                result = _AND_PROVEN
+            else:
+                result = _AND_DISPROVEN  # stalemate
+            self._store(key, result)
+            return result
+        if not attacker and plies == 0:
+            self._store(key, _AND_DISPROVEN)
+            return _AND_DISPROVEN
+
+        children = []
+        for m in moves:
+            board.make_move(m)
+            try:
+                if attacker:
+                    if not board.is_in_check(board.side_to_move):
+                        continue
+                    ckey = (board.zobrist_key, plies - 1)
+                    if not any(True for _ in generate_legal_moves(board)):
+                        # mate right away: no need to look any further
+                        self._store(ckey, _AND_PROVEN)
+                        children = [(m, ckey)]
+                        break
+                    if plies == 1:
+                        continue  # last attacker move must mate
+                else:
+                    ckey = (board.zobrist_key, plies - 1)
+            finally:
+                board.unmake_move()
+            children.append((m, ckey))
+
+        if not children:
+            self._store(key, _OR_DISPROVEN)
+            return _OR_DISPROVEN
+        self.children[key] = children
+        return children
+
+    def _store(self, key: Tuple[int, int], value: Tuple[int, int]) -> None:
+        if len(self.tt) >= self.capacity:
+            # keep proofs/disproofs, drop work-in-progress numbers and move lists
+            solved = [(k, v) for k, v in self.tt.items() if v[0] == 0 or v[1] == 0]
+            if len(solved) > self.capacity // 2:
+                # results with more plies left cost the most to recompute
+                solved.sort(key=lambda kv: kv[0][1], reverse=True)
+                solved = solved[:self.capacity // 2]
+            self.tt = dict(solved)
+            self.children.clear()
+        self.tt[key] = value
+
+    # ------------------------------------------------------------
+    # Mating line
+    # ------------------------------------------------------------
+    def _line(self, board: Any, plies: int) -> List[object]:
+        """Follow proven children from the root.
+
+        The attacker plays any move proven within the remaining plies; the
+        defender plays the reply that delays mate longest, so the line is
+        the main line of the mate rather than an arbitrary branch.
+        """
+        line: List[object] = []
+        try:
+            while plies > 0:
+                key = (board.zobrist_key, plies)
+                children = self._expand(board, key, plies, use_solved=False)
+                if isinstance(children, tuple):
+                    break
+                pick = None
+                if plies & 1:
+                    for m, ckey in children:
+                        if self.tt.get(ckey, (1, 1))[1] == 0:
+                            pick = m
+                            break
+                    next_plies = plies - 1
+                else:
+                    next_plies = -1
+                    for m, _ in children:
+                        board.make_move(m)
+                        try:
+                            p = self._mate_plies(board, plies - 1)
+                        finally:
+                            board.unmake_move()
+                        if p is not None and p > next_plies:
+                            pick, next_plies = m, p
+                if pick is None:
+                    break
+                board.make_move(pick)
+                line.append(pick)
+                plies = next_plies
+        finally:
+            for _ in line:
+                board.unmake_move()
+        return line
+
+    def _mate_plies(self, board: Any, max_plies: int) -> Optional[int]:
+        """Shortest mate (in plies) for the side to move, up to max_plies."""
+        for p in range(1, max_plies + 1, 2):
+            if self._mid(board, p, INF, INF)[0] == 0:
+                return p
+        return None
@@ -0,0 +1,206 @@
+"""Optional search statistics for tuning.
+
+Collected per iteration: nodes, qnodes, TT probes/hits/cutoffs/stores, beta
+cutoffs and the share of them produced by the first move searched, eval,
+game-status and movegen calls, the effective branching factor and the time
+spent in eval, movegen, TT and quiescence.
+
+Zero cost when disabled: alpha_beta/quiescence/root_search in impl contain no
+statistics code at all. `Instrumentation` builds clones of those functions
+(same bytecode) whose module globals point at counting wrappers of evaluate,
+get_game_status, the movegen helper, MovePicker and the recursive calls
+themselves, so the choice is made once per search by iter_search, never per
+node. state.tt is wrapped only while an instrumented call runs.
+"""
+import json
+import time
+from types import FunctionType
+from typing import Any, Dict, List, Optional
+
+from ..tt import LOWERBOUND
+from . import impl
+
+PHASES = ("eval", "movegen", "tt", "quiescence")
+
+
+class SearchStats:
+    """Counters of one iteration (see Instrumentation)."""
+
+    COUNTERS = ("qnodes", "tt_probes", "tt_hits", "tt_cutoffs", "tt_stores",
+                "beta_cutoffs", "first_move_cutoffs", "eval_calls", "movegen_calls",
+                "game_status_calls")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.time = dict.fromkeys(PHASES, 0.0)
+
+    def as_dict(self, depth: int, nodes: int, prev_nodes: Optional[int], elapsed: float) -> Dict:
+        """JSON-ready summary; `nodes` and `prev_nodes` are whole-iteration node counts."""
+        d: Dict[str, Any] = {"depth": depth, "nodes": nodes}
+        for name in self.COUNTERS:
+            d[name] = getattr(self, name)
+        d["tt_hit_rate"] = round(self.tt_hits / self.tt_probes, 4) if self.tt_probes else 0.0
+        d["first_move_cutoff_rate"] = (round(self.first_move_cutoffs / self.beta_cutoffs, 4)
+                                       if self.beta_cutoffs else 0.0)
+        d["ebf"] = round(nodes / prev_nodes, 3) if prev_nodes else None
+        d["time"] = {k: round(v, 6) for k, v in self.time.items()}
+        d["time"]["total"] = round(elapsed, 6)
+        return d
+
+
+class _CountingTT:
+    """TT wrapper counting probes, hits and stores; everything else is delegated."""
+
+    def __init__(self, tt, stats: SearchStats, frames: List):
+        self._tt = tt
+        self._stats = stats
+        self._frames = frames
+
+    def probe(self, key, ply=0):
+        t0 = time.perf_counter()
+        entry = self._tt.probe(key, ply)
+        s = self._stats
+        s.time["tt"] += time.perf_counter() - t0
+        s.tt_probes += 1
+        if entry is not None:
+            s.tt_hits += 1
+        return entry
+
+    def store(self, key, depth, score, flag, move=None, ply=0):
+        s = self._stats
+        s.tt_stores += 1
+        if flag == LOWERBOUND and self._frames:
+            # alpha_beta stores LOWERBOUND exactly when a move fails high
+            s.beta_cutoffs += 1
+            picker = self._frames[-1]
+            if picker is not None and picker.yielded == 1:
+                s.first_move_cutoffs += 1
+        t0 = time.perf_counter()
+        self._tt.store(key, depth, score, flag, move, ply)
+        s.time["tt"] += time.perf_counter() - t0
+
+    def __getattr__(self, name):
+        return getattr(self._tt, name)
+
+
+class Instrumentation:
+    """Counting clones of the search functions sharing one SearchStats.
+
+    `alpha_beta` and `root_search` have the signatures of their impl
+    counterparts and may be used in their place.
+    """
+
+    def __init__(self):
+        self.stats = SearchStats()
+        # one entry per active alpha_beta/quiescence node: its MovePicker
+        self._frames: List = []
+        self._qdepth = 0
+        g = dict(impl.__dict__)
+        stats, frames = self.stats, self._frames
+
+        def evaluate(board, *args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return impl.evaluate(board, *args, **kwargs)
+            finally:
+                stats.eval_calls += 1
+                stats.time["eval"] += time.perf_counter() - t0
+
+        def get_game_status(board, *args, **kwargs):
+            stats.game_status_calls += 1
+            return impl.get_game_status(board, *args, **kwargs)
+
+        class MovePicker(impl.MovePicker):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.yielded = 0
+                if frames:
+                    frames[-1] = self
+
+            def next(self):
+                m = super().next()
+                if m is not None:
+                    self.yielded += 1
+                return m
+
+        def _legal_moves(board):
+            t0 = time.perf_counter()
+            try:
+                return impl._legal_moves(board)
+            finally:
+                stats.movegen_calls += 1
+                stats.time["movegen"] += time.perf_counter() - t0
+
+        raw_ab = _clone(impl.alpha_beta, g)
+        raw_q = _clone(impl.quiescence, g)
+
+        def alpha_beta(board, depth, alpha, beta, state, ply=0):
+            calls = stats.game_status_calls
+            frames.append(None)
+            try:
+                score = raw_ab(board, depth, alpha, beta, state, ply)
+            finally:
+                frames.pop()
+            if stats.game_status_calls == calls:
+                # returned before the game-status check: answered by the TT
+                stats.tt_cutoffs += 1
+            return score
+
+        def quiescence(board, alpha, beta, state, ply):
+            stats.qnodes += 1
+            frames.append(None)
+            outer = self._qdepth == 0
+            self._qdepth += 1
+            t0 = time.perf_counter() if outer else 0.0
+            try:
+                return raw_q(board, alpha, beta, state, ply)
+            finally:
+                self._qdepth -= 1
+                frames.pop()
+                if outer:
+                    stats.time["quiescence"] += time.perf_counter() - t0
+
+        g.update(evaluate=evaluate, get_game_status=get_game_status, MovePicker=MovePicker,
+                 _legal_moves=_legal_moves,
+                 alpha_beta=alpha_beta, quiescence=quiescence)
+        self._alpha_beta = alpha_beta
+        self._root_search = _clone(impl.root_search, g)
+
+    def alpha_beta(self, board: Any, depth: int, alpha: int, beta: int, state: Any, ply: int = 0) -> int:
+        with _Attached(self, state):
+            return self._alpha_beta(board, depth, alpha, beta, state, ply)
+
+    def root_search(self, board: Any, depth: int, state: Any, exclude: Optional[List[object]] = None):
+        with _Attached(self, state):
+            return self._root_search(board, depth, state, exclude)
+
+
+class _Attached:
+    """Wrap state.tt in a counting TT for the duration of one call."""
+
+    def __init__(self, inst: Instrumentation, state: Any):
+        self.inst, self.state = inst, state
+
+    def __enter__(self):
+        self.tt = self.state.tt
+        self.state.tt = _CountingTT(self.tt, self.inst.stats, self.inst._frames)
+        return self
+
+    def __exit__(self, *exc):
+        self.state.tt = self.tt
+        return False
+
+
+def _clone(fn: FunctionType, g: Dict) -> FunctionType:
+    out = FunctionType(fn.__code__, g, fn.__name__, fn.__defaults__, fn.__closure__)
+    out.__kwdefaults__ = fn.__kwdefaults__
+    out.__doc__ = fn.__doc__
+    return out
+
+
+def to_json_line(stats: Dict) -> str:
+    return json.dumps({"stats": True, **stats}) + "\n"
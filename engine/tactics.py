@@ -0,0 +1,197 @@
+"""Tactical test-suite harness (WAC/ECM style EPD suites).
+
+Usage:
+  python -m engine.tactics                                  # bundled suite
+  python -m engine.tactics wac.epd --nodes 200000 --out run.json
+  python -m engine.tactics wac.epd --movetime 5000 --compare base.json
+
+Each EPD record needs a `bm` (best move) and/or `am` (avoid move) operation
+in SAN. A position counts as solved when the move reported by the last
+completed iteration satisfies them. Time to solution is measured at the
+iteration from which the search kept reporting a correct move until the
+end, so a move found at depth 2, dropped at depth 3 and found again at
+depth 5 is credited at depth 5.
+
+The JSON report (--out) holds per-position results, the solved count and a
+time-to-solution distribution; --compare prints the difference against a
+previous report so search changes can be judged commit to commit.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+from core.batch import iter_positions, run_pool
+from core.board.board import Board
+from core.moves.san import parse_san
+from .iterdeep import SearchLimits, iter_search
+
+DEFAULT_SUITE = os.path.join(os.path.dirname(__file__), "data", "tactics.epd")
+
+# upper bounds (seconds) of the time-to-solution histogram buckets
+HISTOGRAM_BUCKETS = (0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+def _moves(board: Board, sans: List[str]) -> List[str]:
+    """UCI strings of the SAN moves in `sans`; raises ValueError if one is illegal."""
+    return [parse_san(board, san).to_uci() for san in sans]
+
+
+def solve_position(index: int, fen: str, ops: Dict[str, List[str]], limits: SearchLimits) -> dict:
+    """Run one suite position and record when the correct move was found and kept."""
+    record = {"index": index, "id": " ".join(ops.get("id", [])) or str(index), "fen": fen}
+    if "error" in ops:
+        record.update({"error": ops["error"][0], "solved": False})
+        return record
+    try:
+        board = Board.from_fen(fen)
+        best = _moves(board, ops.get("bm", []))
+        avoid = _moves(board, ops.get("am", []))
+    except Exception as exc:
+        record.update({"error": str(exc), "solved": False})
+        return record
+    if not best and not avoid:
+        record.update({"error": "no bm/am operation", "solved": False})
+        return record
+
+    def correct(uci: Optional[str]) -> bool:
+        if uci is None or uci in avoid:
+            return False
+        return not best or uci in best
+
+    start = time.perf_counter()
+    found = None
+    last = None
+    for it in iter_search(board, limits):
+        last = it
+        uci = it["best_move"].to_uci() if it["best_move"] is not None else None
+        if not correct(uci):
+            found = None
+        elif found is None:
+            found = {"depth": it["depth"], "nodes": it["nodes"],
+                     "seconds": round(time.perf_counter() - start, 6)}
+
+    move = last["best_move"].to_uci() if last and last["best_move"] is not None else None
+    record.update({
+        "bm": best,
+        "am": avoid,
+        "move": move,
+        "solved": found is not None,
+        "depth": last["depth"] if last else 0,
+        "nodes": last["nodes"] if last else 0,
+        "seconds": round(time.perf_counter() - start, 6),
+        "found": found,
+    })
+    return record
+
+
+def _solve_args(args: Tuple[int, str, Dict[str, List[str]], SearchLimits]) -> dict:
+    return solve_position(*args)
+
+
+def run_suite(stream: Iterable[str], limits: SearchLimits, workers: int = 1) -> List[dict]:
+    """Solve every position of `stream`; results in input order."""
+    jobs = ((i, fen, ops, limits) for i, fen, ops in iter_positions(stream))
+    return list(run_pool(_solve_args, jobs, workers))
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def summarize(results: List[dict]) -> dict:
+    """Solved count and time-to-solution distribution of a suite run."""
+    times = [r["found"]["seconds"] for r in results if r.get("solved")]
+    nodes = [r["found"]["nodes"] for r in results if r.get("solved")]
+    histogram = {f"<={u:g}s": 0 for u in HISTOGRAM_BUCKETS}
+    histogram[f">{HISTOGRAM_BUCKETS[-1]:g}s"] = 0
+    for t in times:
+        for u in HISTOGRAM_BUCKETS:
+            if t <= u:
+                histogram[f"<={u:g}s"] += 1
+                break
+        else:
+            histogram[f">{HISTOGRAM_BUCKETS[-1]:g}s"] += 1
+
+    summary = {
+        "positions": len(results),
+        "solved": len(times),
+        "errors": sum(1 for r in results if "error" in r),
+        "histogram": histogram,
+    }
+    if times:
+        summary["time_to_solution"] = {
+            "mean": round(sum(times) / len(times), 6),
+            "median": round(_percentile(times, 0.5), 6),
+            "p90": round(_percentile(times, 0.9), 6),
+            "max": round(max(times), 6),
+        }
+        summary["nodes_to_solution"] = {
+            "mean": int(sum(nodes) / len(nodes)),
+            "median": int(_percentile(nodes, 0.5)),
+            "max": max(nodes),
+        }
+    return summary
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Difference between two reports: solved delta and positions that changed status."""
+    before = {r["id"]: r.get("solved", False) for r in baseline.get("results", [])}
+    after = {r["id"]: r.get("solved", False) for r in report.get("results", [])}
+    return {
+        "solved_delta": report["summary"]["solved"] - baseline["summary"]["solved"],
+        "newly_solved": sorted(k for k, v in after.items() if v and not before.get(k, False)),
+        "newly_failed": sorted(k for k, v in after.items() if not v and before.get(k, False)),
+    }
+
+
+def main(argv: Optional[List[str]] = None, out: TextIO = sys.stdout) -> int:
+    p = argparse.ArgumentParser(description="Tactical EPD suite (bm/am) benchmark")
+    p.add_argument("suite", nargs="?", default=DEFAULT_SUITE, help="EPD file ('-' for stdin)")
+    p.add_argument("--depth", type=int, default=3, help="max depth per position")
+    p.add_argument("--nodes", type=int, default=None, help="node cap per position")
+    p.add_argument("--movetime", type=int, default=None, help="time cap per position (ms)")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--out", help="write the JSON report to this file")
+    p.add_argument("--compare", help="previous JSON report to compare against")
+    args = p.parse_args(argv)
+
+    limits = SearchLimits(max_time_ms=args.movetime, max_depth=args.depth, max_nodes=args.nodes)
+
+    stream = sys.stdin if args.suite == "-" else open(args.suite, "r", encoding="utf-8")
+    try:
+        results = run_suite(stream, limits, args.workers)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    for r in results:
+        out.write(json.dumps(r) + "\n")
+    report = {
+        "suite": args.suite,
+        "limits": {"depth": args.depth, "nodes": args.nodes, "movetime_ms": args.movetime},
+        "summary": summarize(results),
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            report["compare"] = compare(report, json.load(fh))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    tail = {"summary": True, **report["summary"]}
+    if "compare" in report:
+        tail["compare"] = report["compare"]
+    out.write(json.dumps(tail) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
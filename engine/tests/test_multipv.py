@@ -0,0 +1,31 @@
+from core.board.board import Board
+from engine import search_root
+
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+
+
+def test_multipv_returns_ranked_distinct_lines():
+    b = Board.from_fen(MATE_IN_ONE)
+    key = b.zobrist_key
+    res = search_root(b, max_depth=2, multipv=3)
+    assert b.zobrist_key == key and not b._state_stack
+
+    lines = res["multipv"]
+    assert len(lines) == 3 == len(res["line_nodes"])
+    moves = [m for m, _, _ in lines]
+    assert len(set(moves)) == 3
+    assert moves[0].to_uci() == "a1a8" == res["best_move"].to_uci()
+    scores = [s for _, s, _ in lines]
+    assert scores == sorted(scores, reverse=True)
+    assert all(pv[0] == m for m, _, pv in lines)
+    # extra lines cost extra nodes, and the cost is accounted per line
+    assert sum(res["line_nodes"]) <= res["nodes"]
+    assert res["nodes"] > search_root(b, max_depth=2)["nodes"]
+
+
+def test_multipv_capped_by_legal_moves():
+    # black king on h8 facing Kg6: Kg8 is the only legal move
+    b = Board.from_fen("7k/8/6K1/8/8/8/8/8 b - - 0 1")
+    res = search_root(b, max_depth=1, multipv=10)
+    assert [m.to_uci() for m, _, _ in res["multipv"]] == ["h8g8"]
+    assert search_root(Board(), max_depth=1)["multipv"][0][0] is not None
@@ -10,3 +10,78 @@ def test_tt_store_and_probe():
     assert e is not None
     assert e.score == 100
     assert e.best_move == 'e2e4'
+
+
+def test_tt_generation_aging_and_replacement():
+    tt = TranspositionTable(size_mb=1)
+    tt.capacity = 4
+    tt.store(1, depth=6, score=10, flag=EXACT, best_move='a')
+    tt.new_search()
+    # deeper entry from an older generation is replaceable by a shallower one
+    tt.store(1, depth=2, score=20, flag=EXACT, best_move='b')
+    assert tt.probe(1).score == 20
+    assert tt.probe(1).generation == tt.generation
+
+    for k in range(2, 8):
+        tt.store(k, depth=1, score=0, flag=EXACT, best_move=None)
+    tt.new_search()
+    tt.new_search()
+    # over capacity: everything older than the previous generation is dropped
+    assert len(tt.table) <= tt.capacity
+
+    tt.clear()
+    assert tt.generation == 0 and tt.probe(1) is None
+
+
+def test_tt_store_keeps_the_table_within_capacity():
+    tt = TranspositionTable(size_mb=1)
+    tt.capacity = 8
+    for k in range(100):
+        tt.store(k, depth=k % 3, score=0, flag=EXACT, best_move=None)
+    assert len(tt.table) <= tt.capacity
+    # deep entries of the current search survive a flood of shallow ones
+    tt.store(1000, depth=10, score=7, flag=EXACT, best_move=None)
+    for k in range(200, 300):
+        tt.store(k, depth=0, score=0, flag=EXACT, best_move=None)
+    assert len(tt.table) <= tt.capacity
+    assert tt.probe(1000).score == 7
+    # ... but not those of an older search
+    tt.new_search()
+    for k in range(300, 320):
+        tt.store(k, depth=0, score=0, flag=EXACT, best_move=None)
+    assert tt.probe(1000) is None
+
+
+def test_tt_mate_scores_are_relative_to_the_node():
+    from engine.utils.constants import MATE_SCORE
+
+    tt = TranspositionTable()
+    # found at ply 3 of the first search: mated 5 plies from the root
+    tt.store(1, depth=4, score=-MATE_SCORE + 5, flag=EXACT, best_move=None, ply=3)
+    tt.store(2, depth=4, score=MATE_SCORE - 6, flag=EXACT, best_move=None, ply=3)
+    tt.store(3, depth=4, score=150, flag=EXACT, best_move=None, ply=3)
+    # probed at ply 1 of a later search: still mate 2/3 plies below the node
+    assert tt.probe(1, ply=1).score == -MATE_SCORE + 3
+    assert tt.probe(2, ply=1).score == MATE_SCORE - 4
+    assert tt.probe(3, ply=1).score == 150
+    assert tt.probe(1, ply=3).score == -MATE_SCORE + 5
+
+
+def test_persistent_state_reuses_tt_between_searches():
+    from core.board.board import Board
+    from engine import search_root
+    from engine.search.impl import SearchState
+
+    state = SearchState()
+    b = Board()
+    first = search_root(b, max_depth=2, state=state)
+    gen = state.tt.generation
+    again = search_root(b, max_depth=2, state=state)
+
+    assert state.tt.generation == gen + 1
+    assert again["best_move"] == first["best_move"]
+    # root is answered from the TT written by the previous search
+    assert again["nodes"] < first["nodes"]
+
+    state.reset()
+    assert not state.tt.table and not state.history.table
@@ -1,11 +1,19 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional, Dict
 
+from engine.utils.constants import MATE_SCORE
+
 
 EXACT = 0
 LOWERBOUND = 1
 UPPERBOUND = 2
 
+# rough per-entry footprint of a dict slot + TTEntry instance (bytes)
+_ENTRY_BYTES = 200
+
+# scores beyond this are mates (MATE_SCORE minus at most MAX_PLY plies)
+MATE_BOUND = MATE_SCORE - 1000
+
 
 @dataclass
 class TTEntry:
@@ -14,22 +22,93 @@ class TTEntry:
     score: int
     flag: int
     best_move: Optional[object]
+    generation: int = 0
 
 
 class TranspositionTable:
-    """Simple transposition table using a dict keyed by zobrist key."""
+    """Simple transposition table using a dict keyed by zobrist key.
+
+    Entries are tagged with the search generation that wrote them. A table
+    reused across moves calls new_search() before each search: entries from
+    older generations are always replaceable, and once the table exceeds its
+    size budget the oldest generations are dropped. store() also keeps the
+    table within its budget during a search: a new key evicts the oldest
+    inserted entry unless that one is from the current search and deeper.
+
+    Mate scores are stored as distance from the stored node (`ply` is the
+    node's distance from the root), so a probe from another root or another
+    path returns the mate distance from the probing node.
+    """
 
     def __init__(self, size_mb: int = 16):
         self.table: Dict[int, TTEntry] = {}
+        self.generation = 0
+        self.capacity = max(1, size_mb * 1024 * 1024 // _ENTRY_BYTES)
 
-    def probe(self, key: int) -> Optional[TTEntry]:
-        return self.table.get(key)
+    def probe(self, key: int, ply: int = 0) -> Optional[TTEntry]:
+        entry = self.table.get(key)
+        if entry is not None and abs(entry.score) >= MATE_BOUND:
+            return replace(entry, score=score_from_tt(entry.score, ply))
+        return entry
 
-    def store(self, key: int, depth: int, score: int, flag: int, best_move: Optional[object]):
+    def store(self, key: int, depth: int, score: int, flag: int, best_move: Optional[object], ply: int = 0):
         entry = self.table.get(key)
-        # Replace if deeper or not present
-        if entry is None or depth >= entry.depth:
-            self.table[key] = TTEntry(key=key, depth=depth, score=score, flag=flag, best_move=best_move)
+        if entry is None:
+            if len(self.table) >= self.capacity and not self._make_room(depth):
+                return
+        # Replace if deeper, stale (older search) or not present
+        elif depth < entry.depth and entry.generation == self.generation:
+            return
+        self.table[key] = TTEntry(key=key, depth=depth, score=score_to_tt(score, ply), flag=flag,
+                                  best_move=best_move, generation=self.generation)
+
+    def _make_room(self, depth: int) -> bool:
+        """Evict the oldest inserted entry for a new one of `depth`; False to skip the store.
+
+        An entry of the current search deeper than the new one is kept: it
+        moves to the back of the queue and the new entry is dropped.
+        """
+        oldest = next(iter(self.table))
+        victim = self.table.pop(oldest)
+        if victim.generation == self.generation and victim.depth > depth:
+            self.table[oldest] = victim
+            return False
+        return True
+
+    def new_search(self) -> None:
+        """Start a new generation and age out old entries when over budget."""
+        self.generation += 1
+        if len(self.table) <= self.capacity:
+            return
+        # keep the previous search (most likely still relevant), drop older ones
+        keep_from = self.generation - 1
+        self.table = {k: e for k, e in self.table.items() if e.generation >= keep_from}
+        if len(self.table) > self.capacity:
+            # still too big: keep only the deepest entries
+            entries = sorted(self.table.values(), key=lambda e: e.depth, reverse=True)
+            self.table = {e.key: e for e in entries[:self.capacity]}
+
+    def resize(self, size_mb: int) -> None:
+        self.capacity = max(1, size_mb * 1024 * 1024 // _ENTRY_BYTES)
 
     def clear(self):
         self.table.clear()
+        self.generation = 0
+
+
+def score_to_tt(score: int, ply: int) -> int:
+    """Mate score relative to the root -> relative to the node at `ply`."""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score: int, ply: int) -> int:
+    """Inverse of score_to_tt for a node probed at `ply`."""
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
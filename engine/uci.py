@@ -0,0 +1,326 @@
+"""UCI protocol front-end for the engine.
+
+Usage:
+  python -m engine.uci
+
+Supported commands: uci, isready, ucinewgame, setoption (Hash, Threads, Ponder,
+MultiPV),
+position [startpos | fen <fen>] [moves ...], go [depth N] [nodes N] [movetime MS]
+[wtime MS] [btime MS] [winc MS] [binc MS] [movestogo N] [mate N] [infinite]
+[ponder], stop, ponderhit, quit.
+
+`go mate N` runs the df-pn mate solver; if it proves no mate within N moves
+the normal search runs with the remaining limits.
+
+The search runs on a worker thread; `stop` sets the shared SearchController
+flag, which the search polls on every node, so it returns within one node.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, TextIO
+
+from core.board.board import Board
+from core.moves.legal_movegen import generate_legal_moves
+from .iterdeep import search_root
+from .search.impl import SearchController, SearchState
+from .utils.constants import MATE_SCORE, MAX_DEPTH
+
+ENGINE_NAME = "Xadrez_AI_Final"
+ENGINE_AUTHOR = "Xadrez_AI_Final developers"
+
+# keep a margin for GUI/process latency when converting clock time to a budget
+MOVE_OVERHEAD_MS = 30
+
+
+def find_move(board: Board, uci: str) -> Optional[object]:
+    """Return the legal Move whose UCI string is `uci`, or None."""
+    uci = uci.lower()
+    for m in generate_legal_moves(board):
+        if m.to_uci() == uci:
+            return m
+    return None
+
+
+def format_score(score: int) -> str:
+    """UCI score token: `cp N` or `mate N` (moves, negative when being mated)."""
+    if abs(score) >= MATE_SCORE - MAX_DEPTH * 2:
+        plies = MATE_SCORE - abs(score)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score}"
+
+
+def parse_go(tokens: List[str]) -> Dict[str, int]:
+    """Parse `go` arguments into a dict (flags map to 1)."""
+    params: Dict[str, int] = {}
+    flags = {"infinite", "ponder"}
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok in flags:
+            params[tok] = 1
+            i += 1
+        elif i + 1 < len(tokens):
+            try:
+                params[tok] = int(tokens[i + 1])
+            except ValueError:
+                pass
+            i += 2
+        else:
+            i += 1
+    return params
+
+
+def allocate_time_ms(params: Dict[str, int], white_to_move: bool) -> Optional[int]:
+    """Time budget for this move from `go` parameters; None means no time limit."""
+    if "movetime" in params:
+        return max(1, params["movetime"] - MOVE_OVERHEAD_MS)
+
+    clock = params.get("wtime" if white_to_move else "btime")
+    if clock is None:
+        return None
+    inc = params.get("winc" if white_to_move else "binc", 0)
+    moves_to_go = params.get("movestogo", 30)
+
+    budget = clock / max(1, moves_to_go) + inc * 0.75
+    # never plan to use more than half of what is left on the clock
+    budget = min(budget, clock / 2)
+    return max(1, int(budget) - MOVE_OVERHEAD_MS)
+
+
+class UCIEngine:
+    """UCI state machine. Feed lines to handle(); output goes to `out`."""
+
+    def __init__(self, out: TextIO = sys.stdout):
+        self.out = out
+        self._out_lock = threading.Lock()
+        self.board = Board()
+        self.options = {"Hash": 16, "Threads": 1, "Ponder": False, "MultiPV": 1}
+        # TT/history survive between `go`s of one game; reset by ucinewgame
+        self.state = SearchState(self.options["Hash"])
+
+        self._thread: Optional[threading.Thread] = None
+        self._controller: Optional[SearchController] = None
+        # set by stop/ponderhit: lets an infinite/ponder search report bestmove
+        self._release = threading.Event()
+        self._pondering = False
+        self._infinite = False
+        self._ponder_budget_ms: Optional[int] = None
+
+    # ------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------
+    def send(self, line: str) -> None:
+        with self._out_lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    # ------------------------------------------------------------
+    # Command dispatch
+    # ------------------------------------------------------------
+    def handle(self, line: str) -> bool:
+        """Process one command line. Returns False when the engine should quit."""
+        tokens = line.strip().split()
+        if not tokens:
+            return True
+        cmd, args = tokens[0], tokens[1:]
+
+        if cmd == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send("option name Hash type spin default 16 min 1 max 4096")
+            self.send("option name Threads type spin default 1 min 1 max 64")
+            self.send("option name Ponder type check default false")
+            self.send("option name MultiPV type spin default 1 min 1 max 256")
+            self.send("uciok")
+        elif cmd == "isready":
+            self.send("readyok")
+        elif cmd == "ucinewgame":
+            self.stop_search()
+            self.board = Board()
+            self.state.reset()
+        elif cmd == "setoption":
+            self.stop_search()
+            self._setoption(args)
+            self.state.tt.resize(self.options["Hash"])
+        elif cmd == "position":
+            self.stop_search()
+            self._position(args)
+        elif cmd == "go":
+            self.stop_search()
+            self._go(args)
+        elif cmd == "stop":
+            self.stop_search()
+        elif cmd == "ponderhit":
+            self._ponderhit()
+        elif cmd == "quit":
+            self.stop_search()
+            return False
+        return True
+
+    def _setoption(self, args: List[str]) -> None:
+        # setoption name <id> [value <x>]
+        if "name" not in args:
+            return
+        rest = args[args.index("name") + 1:]
+        if "value" in rest:
+            k = rest.index("value")
+            name, value = " ".join(rest[:k]), " ".join(rest[k + 1:])
+        else:
+            name, value = " ".join(rest), ""
+
+        for key in self.options:
+            if key.lower() == name.lower():
+                if isinstance(self.options[key], bool):
+                    self.options[key] = value.lower() == "true"
+                else:
+                    try:
+                        self.options[key] = max(1, int(value))
+                    except ValueError:
+                        pass
+                return
+
+    def _position(self, args: List[str]) -> None:
+        if not args:
+            return
+        if "moves" in args:
+            k = args.index("moves")
+            spec, moves = args[:k], args[k + 1:]
+        else:
+            spec, moves = args, []
+
+        if spec[0] == "startpos":
+            board = Board()
+        elif spec[0] == "fen":
+            try:
+                board = Board.from_fen(" ".join(spec[1:]))
+            except Exception:
+                self.send(f"info string invalid fen: {' '.join(spec[1:])}")
+                return
+        else:
+            return
+
+        for uci in moves:
+            mv = find_move(board, uci)
+            if mv is None:
+                self.send(f"info string illegal move: {uci}")
+                break
+            board.make_move(mv)
+        self.board = board
+
+    # ------------------------------------------------------------
+    # Search control
+    # ------------------------------------------------------------
+    def _go(self, args: List[str]) -> None:
+        params = parse_go(args)
+        white = int(self.board.side_to_move) == 0
+        budget = allocate_time_ms(params, white)
+
+        self._pondering = bool(params.get("ponder"))
+        self._infinite = bool(params.get("infinite"))
+        self._release.clear()
+
+        ctrl = SearchController(max_nodes=params.get("nodes"))
+        if self._pondering:
+            # clock starts at ponderhit
+            self._ponder_budget_ms = budget
+        elif budget is not None and not self._infinite:
+            ctrl.deadline = time.time() + budget / 1000.0
+        self._controller = ctrl
+
+        depth = params.get("depth", MAX_DEPTH)
+        board = self.board.copy()
+        self._thread = threading.Thread(
+            target=self._search, args=(board, depth, ctrl, params.get("mate")),
+            name="uci-search", daemon=True
+        )
+        self._thread.start()
+
+    def _search(self, board: Board, depth: int, ctrl: SearchController, mate: Optional[int] = None) -> None:
+        result = {}
+        if mate:
+            result = search_root(board, controller=ctrl, on_iteration=self._info, mate_in=mate)
+        if result.get("best_move") is None and not ctrl.stop:
+            result = search_root(board, max_depth=depth, controller=ctrl, on_iteration=self._info,
+                                 state=self.state, multipv=self.options["MultiPV"])
+
+        # UCI: in infinite/ponder mode bestmove waits for stop or ponderhit
+        while (self._infinite or self._pondering) and not ctrl.stop:
+            self._release.wait(0.05)
+            if self._release.is_set() and not self._pondering:
+                break
+
+        best = result.get("best_move")
+        if best is None:
+            legal = list(generate_legal_moves(board))
+            if not legal:
+                self.send("bestmove 0000")
+                return
+            best = legal[0]
+
+        pv = result.get("pv") or []
+        line = f"bestmove {best.to_uci()}"
+        if len(pv) >= 2 and pv[0] == best:
+            line += f" ponder {pv[1].to_uci()}"
+        self.send(line)
+
+    def _info(self, it: Dict) -> None:
+        stats = f"nodes {it['nodes']} nps {it['nps']} time {int(it['elapsed'] * 1000)}"
+        if self.options["MultiPV"] <= 1:
+            pv = " ".join(m.to_uci() for m in it["pv"])
+            self.send(
+                f"info depth {it['depth']} score {format_score(it['score'])} {stats}"
+                + (f" pv {pv}" if pv else "")
+            )
+            return
+        for k, (_, score, line) in enumerate(it["multipv"], 1):
+            pv = " ".join(m.to_uci() for m in line)
+            self.send(
+                f"info depth {it['depth']} multipv {k} score {format_score(score)} {stats}"
+                + (f" pv {pv}" if pv else "")
+            )
+
+    def _ponderhit(self) -> None:
+        ctrl = self._controller
+        if ctrl is None or not self._pondering:
+            return
+        if self._ponder_budget_ms is not None:
+            ctrl.deadline = time.time() + self._ponder_budget_ms / 1000.0
+        self._pondering = False
+        self._release.set()
+
+    def stop_search(self) -> None:
+        """Stop the running search (if any) and wait for its bestmove."""
+        thread = self._thread
+        if thread is None:
+            return
+        if self._controller is not None:
+            self._controller.stop = True
+        self._pondering = False
+        self._infinite = False
+        self._release.set()
+        thread.join()
+        self._thread = None
+        self._controller = None
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until the current search thread finishes (used by tests/scripts)."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def main(argv: Optional[List[str]] = None, stdin: TextIO = sys.stdin, stdout: TextIO = sys.stdout) -> int:
+    engine = UCIEngine(out=stdout)
+    for line in stdin:
+        if not engine.handle(line):
+            break
+    else:
+        engine.stop_search()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
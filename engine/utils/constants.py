@@ -1 +1,3 @@
 MATE_SCORE = 32000
+# deepest iteration when no depth limit is given (UCI `go` without depth, SearchLimits(max_depth=None))
+MAX_DEPTH = 64
@@ -87,8 +87,7 @@ async def main():
 
             if not move:
                 print(f"{color_name}: {uci} is not legal, stopping.")
-                gm.game_over = True
-                gm.termination_reason = f"Illegal move: {uci}"
+                gm.end_game(f"Illegal move: {uci}")
                 break
 
             print(f"{move_count + 1}. {move.to_uci()} ({color_name}) [human input]")
@@ -97,8 +96,7 @@ async def main():
             move = await gm.get_next_move()
 
             if not move:
-                gm.game_over = True
-                gm.termination_reason = f"{color_name} has no legal move"
+                gm.end_game(f"{color_name} has no legal move")
                 break
 
             print(f"{move_count + 1}... {move.to_uci()} ({color_name}) [engine]")
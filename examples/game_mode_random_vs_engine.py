@@ -36,8 +36,7 @@ async def main():
         move = await gm.get_next_move()
 
         if not move:
-            gm.game_over = True
-            gm.termination_reason = f"{color_name} has no legal move"
+            gm.end_game(f"{color_name} has no legal move")
             break
 
         print(f"  → {move.to_uci()}")
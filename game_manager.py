@@ -37,6 +37,10 @@ class GameManager:
         """
         self.white_agent = white_agent
         self.black_agent = black_agent
+        # two engines in one process would ponder against each other's timed
+        # search (one GIL), so pondering is only kept against other players
+        if isinstance(white_agent, EngineAgent) and isinstance(black_agent, EngineAgent):
+            white_agent.ponder = black_agent.ponder = False
         self.board = board or Board()
         self.on_move_callback = on_move_callback
         self.game_over = False
@@ -53,7 +57,8 @@ class GameManager:
         mode: GameMode,
         engine_depth: int = 3,
         engine_time_ms: int = 1000,
-        board: Optional[Board] = None
+        board: Optional[Board] = None,
+        ponder: bool = False
     ) -> "GameManager":
         """Create a GameManager from a predefined mode.
         
@@ -62,21 +67,48 @@ class GameManager:
             engine_depth: depth for engine agents.
             engine_time_ms: time budget for engine agents.
             board: Board instance (default: starting position).
+            ponder: let engine agents think on the opponent's time.
         
         Returns:
             GameManager instance with appropriate agents.
         """
+        def engine():
+            return EngineAgent(engine_time_ms, engine_depth, ponder=ponder)
+
         agents_map = {
             GameMode.HUMAN_VS_HUMAN: (HumanAgent(), HumanAgent()),
             GameMode.HUMAN_VS_RANDOM: (HumanAgent(), RandomAgent()),
-            GameMode.HUMAN_VS_ENGINE: (HumanAgent(), EngineAgent(engine_time_ms, engine_depth)),
+            GameMode.HUMAN_VS_ENGINE: (HumanAgent(), engine()),
             GameMode.RANDOM_VS_RANDOM: (RandomAgent(), RandomAgent()),
-            GameMode.RANDOM_VS_ENGINE: (RandomAgent(), EngineAgent(engine_time_ms, engine_depth)),
-            GameMode.ENGINE_VS_ENGINE: (EngineAgent(engine_time_ms, engine_depth), EngineAgent(engine_time_ms, engine_depth)),
+            GameMode.RANDOM_VS_ENGINE: (RandomAgent(), engine()),
+            GameMode.ENGINE_VS_ENGINE: (engine(), engine()),
         }
         white, black = agents_map.get(mode, (HumanAgent(), HumanAgent()))
         return cls(white, black, board=board)
 
+    def new_game(self, board: Optional[Board] = None) -> None:
+        """Reset the board and game flags and notify both agents."""
+        self.board = board or Board()
+        self.game_over = False
+        self.termination_reason = None
+        self.pending_move = None
+        for agent in (self.white_agent, self.black_agent):
+            agent.new_game()
+
+    def stop_pondering(self) -> None:
+        """Stop background searches of both agents (e.g. when the game ends)."""
+        for agent in (self.white_agent, self.black_agent):
+            agent.stop_pondering()
+
+    def end_game(self, reason: str) -> None:
+        """Mark the game as over for `reason` and stop both agents' pondering.
+
+        Every game end (here or in a front-end) goes through this method.
+        """
+        self.game_over = True
+        self.termination_reason = reason
+        self.stop_pondering()
+
     def get_agent_for_side(self, color: Color) -> Agent:
         """Get the agent for the given color."""
         return self.white_agent if color == Color.WHITE else self.black_agent
@@ -88,8 +120,7 @@ class GameManager:
             move: Move object to play.
         """
         if move is None:
-            self.game_over = True
-            self.termination_reason = "Invalid move (None)"
+            self.end_game("Invalid move (None)")
             return
 
         try:
@@ -98,8 +129,7 @@ class GameManager:
             if self.on_move_callback:
                 await self.on_move_callback(move, self.board, is_white)
         except Exception as e:
-            self.game_over = True
-            self.termination_reason = f"Move error: {e}"
+            self.end_game(f"Move error: {e}")
 
     async def get_next_move(self) -> Optional[object]:
         """Get the next move from the current side's agent.
@@ -132,30 +162,24 @@ class GameManager:
             if not moves:
                 status = get_game_status(self.board)
                 if status.is_checkmate:
-                    self.termination_reason = "Checkmate"
-                    self.game_over = True
+                    self.end_game("Checkmate")
                     return True
                 if status.is_stalemate:
-                    self.termination_reason = "Stalemate"
-                    self.game_over = True
+                    self.end_game("Stalemate")
                     return True
-                self.termination_reason = "No legal moves"
-                self.game_over = True
+                self.end_game("No legal moves")
                 return True
 
             if status.is_draw_by_fifty_move:
-                self.termination_reason = "50-move rule"
-                self.game_over = True
+                self.end_game("50-move rule")
                 return True
 
             if status.is_draw_by_repetition:
-                self.termination_reason = "Repetition"
-                self.game_over = True
+                self.end_game("Repetition")
                 return True
 
             if status.is_insufficient_material:
-                self.termination_reason = "Insufficient material"
-                self.game_over = True
+                self.end_game("Insufficient material")
                 return True
 
         except Exception:
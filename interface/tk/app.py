@@ -55,7 +55,7 @@ class TkChessApp:
     - run(): enter Tk mainloop (if app owns root)
     """
 
-    def __init__(self, root: 'tk.Tk | None' = None):
+    def __init__(self, root: 'tk.Tk | None' = None, engine_ponder: bool = False):
         if tk is None:
             raise RuntimeError('tkinter not available in this environment')
 
@@ -76,6 +76,10 @@ class TkChessApp:
         self.score_black = 0
         self.score_draws = 0
 
+        # fallback engine thinks on the human's time when enabled
+        self.engine_ponder = engine_ponder
+        self._fallback_engine = None
+
         # agent instances for AI players (optional)
         self.player_white_agent = None
         self.player_black_agent = None
@@ -209,6 +213,12 @@ class TkChessApp:
                 self.player_white_agent = None
                 self.player_black_agent = None
 
+        # the fallback engine starts the new game with a clean state
+        self._stop_pondering()
+        if self._fallback_engine is not None:
+            self._fallback_engine.new_game()
+            self._fallback_engine.ponder = self._engine_should_ponder()
+
         # start the non-blocking game loop (will wait for human moves when needed)
         self._auto_running = True
         try:
@@ -296,7 +306,7 @@ class TkChessApp:
                 else:
                     self.record_result('draw')
                 # stop auto-run
-                self._auto_running = False
+                self._end_game()
             else:
                 # schedule next step (opponent may be random/AI)
                 try:
@@ -335,7 +345,7 @@ class TkChessApp:
                     self.record_result(winner)
                 else:
                     self.record_result('draw')
-            self._auto_running = False
+            self._end_game()
             return
 
         # random player: pick uniformly
@@ -345,7 +355,7 @@ class TkChessApp:
                 self.game_board.make_move(mv)
             except Exception as e:
                 print('[TkChessApp] error applying random move:', e)
-                self._auto_running = False
+                self._end_game()
                 return
 
             # update UI
@@ -364,7 +374,7 @@ class TkChessApp:
                     self.record_result(winner)
                 else:
                     self.record_result('draw')
-                self._auto_running = False
+                self._end_game()
                 return
 
             # schedule next engine step
@@ -434,8 +444,13 @@ class TkChessApp:
                                 agent = None
 
                         if agent is None:
-                            from agents.engine_agent import EngineAgent
-                            agent = EngineAgent()
+                            # one fallback engine per app so TT/ponder state
+                            # carries over between moves
+                            agent = self._fallback_engine
+                            if agent is None:
+                                from agents.engine_agent import EngineAgent
+                                agent = EngineAgent(ponder=self._engine_should_ponder())
+                                self._fallback_engine = agent
 
                         # run agent.get_move (async) in this thread
                         import asyncio
@@ -478,7 +493,7 @@ class TkChessApp:
                         self.record_result(winner)
                     else:
                         self.record_result('draw')
-                    self._auto_running = False
+                    self._end_game()
                     return
             except Exception:
                 pass
@@ -513,7 +528,7 @@ class TkChessApp:
                     self.record_result(winner)
                 else:
                     self.record_result('draw')
-                self._auto_running = False
+                self._end_game()
                 return
         except Exception:
             pass
@@ -524,11 +539,32 @@ class TkChessApp:
         except Exception:
             pass
 
+    def _engine_should_ponder(self) -> bool:
+        """Ponder only against a human: two in-process engines would ponder
+        against each other's search (and here share one fallback engine)."""
+        return bool(self.engine_ponder) and 'Human' in (self.player_white, self.player_black)
+
+    def _stop_pondering(self):
+        """Stop background searches of every engine agent of the app."""
+        for agent in (self._fallback_engine, self.player_white_agent, self.player_black_agent):
+            stop = getattr(agent, 'stop_pondering', None)
+            if stop is not None:
+                try:
+                    stop()
+                except Exception:
+                    traceback.print_exc()
+
+    def _end_game(self):
+        """Stop the automatic game loop and any pondering once a game is over."""
+        self._auto_running = False
+        self._stop_pondering()
+
     def on_new_game(self):
         """Reset the board to initial position.
 
         Integration point: hook into `SelfPlayWorker` or `game_manager` to start a new match.
         """
+        self._end_game()
         if self.board:
             self.board.set_position(None)  # placeholder: implements empty/initial position
         print('[TkChessApp] New game requested')
@@ -37,6 +37,8 @@ from rich.text import Text
 
 def parse_args():
     parser = argparse.ArgumentParser(description="ChessTUI")
+    parser.add_argument("--ponder", action="store_true",
+                        help="engine thinks on the opponent's time")
     return parser.parse_args()
 
 
@@ -143,9 +145,10 @@ class ChessTUI(App):
     }
     """
 
-    def __init__(self, board=None, **kwargs):
+    def __init__(self, board=None, ponder: bool = False, **kwargs):
         super().__init__(**kwargs)
         self.board = board
+        self.ponder = ponder
         self.play_task: Optional[asyncio.Task] = None
         self.playing = False
         self.game_over = False  # Rastrear se o jogo terminou
@@ -266,7 +269,8 @@ class ChessTUI(App):
             self.game_manager = GameManager.from_mode(
                 mode,
                 engine_depth=3,
-                engine_time_ms=1000
+                engine_time_ms=1000,
+                ponder=self.ponder
             )
             
             # Reset board and game state (preserve history across app lifetime)
@@ -696,7 +700,8 @@ class ChessTUI(App):
             self.game_manager = GameManager.from_mode(
                 mode,
                 engine_depth=3,
-                engine_time_ms=1000
+                engine_time_ms=1000,
+                ponder=self.ponder
             )
             
             # Reset board and game state (preserve history across app lifetime)
@@ -747,8 +752,7 @@ class ChessTUI(App):
                     move = await self.game_manager.get_next_move()
 
                     if not move:
-                        self.game_manager.game_over = True
-                        self.game_manager.termination_reason = "No legal move"
+                        self.game_manager.end_game("No legal move")
                         break
 
                     await self.game_manager.play_move(move)
@@ -764,6 +768,7 @@ class ChessTUI(App):
                     await asyncio.sleep(0.1)
 
                 # Match ended or playing cancelled
+                self.game_manager.stop_pondering()
                 if self.game_manager.game_over:
                     print(f"\nJogo terminado: {self.game_manager.termination_reason}")
                     result = self.game_manager.get_result()
@@ -840,8 +845,10 @@ class ChessTUI(App):
             # Prefer adapter in `interface.tui.players` which delegates to engine
             try:
                 from interface.tui.players import choose_move as adapter_choose
-                # adapter_choose is async and offloads heavy work to a thread
-                mv = await adapter_choose(name, board, max_time_ms=1000, max_depth=3)
+                # adapter_choose is async and offloads heavy work to a thread;
+                # engine progress goes to the status header as it arrives
+                mv = await adapter_choose(name, board, max_time_ms=1000, max_depth=3,
+                                          on_info=lambda info: self.show_search_info(name, info))
                 if mv is not None:
                     return mv
             except Exception:
@@ -864,6 +871,7 @@ class ChessTUI(App):
                 name = p1 if stm == Color.WHITE else p2
 
                 move = await choose_player(name, self.board)
+                self.show_search_info(name, None)
                 if not move:
                     self.playing = False
                     break
@@ -910,6 +918,22 @@ class ChessTUI(App):
 
     # --------------------------------------------------------
 
+    def show_search_info(self, name: str, info: Optional[dict]):
+        """Atualiza (ou limpa, com info=None) a linha de progresso da busca no header."""
+        header = getattr(self, 'stats_header', None)
+        if header is None:
+            return
+        try:
+            if info is None:
+                header.clear_search_info()
+            else:
+                from interface.tui.players import format_info
+                header.set_search_info(format_info(name, info))
+        except Exception:
+            pass
+
+    # --------------------------------------------------------
+
     async def stop_auto_play(self):
         if not self.playing:
             return
@@ -953,5 +977,6 @@ class ChessTUI(App):
 
 if __name__ == "__main__":
     # start the TUI (always use the real Board implementation)
-    app = ChessTUI()
+    args = parse_args()
+    app = ChessTUI(ponder=args.ponder)
     app.run()
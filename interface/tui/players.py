@@ -6,31 +6,41 @@ returns a Move-like object compatible with `core.board.Board.make_move()`.
 If `name` is 'engine' or 'search', it calls the engine search implementation.
 If `name` refers to a Python module with `choose_move(board)` it will import
 and call it. Otherwise returns None.
+
+`format_info` turns an engine progress item into the TUI status line.
 """
-from typing import Optional
+from typing import Callable, Dict, Optional
 import asyncio
 
 
-async def choose_move(name: str, board, max_time_ms: int = 1000, max_depth: int = 1) -> Optional[object]:
+async def choose_move(name: str, board, max_time_ms: int = 1000, max_depth: int = 1,
+                      on_info: Optional[Callable[[Dict], None]] = None) -> Optional[object]:
     """Asynchronous helper to choose a move by name.
 
     This offloads CPU-heavy or synchronous implementations to a thread using
     ``asyncio.to_thread`` and passes a copy of the board to avoid concurrent
     mutation issues with the UI.
+
+    For the engine, `on_info` receives each completed iteration
+    ({depth, score, nodes, nps, pv, elapsed}) so the UI can show progress;
+    cancelling the awaiting task stops the search.
     """
     name = (name or '').lower()
     # direct engine integration
     if name in ("engine", "search", "search_engine"):
         try:
-            from engine import search_root
-
-            def _run_search(b, t, d):
-                return search_root(b, max_time_ms=t, max_depth=d)
+            from engine import aiter_search, SearchLimits
 
             # Use a board copy to avoid races with the UI thread
             bcopy = board.copy() if hasattr(board, 'copy') else board
-            res = await asyncio.to_thread(_run_search, bcopy, max_time_ms, max_depth)
-            return res.get('best_move') if isinstance(res, dict) else None
+            last = None
+            async for info in aiter_search(bcopy, SearchLimits(max_time_ms=max_time_ms, max_depth=max_depth)):
+                last = info
+                if on_info is not None:
+                    on_info(info)
+            return last.get('best_move') if last else None
+        except asyncio.CancelledError:
+            raise
         except Exception:
             return None
 
@@ -50,3 +60,10 @@ async def choose_move(name: str, board, max_time_ms: int = 1000, max_depth: int
         return None
 
     return None
+
+
+def format_info(name: str, info: Dict) -> str:
+    """One status line for a search progress item: depth, score, nodes, nps and PV."""
+    pv = " ".join(m.to_uci() for m in (info.get('pv') or [])[:6] if hasattr(m, 'to_uci'))
+    return (f"{name}: depth {info.get('depth', 0)} score {info.get('score', 0)} "
+            f"nodes {info.get('nodes', 0)} nps {info.get('nps', 0)} pv {pv}")
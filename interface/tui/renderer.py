@@ -271,6 +271,8 @@ class PlayerStatsHeader(Static):
     # Unified draw counter (global, not per-color)
     draws = reactive(0)
     draw_reason = reactive("")
+    # progresso da busca do motor (profundidade, score, nós, PV)
+    search_info = reactive("")
 
     def render(self) -> Panel:
         """Renderiza header com estatísticas."""
@@ -293,7 +295,11 @@ class PlayerStatsHeader(Static):
         if self.draw_reason:
             reason_line = f"\n[dim]Reason: {self.draw_reason}[/]"
 
-        content = Text.from_markup(stats_line + draw_line + reason_line)
+        search_line = ""
+        if self.search_info:
+            search_line = f"\n[dim]{self.search_info}[/]"
+
+        content = Text.from_markup(stats_line + draw_line + reason_line + search_line)
         return Panel(content, expand=False)
 
     def update_stats(self, white_wins=None, white_losses=None, draws=None,
@@ -321,6 +327,16 @@ class PlayerStatsHeader(Static):
         self.draw_reason = ""
         self.refresh()
 
+    def set_search_info(self, text: str):
+        """Mostra o progresso da busca do motor."""
+        self.search_info = text
+        self.refresh()
+
+    def clear_search_info(self):
+        """Limpa a linha de progresso da busca."""
+        self.search_info = ""
+        self.refresh()
+
 
 class HelpBar(Static):
     """
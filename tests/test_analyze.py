@@ -0,0 +1,61 @@
+import io
+import json
+
+import pytest
+
+from engine import SearchLimits
+from engine.analyze import iter_positions, main, parse_epd, run_batch
+
+STARTPOS = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+
+
+def test_parse_epd_fen_and_epd_records():
+    assert parse_epd(STARTPOS) == (STARTPOS, {})
+    fen, ops = parse_epd('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - bm Ra8#; id "mate.1";')
+    assert fen == MATE_IN_ONE
+    assert ops == {"bm": ["Ra8#"], "id": ["mate.1"]}
+    fen, _ = parse_epd("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - hmvc 7; fmvn 30;")
+    assert fen.endswith(" 7 30")
+
+    assert parse_epd("  ") is None
+    assert parse_epd("# comment") is None
+    with pytest.raises(ValueError):
+        parse_epd("8/8/8 w")
+
+
+def test_iter_positions_keeps_bad_lines_as_errors():
+    items = list(iter_positions(io.StringIO(f"{STARTPOS}\n\nbad line\n")))
+    assert [i for i, _, _ in items] == [0, 1]
+    assert "error" in items[1][2]
+
+
+@pytest.mark.parametrize("workers,ordered", [(1, True), (2, True), (2, False)])
+def test_run_batch_results(workers, ordered):
+    text = "\n".join([MATE_IN_ONE, STARTPOS, MATE_IN_ONE, "xyz w - - 0 1"]) + "\n"
+    limits = SearchLimits(max_depth=2)
+    results = list(run_batch(io.StringIO(text), limits, workers=workers, ordered=ordered))
+
+    if ordered:
+        assert [r["index"] for r in results] == [0, 1, 2, 3]
+    results.sort(key=lambda r: r["index"])
+    assert results[0]["best_move"] == "a1a8" and results[0]["pv"][0] == "a1a8"
+    assert results[1]["depth"] == 2 and results[1]["nodes"] > 0
+    assert "error" in results[3]
+
+
+def test_main_writes_json_lines_and_summary(tmp_path):
+    suite = tmp_path / "pos.epd"
+    suite.write_text('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - id "m1";\n')
+
+    out = io.StringIO()
+    assert main([str(suite), "--depth", "1", "--workers", "1"], out=out) == 0
+    rec, summary = [json.loads(l) for l in out.getvalue().splitlines()]
+    assert rec["id"] == "m1" and rec["best_move"] == "a1a8"
+    assert summary["summary"] is True and summary["positions"] == 1
+
+    out = io.StringIO()
+    assert main([str(suite), "--depth", "1", "--scaling", "2"], out=out) == 0
+    rows = [json.loads(l) for l in out.getvalue().splitlines()]
+    assert [r["workers"] for r in rows] == [1, 2]
+    assert rows[0]["speedup"] == 1.0
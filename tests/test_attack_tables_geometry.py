@@ -64,3 +64,42 @@ def test_king_symmetry_horizontal():
         flipped = mirror_bitboard(KING_ATTACKS[mirrored])
 
         assert orig == flipped, f"King symmetry broken em sq={sq}"
+
+def _sq(name: str) -> int:
+    return (int(name[1]) - 1) * 8 + (ord(name[0]) - ord("a"))
+
+def _bb(*names: str) -> int:
+    res = 0
+    for n in names:
+        res |= 1 << _sq(n)
+    return res
+
+def test_between_table():
+    assert at.BETWEEN[_sq("a1")][_sq("h8")] == _bb("b2", "c3", "d4", "e5", "f6", "g7")
+    assert at.BETWEEN[_sq("e1")][_sq("e4")] == _bb("e2", "e3")
+    assert at.BETWEEN[_sq("e4")][_sq("e1")] == _bb("e2", "e3")
+    assert at.BETWEEN[_sq("a1")][_sq("b3")] == 0   # não alinhadas
+    assert at.BETWEEN[_sq("d4")][_sq("e5")] == 0   # adjacentes
+    assert at.BETWEEN[_sq("d4")][_sq("d4")] == 0
+
+def test_line_table():
+    assert at.LINE[_sq("c3")][_sq("e5")] == _bb("a1", "b2", "c3", "d4", "e5", "f6", "g7", "h8")
+    assert at.LINE[_sq("b1")][_sq("g1")] == 0xFF
+    assert at.LINE[_sq("a1")][_sq("b3")] == 0
+    assert at.aligned(_sq("e1"), _sq("e8"), _sq("e5"))
+    assert not at.aligned(_sq("e1"), _sq("e8"), _sq("d5"))
+
+def test_rays_match_slider_attacks_on_empty_board():
+    for sq in range(64):
+        rook = at.RAYS[at.DIR_N][sq] | at.RAYS[at.DIR_S][sq] | at.RAYS[at.DIR_E][sq] | at.RAYS[at.DIR_W][sq]
+        bishop = at.RAYS[at.DIR_NE][sq] | at.RAYS[at.DIR_NW][sq] | at.RAYS[at.DIR_SE][sq] | at.RAYS[at.DIR_SW][sq]
+        assert rook == at.rook_attacks(sq, 0)
+        assert bishop == at.bishop_attacks(sq, 0)
+
+def test_between_is_symmetric_and_inside_line():
+    for a in range(64):
+        for b in range(64):
+            assert at.BETWEEN[a][b] == at.BETWEEN[b][a]
+            assert at.LINE[a][b] == at.LINE[b][a]
+            if at.BETWEEN[a][b]:
+                assert at.BETWEEN[a][b] & ~at.LINE[a][b] == 0
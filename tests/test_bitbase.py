@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from core.board.board import Board
+from core.moves.legal_movegen import generate_legal_moves
+from engine import bitbase, search_root
+from engine.bitbase import BITBASE_WIN, DRAW, LOSS, WIN, Bitbase, probe, probe_score
+
+
+@pytest.fixture(scope="module")
+def tables(tmp_path_factory):
+    out = tmp_path_factory.mktemp("bitbases")
+    paths = bitbase.generate_all(str(out), workers=2, log=lambda msg: None)
+    assert sorted(paths) == ["KPK", "KQK", "KRK"]
+    bitbase.unload()
+    assert bitbase.load(str(out)) == 3
+    yield out
+    bitbase.unload()
+
+
+def _probe(fen):
+    return probe(Board.from_fen(fen))
+
+
+def test_known_results(tables):
+    # king on the sixth in front of the pawn wins whoever moves
+    assert _probe("4k3/8/4K3/4P3/8/8/8/8 w - - 0 1") == WIN
+    assert _probe("4k3/8/4K3/4P3/8/8/8/8 b - - 0 1") == LOSS
+    # key squares: White to move reaches e6/d6 and wins, Black to move takes the opposition
+    assert _probe("4k3/8/8/4K3/4P3/8/8/8 w - - 0 1") == WIN
+    assert _probe("4k3/8/8/4K3/4P3/8/8/8 b - - 0 1") == DRAW
+    # rook pawn with the defending king in the corner is a draw
+    assert _probe("7k/8/8/8/8/8/7P/7K w - - 0 1") == DRAW
+    # hanging queen / rook: the lone king takes it
+    assert _probe("8/8/8/8/8/8/1kQ5/7K b - - 0 1") == DRAW
+    assert _probe("7R/8/8/8/8/8/1k6/7K w - - 0 1") == WIN
+    # stalemate
+    assert _probe("k7/2Q5/1K6/8/8/8/8/8 b - - 0 1") == DRAW
+    # not covered
+    assert _probe("4k3/8/8/8/8/8/8/3NK3 w - - 0 1") is None
+    assert probe(Board()) is None
+
+
+def test_black_strong_side_is_mirrored(tables):
+    # mirror of the "king on the sixth" win
+    assert _probe("8/8/8/8/4p3/4k3/8/4K3 b - - 0 1") == WIN
+    assert _probe("8/8/8/8/4p3/4k3/8/4K3 w - - 0 1") == LOSS
+    assert _probe("8/8/8/8/8/8/8/4K1kq w - - 0 1") == LOSS
+
+
+@pytest.mark.parametrize("piece", ["Q", "R", "P"])
+def test_consistent_with_move_generation(tables, piece):
+    rng = random.Random(7)
+    checked = 0
+    while checked < 150:
+        wk, bk, x = rng.sample(range(64), 3)
+        if piece == "P" and not 8 <= x < 56:
+            continue
+        if abs((wk & 7) - (bk & 7)) <= 1 and abs((wk >> 3) - (bk >> 3)) <= 1:
+            continue
+        rows = [["1"] * 8 for _ in range(8)]
+        for sq, ch in ((wk, "K"), (bk, "k"), (x, piece)):
+            rows[7 - (sq >> 3)][sq & 7] = ch
+        placement = "/".join("".join(r) for r in rows)
+        b = Board.from_fen(f"{placement} {rng.choice('wb')} - - 0 1")
+        if b.is_in_check(1 - int(b.side_to_move)):
+            continue
+
+        value = probe(b)
+        moves = list(generate_legal_moves(b))
+        if not moves:
+            expected = LOSS if b.is_in_check(b.side_to_move) else DRAW
+        else:
+            expected = LOSS
+            for m in moves:
+                b.make_move(m)
+                reply = probe(b)
+                b.unmake_move()
+                # captures leave K vs K (None here): a draw
+                expected = max(expected, -(reply or 0))
+        assert value == expected, b.to_fen()
+        checked += 1
+
+
+def test_probe_score_and_search(tables):
+    b = Board.from_fen("7R/8/8/8/8/8/1k6/7K w - - 0 1")
+    assert probe_score(b, ply=3) > BITBASE_WIN - 3
+    b = Board.from_fen("7R/8/8/8/8/8/1k6/7K b - - 0 1")
+    assert probe_score(b) < -BITBASE_WIN
+    # the search sees the win through the bitbase instead of searching it out
+    res = search_root(Board.from_fen("7R/8/8/8/8/8/1k6/7K w - - 0 1"), max_depth=1)
+    assert res["score"] > BITBASE_WIN // 2
+
+
+def test_rejects_corrupt_file(tables, tmp_path):
+    data = bytearray((tables / "krk.bb").read_bytes())
+    data[-1] ^= 0xFF
+    bad = tmp_path / "krk.bb"
+    bad.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        Bitbase(str(bad))
+
+
+def test_selfplay_adjudicates_covered_positions(tables):
+    from training.selfplay import SelfPlayWorker, adjudicate
+
+    assert adjudicate(Board.from_fen("7R/8/8/8/8/8/1k6/7K b - - 0 1")) == 1
+    assert adjudicate(Board.from_fen("8/8/8/8/8/8/8/4K1kq b - - 0 1")) == -1
+    assert adjudicate(Board()) is None
+
+    def _net(_):
+        raise AssertionError("adjudicated games must not reach MCTS")
+
+    worker = SelfPlayWorker(_net, mcts_sims=1, use_reward_shaping=False)
+    records, outcome = worker.play_game(Board.from_fen("7R/8/8/8/8/8/1k6/7K w - - 0 1"))
+    assert records == [] and outcome == 1
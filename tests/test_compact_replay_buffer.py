@@ -0,0 +1,72 @@
+"""Tests for the memory-mapped CompactReplayBuffer."""
+import numpy as np
+import pytest
+import torch
+
+from core.board.board import Board
+from training.encoder import ACTION_SIZE, board_to_tensor
+from training.replay_buffer import CompactReplayBuffer
+
+FEN = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1"
+
+
+def _pi(actions, probs):
+    pi = np.zeros(ACTION_SIZE, dtype=np.float32)
+    pi[actions] = probs
+    return pi
+
+
+def test_round_trip_state_policy_and_rewards(tmp_path):
+    rb = CompactReplayBuffer(str(tmp_path / "replay.bin"), capacity=8, top_k=4)
+    board = Board.from_fen(FEN)
+    pi = _pi([3, 70, 900, 20000], [0.1, 0.2, 0.3, 0.4])
+    rb.add((board_to_tensor(board), pi, 1, 0.25, -1.0))
+    assert len(rb) == 1
+
+    (state, out_pi, player, step, final), = rb.sample(5)
+    assert np.array_equal(state, board_to_tensor(board))
+    assert np.allclose(out_pi, pi)
+    assert (player, step, final) == (1, 0.25, -1.0)
+
+    # 4-field items keep the outcome as both rewards
+    rb.add((board_to_tensor(Board()), pi, 0, 1.0))
+    states, _, _, steps, finals = rb.sample_arrays(2)
+    assert sorted(steps.tolist()) == [0.25, 1.0]
+    assert sorted(finals.tolist()) == [-1.0, 1.0]
+
+
+def test_policy_keeps_top_k_renormalised(tmp_path):
+    rb = CompactReplayBuffer(str(tmp_path / "replay.bin"), capacity=4, top_k=2)
+    rb.add((board_to_tensor(Board()), _pi([1, 2, 3], [0.2, 0.3, 0.5]), 0, 0.0, 0.0))
+    _, pis, _, _, _ = rb.sample_arrays(1)
+    assert np.flatnonzero(pis[0]).tolist() == [2, 3]
+    assert np.allclose(pis[0, [2, 3]], [0.375, 0.625])
+
+
+def test_ring_overwrites_oldest_and_resumes_from_disk(tmp_path):
+    path = str(tmp_path / "replay.bin")
+    rb = CompactReplayBuffer(path, capacity=3, top_k=2)
+    for i in range(5):
+        rb.add((board_to_tensor(Board()), _pi([i], [1.0]), 0, float(i), float(i)))
+    assert len(rb) == 3 and rb.written == 5
+    rb.close()
+
+    rb = CompactReplayBuffer(path, capacity=3, top_k=2)
+    assert len(rb) == 3 and rb.written == 5
+    _, _, _, steps, _ = rb.sample_arrays(10)
+    assert sorted(steps.tolist()) == [2.0, 3.0, 4.0]
+    with pytest.raises(ValueError):
+        CompactReplayBuffer(path, capacity=4, top_k=2)
+
+
+def test_add_board_and_sample_tensors(tmp_path):
+    rb = CompactReplayBuffer(str(tmp_path / "replay.bin"), capacity=4)
+    board = Board.from_fen(FEN)
+    rb.add_board(board, _pi([5], [1.0]), 1, 0.0, 1.0)
+    rec = rb._records[0]
+    assert rec['castling'] == board.castling_rights and rec['ep'] == -1
+    states, pis, players, _, finals = rb.sample_tensors(4)
+    assert isinstance(states, torch.Tensor) and states.shape == (1, 13, 8, 8)
+    assert torch.equal(states[0], torch.from_numpy(board_to_tensor(board)))
+    assert pis.shape == (1, ACTION_SIZE) and int(pis[0].argmax()) == 5
+    assert players.tolist() == [1] and finals.tolist() == [1.0]
@@ -0,0 +1,105 @@
+import asyncio
+
+from agents.engine_agent import EngineAgent
+from core.board.board import Board
+from core.moves.legal_movegen import generate_legal_moves
+from game_manager import GameManager, GameMode
+
+
+def test_engine_agent_keeps_state_until_new_game():
+    agent = EngineAgent(max_time_ms=5000, max_depth=1)
+    mv = asyncio.run(agent.get_move(Board()))
+    assert mv is not None
+    assert agent.search_state.tt.table
+
+    gm = GameManager(agent, EngineAgent(max_time_ms=5000, max_depth=1))
+    gm.game_over = True
+    gm.new_game()
+    assert not gm.game_over
+    assert not agent.search_state.tt.table
+
+
+def _reply_reaching(board, key, want):
+    """First legal reply whose resulting key is (want=True) or is not `key`."""
+    for r in generate_legal_moves(board):
+        board.make_move(r)
+        hit = board.zobrist_key == key
+        board.unmake_move()
+        if hit == want:
+            return r
+    return None
+
+
+def test_engine_agent_ponder_hit_and_miss():
+    agent = EngineAgent(max_time_ms=5000, max_depth=2, ponder=True)
+    board = Board()
+    board.make_move(asyncio.run(agent.get_move(board)))
+    assert agent._ponder_thread is not None
+
+    # opponent plays the predicted reply -> the ponder search supplies the move
+    board.make_move(_reply_reaching(board, agent._ponder_key, True))
+    mv = asyncio.run(agent.get_move(board))
+    assert (agent.ponder_hits, agent.ponder_misses) == (1, 0)
+    assert mv in list(generate_legal_moves(board))
+
+    # opponent deviates -> ponder search is cancelled, a normal search runs
+    board.make_move(mv)
+    board.make_move(_reply_reaching(board, agent._ponder_key, False))
+    mv = asyncio.run(agent.get_move(board))
+    assert (agent.ponder_hits, agent.ponder_misses) == (1, 1)
+    assert mv in list(generate_legal_moves(board))
+
+    agent.new_game()
+    assert agent._ponder_thread is None
+
+
+def test_engines_in_one_process_do_not_ponder():
+    gm = GameManager.from_mode(GameMode.ENGINE_VS_ENGINE, engine_depth=1, ponder=True)
+    assert not gm.white_agent.ponder and not gm.black_agent.ponder
+    gm = GameManager.from_mode(GameMode.HUMAN_VS_ENGINE, engine_depth=1, ponder=True)
+    assert gm.black_agent.ponder
+
+
+def test_game_manager_stops_pondering_when_the_game_ends():
+    from agents import HumanAgent
+
+    def pondering_game():
+        agent = EngineAgent(max_time_ms=5000, max_depth=2, ponder=True)
+        gm = GameManager(HumanAgent(), agent)
+        gm.board.make_move(next(iter(generate_legal_moves(gm.board))))
+        asyncio.run(gm.play_move(asyncio.run(gm.get_next_move())))
+        assert agent._ponder_thread is not None
+        return gm, agent
+
+    gm, agent = pondering_game()
+    gm.board = Board.from_fen("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3")
+    assert gm.check_game_over()
+    assert gm.termination_reason == "Checkmate" and agent._ponder_thread is None
+
+    gm, agent = pondering_game()
+    asyncio.run(gm.play_move(None))
+    assert gm.game_over and agent._ponder_thread is None
+
+
+def test_tk_app_stops_pondering_when_the_game_ends():
+    from interface.tk.app import TkChessApp
+
+    # the game-flow methods need no window
+    app = TkChessApp.__new__(TkChessApp)
+    app.engine_ponder = True
+    app.player_white, app.player_black = 'Human', 'AI'
+    app.player_white_agent = app.player_black_agent = None
+    app._auto_running = True
+    assert app._engine_should_ponder()
+
+    agent = EngineAgent(max_time_ms=5000, max_depth=2, ponder=app._engine_should_ponder())
+    app._fallback_engine = agent
+    board = Board()
+    board.make_move(asyncio.run(agent.get_move(board)))
+    assert agent._ponder_thread is not None
+
+    app._end_game()
+    assert agent._ponder_thread is None and not app._auto_running
+
+    app.player_white = 'AI'
+    assert not app._engine_should_ponder()
@@ -0,0 +1,107 @@
+"""Tests for the zobrist-keyed evaluation cache and its use through NetPredictor."""
+import numpy as np
+import torch
+
+from core.board.board import Board
+from core.moves.legal_movegen import generate_legal_moves
+from training.encoder import ACTION_SIZE, move_to_index
+from training.eval_cache import MASKED_LOGIT, EvalCache
+from training.mcts import MCTS
+from training.net import make_net_predictor
+
+
+class CountingModel(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.weight = torch.nn.Parameter(torch.linspace(-1.0, 1.0, ACTION_SIZE))
+        self.rows = 0
+
+    def forward(self, x):
+        self.rows += x.shape[0]
+        pi = x.sum(dim=(1, 2, 3))[:, None] * 0.01 + self.weight[None, :]
+        v = torch.tanh(x[:, :6].sum(dim=(1, 2, 3)) - x[:, 6:12].sum(dim=(1, 2, 3)))
+        return pi, v[:, None]
+
+
+def _entry(k):
+    return np.arange(k, dtype=np.int64), np.zeros(k, dtype=np.float32)
+
+
+def test_lru_eviction_and_counters():
+    cache = EvalCache(max_entries=2)
+    cache.put('v', 1, *_entry(3), 0.5)
+    cache.put('v', 2, *_entry(3), 0.0)
+    assert cache.get('v', 1) is not None  # 1 becomes most recent
+    cache.put('v', 3, *_entry(3), 0.0)
+    assert cache.get('v', 2) is None
+    assert cache.get('v', 1)[2] == 0.5
+    assert cache.get('other-model', 1) is None
+    st = cache.stats()
+    assert (st['entries'], st['hits'], st['misses'], st['evictions']) == (2, 2, 2, 1)
+    assert st['hit_rate'] == 0.5
+
+
+def test_memory_cap_bounds_the_cache():
+    probe = EvalCache()
+    probe.put('v', 0, *_entry(40), 0.0)
+    one = probe.nbytes
+    cache = EvalCache(max_bytes=3 * one)
+    for key in range(10):
+        cache.put('v', key, *_entry(40), 0.0)
+    assert len(cache) == 3 and cache.nbytes <= 3 * one
+    assert cache.evictions == 7
+
+
+def test_predictor_matches_the_model_on_legal_moves_and_skips_repeats():
+    model = CountingModel()
+    plain = make_net_predictor(model)
+    cached = make_net_predictor(model, cache=EvalCache())
+    board = Board()
+    ref_pi, ref_v = plain(board)
+    rows = model.rows
+
+    pi, v = cached(board)
+    pi2, v2 = cached(board)
+    assert model.rows == rows + 1
+    legal = [move_to_index(m) for m in generate_legal_moves(board)]
+    assert np.allclose(pi[legal], ref_pi.numpy()[legal], atol=1e-6)
+    assert np.allclose(pi2, pi)
+    assert (pi == MASKED_LOGIT).sum() == ACTION_SIZE - len(set(legal))
+    assert abs(float(v) - float(ref_v)) < 1e-6 and float(v2) == float(v)
+
+    # batches run the model on the misses only
+    other = Board.from_fen("8/8/8/4k3/8/8/3PK3/8 w - - 0 1")
+    rows = model.rows
+    pis, vs = cached.batch_predict([board, other, board])
+    assert model.rows == rows + 1
+    assert np.allclose(pis[0], pi) and np.allclose(pis[2], pi)
+    assert cached.cache.stats()['hits'] == 3
+
+
+def test_weight_update_invalidates_cached_evaluations():
+    model = CountingModel()
+    net = make_net_predictor(model, cache=EvalCache())
+    board = Board()
+    net(board)
+    version = net.model_version
+    with torch.no_grad():
+        model.weight.add_(1.0)
+    assert net.model_version != version
+    rows = model.rows
+    net(board)
+    assert model.rows == rows + 1
+
+
+def test_mcts_search_is_unchanged_by_the_cache():
+    board = Board.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+    model = CountingModel()
+    base = MCTS(make_net_predictor(model), ACTION_SIZE, sims=60).run(board)
+    cache = EvalCache()
+    m = MCTS(make_net_predictor(model, cache=cache), ACTION_SIZE, sims=60)
+    first = m.run(board)
+    rows = model.rows
+    again = m.run(board)
+    assert np.allclose(first, base, atol=1e-6)
+    assert np.allclose(again, first)
+    assert model.rows == rows
+    assert cache.stats()['hit_rate'] > 0.4
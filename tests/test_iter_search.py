@@ -0,0 +1,74 @@
+import asyncio
+
+from core.board.board import Board
+from engine import SearchLimits, aiter_search, iter_search, search_root
+from engine.search.impl import SearchController
+
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+KEYS = {"best_move", "score", "depth", "nodes", "nps", "pv", "elapsed"}
+
+
+def test_iter_search_yields_each_depth():
+    items = list(iter_search(Board(), SearchLimits(max_depth=2)))
+    assert [i["depth"] for i in items] == [1, 2]
+    assert all(KEYS <= set(i) for i in items)
+    assert items[1]["nodes"] > items[0]["nodes"]
+    assert items[-1]["pv"][0] == items[-1]["best_move"]
+
+
+def test_search_root_returns_last_iteration():
+    b = Board.from_fen(MATE_IN_ONE)
+    last = list(iter_search(b, SearchLimits(max_depth=2)))[-1]
+    res = search_root(b, max_depth=2)
+    assert res["depth"] == last["depth"] == 2
+    assert res["best_move"] == last["best_move"]
+    assert res["score"] == last["score"]
+
+
+def test_consumer_can_stop_early():
+    b = Board()
+    key = b.zobrist_key
+    gen = iter_search(b, SearchLimits(max_depth=10))
+    first = next(gen)
+    gen.close()
+    assert first["depth"] == 1
+    # make/unmake balanced after cancellation
+    assert b.zobrist_key == key and not b._state_stack
+
+
+def test_no_depth_limit_deepens_until_another_limit():
+    gen = iter_search(Board(), SearchLimits(max_depth=None))
+    assert [next(gen)["depth"] for _ in range(3)] == [1, 2, 3]
+    gen.close()
+
+
+def test_controller_stop_before_start_yields_nothing():
+    ctrl = SearchController()
+    ctrl.stop = True
+    assert list(iter_search(Board(), SearchLimits(max_depth=3), ctrl)) == []
+    assert search_root(Board(), max_depth=3, controller=ctrl)["best_move"] is None
+
+
+def test_aiter_search_streams_and_cancels():
+    async def _collect(limit):
+        out = []
+        ctrl = SearchController()
+        async for item in aiter_search(Board(), SearchLimits(max_depth=limit), ctrl):
+            out.append(item["depth"])
+            if len(out) == 1:
+                break
+        return out, ctrl
+
+    depths, ctrl = asyncio.run(_collect(10))
+    assert depths == [1]
+    assert ctrl.stop is True
+
+
+def test_tui_player_reports_progress():
+    from interface.tui.players import choose_move
+
+    seen = []
+    mv = asyncio.run(choose_move("engine", Board.from_fen(MATE_IN_ONE), max_time_ms=5000,
+                                 max_depth=2, on_info=seen.append))
+    assert mv.to_uci() == "a1a8"
+    assert [i["depth"] for i in seen] == [1, 2]
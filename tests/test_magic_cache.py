@@ -0,0 +1,82 @@
+import os
+
+import core.moves.magic.magic_bitboards as mb
+from core.moves.magic import magic_cache
+
+mb.init(validate=False)
+
+CRC = magic_cache.magics_checksum(mb.ROOK_MAGICS, mb.BISHOP_MAGICS)
+
+
+def _save(path):
+    magic_cache.save_tables(str(path), mb._ROOK_ATT_TABLE, mb._BISHOP_ATT_TABLE, CRC)
+    return str(path)
+
+
+def _load(path, crc=CRC):
+    return magic_cache.load_tables(path, len(mb._ROOK_ATT_TABLE), len(mb._BISHOP_ATT_TABLE), crc)
+
+
+def test_roundtrip_matches_built_tables(tmp_path):
+    path = _save(tmp_path / "magic.bin")
+    assert magic_cache.is_cache_file(path)
+
+    rook, bishop = _load(path)
+    assert rook == tuple(mb._ROOK_ATT_TABLE)
+    assert bishop == tuple(mb._BISHOP_ATT_TABLE)
+
+
+def test_missing_or_stale_cache_is_rejected(tmp_path):
+    assert _load(str(tmp_path / "nao_existe.bin")) is None
+    assert not magic_cache.is_cache_file(str(tmp_path / "nao_existe.bin"))
+
+    path = _save(tmp_path / "magic.bin")
+    # magics diferentes -> cache inválido
+    assert _load(path, crc=CRC ^ 1) is None
+    # tamanho esperado diferente
+    assert magic_cache.load_tables(path, len(mb._ROOK_ATT_TABLE) - 1, len(mb._BISHOP_ATT_TABLE), CRC) is None
+
+
+def test_corrupted_payload_fails_checksum(tmp_path):
+    path = _save(tmp_path / "magic.bin")
+    data = bytearray(open(path, "rb").read())
+    data[-3] ^= 0xFF
+    with open(path, "wb") as fh:
+        fh.write(data)
+    assert _load(path) is None
+
+
+def test_cache_path_env_override(monkeypatch, tmp_path):
+    monkeypatch.setenv(magic_cache.CACHE_ENV, str(tmp_path / "x.bin"))
+    assert magic_cache.default_cache_path() == str(tmp_path / "x.bin")
+    monkeypatch.setenv(magic_cache.CACHE_ENV, "")
+    assert magic_cache.default_cache_path() is None
+
+
+def test_suite_cache_goes_to_a_temporary_dir():
+    # conftest.py: importing the move generator must not write ~/.cache
+    path = magic_cache.default_cache_path()
+    assert path and not path.startswith(os.path.expanduser("~"))
+
+
+def test_missing_home_disables_the_cache(monkeypatch):
+    monkeypatch.delenv(magic_cache.CACHE_ENV, raising=False)
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    monkeypatch.delenv("HOME", raising=False)
+    # no passwd entry either: expanduser leaves "~" untouched
+    monkeypatch.setattr(os.path, "expanduser", lambda p: p)
+    assert magic_cache.default_cache_path() is None
+    assert mb._load_cached_tables() is None
+    mb._save_cached_tables()
+
+
+def test_unwritable_cache_dir_falls_back_silently(monkeypatch, tmp_path):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    monkeypatch.delenv(magic_cache.CACHE_ENV, raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(blocker / "cache"))
+    path = magic_cache.default_cache_path()
+    assert path.startswith(str(blocker))
+    mb._save_cached_tables()
+    assert mb._load_cached_tables() is None
+    assert list(tmp_path.iterdir()) == [blocker]
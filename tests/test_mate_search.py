@@ -0,0 +1,61 @@
+from core.board.board import Board
+from engine import search_root
+from engine.search.impl import SearchController
+from engine.search.mate import MateSolver
+from engine.utils.constants import MATE_SCORE
+
+BACK_RANK = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+SMOTHERED_M2 = "r6k/6pp/7N/8/2Q5/8/8/6K1 w - - 0 1"
+PHILIDOR_M4 = "r6k/6pp/8/6N1/2Q5/8/8/6K1 w - - 0 1"
+
+
+def _uci(moves):
+    return [m.to_uci() for m in moves]
+
+
+def test_solver_finds_shortest_mate_and_main_line():
+    b = Board.from_fen(PHILIDOR_M4)
+    line, moves = MateSolver().solve(b, 5)
+    assert moves == 4
+    # the defender's longest resistance (Kh8) leads to the smothered mate
+    assert _uci(line) == ["g5f7", "h8g8", "f7h6", "g8h8", "c4g8", "a8g8", "h6f7"]
+    assert b.to_fen() == PHILIDOR_M4
+
+
+def test_solver_reports_no_mate_within_bound():
+    assert MateSolver().solve(Board.from_fen(PHILIDOR_M4), 3) is None
+    assert MateSolver().solve(Board(), 2) is None
+
+
+def test_search_root_mate_in():
+    res = search_root(Board.from_fen(SMOTHERED_M2), mate_in=3)
+    assert res["mate"] == 2
+    assert _uci(res["pv"]) == ["c4g8", "a8g8", "h6f7"]
+    assert res["best_move"].to_uci() == "c4g8"
+    assert res["score"] == MATE_SCORE - 3
+
+    miss = search_root(Board(), mate_in=1)
+    assert miss["mate"] is None and miss["best_move"] is None
+
+
+def test_mate_search_is_cheaper_than_alpha_beta():
+    b = Board.from_fen(SMOTHERED_M2)
+    mate = search_root(b, mate_in=2)
+    ab = search_root(b, max_depth=3)
+    assert ab["best_move"] == mate["best_move"]
+    assert mate["nodes"] * 20 < ab["nodes"]
+
+
+def test_mate_search_respects_controller():
+    ctrl = SearchController()
+    ctrl.stop = True
+    res = search_root(Board.from_fen(BACK_RANK), mate_in=1, controller=ctrl)
+    assert res["best_move"] is None
+
+
+def test_bounded_table_keeps_solving():
+    # the unbounded search needs ~90 entries; evictions must not lose the proof
+    solver = MateSolver(SearchController(max_nodes=20000), tt_size=40)
+    line, moves = solver.solve(Board.from_fen(PHILIDOR_M4), 4)
+    assert moves == 4 and line[0].to_uci() == "g5f7"
+    assert len(solver.tt) <= 40
@@ -1,4 +1,5 @@
 import importlib
+import numpy as np
 import torch
 
 
@@ -21,7 +22,7 @@ def test_mcts_numpy_path():
             return self
 
     dist = mcts.run(FakeBoard())
-    assert isinstance(dist, list)
+    assert isinstance(dist, np.ndarray)
     assert len(dist) == 20
 
 
@@ -44,7 +45,7 @@ def test_mcts_returns_distribution(monkeypatch):
             return self
 
     dist = mcts.run(FakeBoard())
-    assert isinstance(dist, list)
+    assert isinstance(dist, np.ndarray)
     assert len(dist) == 20
     assert abs(sum(dist) - 1.0) < 1e-6
 
@@ -62,8 +63,9 @@ def test_arena_play_match_smoke(tmp_path):
 
     ckptA = tmp_path / 'A.pt'
     ckptB = tmp_path / 'B.pt'
-    torch.save(A.state_dict(), str(ckptA))
-    torch.save(B.state_dict(), str(ckptB))
+    layout = importlib.import_module('training.encoder').INPUT_LAYOUT_VERSION
+    torch.save({'state_dict': A.state_dict(), 'input_layout': layout}, str(ckptA))
+    torch.save({'state_dict': B.state_dict(), 'input_layout': layout}, str(ckptB))
 
     stats = arena.play_match(str(ckptA), str(ckptB), games=1, sims=2)
     assert isinstance(stats, dict)
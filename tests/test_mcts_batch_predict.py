@@ -4,6 +4,7 @@ This creates a small fake network object that implements both `__call__`
 and `batch_predict`. The test asserts that `batch_predict` was invoked during
 `MCTS.run()`.
 """
+import numpy as np
 import pytest
 import torch
 
@@ -64,12 +65,11 @@ def test_mcts_invokes_batch_predict():
 
     # run should trigger the batched simulation path
     # monkeypatch _descend_to_leaf to avoid dependence on move generation
-    from training.mcts import MCTSNode
-    def _fake_descend(root, bd):
-        return MCTSNode(), [], bd
+    def _fake_descend(tree, bd):
+        return tree.add_node(), [], bd
     mcts._descend_to_leaf = _fake_descend
     pi = mcts.run(board)
 
     assert fake.batch_called is True, "Expected MCTS to call `batch_predict`"
-    assert isinstance(pi, list)
+    assert isinstance(pi, np.ndarray)
     assert len(pi) == action_size
@@ -1,7 +1,8 @@
+import numpy as np
 import pytest
 import torch
 
-from training.mcts import MCTS, MCTSNode
+from training.mcts import MCTS, MCTSTree
 from training.net import make_net_predictor
 from training.encoder import index_to_move
 
@@ -40,11 +41,9 @@ def test_mcts_simulate_backprop_updates_counts(monkeypatch):
     net = SimpleNet(action_size)
     m = MCTS(net, action_size=action_size, sims=1)
 
-    root = MCTSNode()
+    tree = MCTSTree()
     # create one child so descent will add to path
-    child = MCTSNode()
-    child.P = 1.0
-    root.children[0] = child
+    tree.expand(0, np.array([0]), np.array([1.0]))
 
     # replace frozen Move with a mutable stand-in so tests can set piece
     class MutableMove:
@@ -58,13 +57,14 @@ def test_mcts_simulate_backprop_updates_counts(monkeypatch):
     monkeypatch.setattr('training.mcts.Move', MutableMove, raising=False)
     board = DummyBoard()
     # call private simulate to trigger selection->expansion->backup
-    m._simulate(root, board)
+    m._simulate(tree, board)
 
     # after simulation there should be at least one visit counted
-    assert root.N >= 1
-    assert child.N >= 1
-    assert child.W >= 0
-    assert child.Q == pytest.approx(child.W / child.N)
+    assert tree.node_N[0] >= 1
+    assert tree.edge_N[0] >= 1
+    assert tree.edge_W[0] == pytest.approx(0.5 * tree.edge_N[0])
+    # the leaf was expanded with the net priors
+    assert tree.node_count[tree.edge_child[0]] == action_size
 
 
 def test_mcts_run_uses_batch_predict():
@@ -118,6 +118,89 @@ def test_mcts_run_uses_batch_predict():
     board = DummyBoard()
 
     pi = m.run(board)
-    assert isinstance(pi, list)
+    assert isinstance(pi, np.ndarray)
     # ensure batch path was used
     assert fake.batch_called is True
+
+
+class _Move:
+    def __init__(self, from_sq, to_sq, piece=None, is_capture=False, promotion=None):
+        self.from_sq = from_sq
+        self.to_sq = to_sq
+        self.piece = piece
+        self.is_capture = is_capture
+        self.promotion = promotion
+
+
+class LineBoard:
+    """Four legal moves everywhere; remembers the line played."""
+    MOVES = [_Move(8, 16), _Move(9, 17), _Move(10, 18), _Move(11, 19)]
+
+    def __init__(self, side_to_move=0, line=()):
+        self.mailbox = [(0, 'P') for _ in range(64)]
+        self.side_to_move = side_to_move
+        self.line = line
+
+    def copy(self):
+        return LineBoard(self.side_to_move, self.line)
+
+    def make_move(self, mv):
+        self.line = self.line + (mv.from_sq,)
+        self.side_to_move ^= 1
+
+    def generate_legal_moves(self):
+        return list(self.MOVES)
+
+
+class LineNet:
+    """White wins after a first move from square 10, every other line is level."""
+
+    def __init__(self, batched=True):
+        self.calls = 0
+        self.batches = []
+        if not batched:
+            self.batch_predict = None
+            del self.batch_predict
+
+    def _value(self, board):
+        return torch.tensor(1.0 if board.line[:1] == (10,) else 0.0)
+
+    def __call__(self, board):
+        self.calls += 1
+        return torch.zeros(4096), self._value(board)
+
+    def batch_predict(self, boards):
+        self.batches.append(len(boards))
+        return [torch.zeros(4096) for _ in boards], [self._value(b) for b in boards]
+
+
+def test_batched_search_uses_distinct_leaves_per_call(monkeypatch):
+    monkeypatch.setattr('training.mcts.Move', _Move)
+    net = LineNet()
+    m = MCTS(net, action_size=4096, sims=64, batch_size=8)
+    boards = []
+    predict = net.batch_predict
+
+    def _record(batch):
+        boards.append([b.line for b in batch])
+        return predict(batch)
+
+    net.batch_predict = _record
+    pi = m.run(LineBoard())
+    # virtual loss spreads each batch over different lines
+    assert all(len(set(lines)) == len(lines) for lines in boards)
+    assert sum(net.batches) == 64
+    assert len(net.batches) <= 64 // 8 + 2
+    assert net.calls == 1  # root priors only
+    assert abs(float(pi.sum()) - 1.0) < 1e-6
+
+
+@pytest.mark.parametrize("batched", [True, False])
+def test_values_alternate_sign_with_the_mover(monkeypatch, batched):
+    monkeypatch.setattr('training.mcts.Move', _Move)
+    best = 10 * 64 + 18
+    white = MCTS(LineNet(batched), action_size=4096, sims=64, batch_size=4).run(LineBoard(0))
+    black = MCTS(LineNet(batched), action_size=4096, sims=64, batch_size=4).run(LineBoard(1))
+    # White heads for the winning move, Black (to move) avoids it
+    assert int(white.argmax()) == best
+    assert black[best] < 0.25
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from core.board.board import Board
+from training.encoder import ACTION_SIZE
+from training.mcts import MCTS, MCTSTree
+
+# kings and a pawn: king moves transpose into each other within a few plies
+FEN = "8/8/8/4k3/8/8/3PK3/8 w - - 0 1"
+
+
+class KeyNet:
+    """Uniform priors, a value per position; records the positions evaluated."""
+
+    def __init__(self):
+        self.keys = []
+
+    def _eval(self, board):
+        self.keys.append(board.zobrist_key)
+        return np.zeros(ACTION_SIZE, dtype=np.float32), np.float32(0.3 * np.sin(board.zobrist_key % 1000))
+
+    def __call__(self, board):
+        return self._eval(board)
+
+
+class BatchKeyNet(KeyNet):
+    def batch_predict(self, boards):
+        out = [self._eval(b) for b in boards]
+        return [p for p, _ in out], [v for _, v in out]
+
+
+@pytest.mark.parametrize("net_cls", [KeyNet, BatchKeyNet])
+def test_transposed_positions_are_evaluated_once(net_cls):
+    board = Board.from_fen(FEN)
+    fen = board.to_fen()
+
+    plain = net_cls()
+    MCTS(plain, ACTION_SIZE, sims=400).run(board)
+    assert len(set(plain.keys)) < len(plain.keys)
+
+    net = net_cls()
+    m = MCTS(net, ACTION_SIZE, sims=400, transpositions=True)
+    pi = m.run(board)
+    assert len(set(net.keys)) == len(net.keys)
+    assert m.last_run['transpositions'] > 0
+    assert m.last_run['root_visits'] == 400
+    assert abs(float(pi.sum()) - 1.0) < 1e-5
+    assert board.to_fen() == fen
+
+
+def test_shared_node_statistics_stay_consistent():
+    m = MCTS(KeyNet(), ACTION_SIZE, sims=300, batch_size=1, transpositions=True)
+    m.run(Board.from_fen(FEN))
+    tree = m.tree
+    n = tree.num_nodes
+    parents = np.repeat(np.arange(n), np.maximum(tree.node_count[:n], 0))
+    # a shared node has several incoming edges
+    children = tree.edge_child[:tree.num_edges]
+    linked = children[children >= 0]
+    assert len(linked) > len(np.unique(linked))
+    # each visit went through exactly one edge of the node it passed
+    totals = np.bincount(parents, weights=tree.edge_N[:tree.num_edges], minlength=n)
+    assert np.allclose(totals, tree.node_N[:n])
+
+
+def test_subtree_of_a_dag_copies_shared_nodes_once():
+    tree = MCTSTree(table_size=16)
+    tree.register_root(100)
+    tree.expand(0, np.array([1, 2]), np.array([0.5, 0.5]))
+    a = tree.child(0, key=101)
+    b = tree.child(1, key=102)
+    tree.expand(a, np.array([3]), np.array([1.0]))
+    tree.expand(b, np.array([4]), np.array([1.0]))
+    shared = tree.child(int(tree.node_first[a]), key=103)
+    assert tree.child(int(tree.node_first[b]), key=103) == shared
+    assert tree.transpositions == 1
+    # a repetition back to the root links to the root itself
+    tree.expand(shared, np.array([5]), np.array([1.0]))
+    assert tree.child(int(tree.node_first[shared]), key=100) == 0
+
+    sub = tree.subtree(0)
+    assert sub.num_nodes == tree.num_nodes
+    assert sub.table == tree.table
@@ -1,8 +1,9 @@
 """Unit tests for MCTS core behaviors (visit distribution, sims edge cases)."""
+import numpy as np
 import pytest
 import torch
 
-from training.mcts import MCTS
+from training.mcts import MCTS, MCTSTree
 
 
 class DummyBoard:
@@ -41,7 +42,206 @@ def test_mcts_visits_distribution_basic(sims):
     m = MCTS(net, action_size=action_size, sims=sims)
     board = DummyBoard(action_size)
     pi = m.run(board)
-    assert isinstance(pi, list)
+    assert isinstance(pi, np.ndarray)
     assert len(pi) == action_size
     if sims == 0:
-        assert all(abs(p - 1/action_size) < 1e-6 for p in pi)
\ No newline at end of file
+        assert all(abs(p - 1/action_size) < 1e-6 for p in pi)
+
+def test_tree_grows_past_capacity_and_selects_by_puct():
+    tree = MCTSTree(capacity=2)
+    tree.expand(0, np.array([5, 9, 3]), np.array([0.2, 0.7, 0.1]))
+    assert tree.node_count[0] == 3
+    # unvisited: highest prior wins
+    e = tree.select(0, c_puct=1.0)
+    assert tree.edge_action[e] == 9
+
+    child = tree.child(e)
+    assert tree.child(e) == child
+    tree.expand(child, np.arange(4), np.full(4, 0.25))
+    assert tree.num_edges == 7 and tree.num_nodes == 2
+    # expanding twice is a no-op
+    tree.expand(child, np.arange(2), np.full(2, 0.5))
+    assert tree.num_edges == 7
+
+    tree.backup([(0, e)], -1.0)
+    tree.backup([(0, e)], -1.0)
+    assert tree.edge_Q[e] == -1.0
+    # a losing edge gives way to the next prior
+    assert tree.edge_action[tree.select(0, c_puct=1.0)] == 5
+
+    pi = tree.visit_distribution(0, 16)
+    assert pi.dtype == np.float32 and pi.shape == (16,)
+    assert pi[9] == 1.0 and pi.sum() == 1.0
+
+
+def test_node_visits_equal_child_edge_visits(monkeypatch):
+    class MutableMove:
+        def __init__(self, from_sq, to_sq, piece=None, is_capture=False, promotion=None):
+            self.from_sq, self.to_sq, self.piece = from_sq, to_sq, piece
+            self.is_capture, self.promotion = is_capture, promotion
+
+    monkeypatch.setattr('training.mcts.Move', MutableMove)
+    action_size = 16
+    m = MCTS(SimpleNet(action_size), action_size=action_size, sims=0)
+    tree = MCTSTree()
+    board = DummyBoard(action_size)
+    m._expand(tree, 0, board, np.full(action_size, 1.0 / action_size))
+    for _ in range(40):
+        m._simulate(tree, board)
+    for node in range(tree.num_nodes):
+        k = tree.node_count[node]
+        if k > 0:
+            s = tree.node_first[node]
+            assert tree.node_N[node] == tree.edge_N[s:s + k].sum()
+    assert tree.node_N[0] == 40
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_run_on_real_board_descends_and_restores_position(batched):
+    from core.board.board import Board
+    from training.encoder import ACTION_SIZE
+
+    class UniformNet:
+        def __call__(self, board):
+            return np.zeros(ACTION_SIZE, dtype=np.float32), np.float32(0.0)
+
+    class BatchNet(UniformNet):
+        def batch_predict(self, boards):
+            return [self(b)[0] for b in boards], [np.float32(0.0)] * len(boards)
+
+    board = Board.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+    fen, key = board.to_fen(), board.zobrist_key
+    m = MCTS(BatchNet() if batched else UniformNet(), action_size=ACTION_SIZE, sims=60)
+    pi = m.run(board)
+    assert board.to_fen() == fen and board.zobrist_key == key
+    # visits spread over the legal moves (the descent really plays moves)
+    assert (pi > 0).sum() > 20
+    assert abs(float(pi.sum()) - 1.0) < 1e-5
+
+
+@pytest.mark.parametrize("batched", [False, True])
+@pytest.mark.parametrize("fen, mate", [
+    ("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1", "a1a8"),
+    ("r5k1/8/8/8/8/8/5PPP/6K1 b - - 0 1", "a8a1"),
+])
+def test_mate_in_one_is_a_terminal_node_found_without_wasted_simulations(batched, fen, mate):
+    from core.board.board import Board
+    from training.encoder import ACTION_SIZE
+
+    class UniformNet:
+        def __init__(self):
+            self.calls = 0
+
+        def __call__(self, board):
+            self.calls += 1
+            return np.zeros(ACTION_SIZE, dtype=np.float32), np.float32(0.0)
+
+    class BatchNet(UniformNet):
+        def batch_predict(self, boards):
+            self.calls += len(boards)
+            return [np.zeros(ACTION_SIZE, dtype=np.float32)] * len(boards), [np.float32(0.0)] * len(boards)
+
+    net = BatchNet() if batched else UniformNet()
+    m = MCTS(net, action_size=ACTION_SIZE, sims=200)
+    m.run(Board.from_fen(fen))
+    assert m.last_run['root_visits'] == 200
+    actions, moves, visits = m.root_children()
+    best = moves[int(visits.argmax())]
+    assert best.to_uci() == mate
+    # the mated position has no children and never reached the net
+    tree = m.tree
+    edge = tree.node_first[0] + int(visits.argmax())
+    assert tree.node_count[tree.edge_child[edge]] == 0
+    assert tree.edge_Q[edge] == pytest.approx(1.0)
+    assert tree.num_edges < 2000
+    assert net.calls < 200
+
+
+def test_root_children_are_the_legal_moves_with_normalised_priors():
+    from core.board.board import Board
+    from core.moves.legal_movegen import generate_legal_moves
+    from training.encoder import ACTION_SIZE, move_to_index
+
+    class PeakedNet:
+        # nearly all the softmax mass on an illegal action
+        def __call__(self, board):
+            logits = np.zeros(ACTION_SIZE, dtype=np.float32)
+            logits[0] = 50.0
+            return logits, np.float32(0.0)
+
+    board = Board()
+    m = MCTS(PeakedNet(), action_size=ACTION_SIZE, sims=10)
+    pi = m.run(board)
+    actions, moves, visits = m.root_children()
+    legal = {move_to_index(mv) for mv in generate_legal_moves(board)}
+    assert set(int(a) for a in actions) == legal
+    assert [move_to_index(mv) for mv in moves] == [int(a) for a in actions]
+    # priors renormalised over the legal moves only
+    priors = m.tree.edge_P[m.tree.node_first[0]:m.tree.node_first[0] + len(actions)]
+    assert abs(float(priors.sum()) - 1.0) < 1e-6
+    assert int(visits.sum()) == 10
+    assert np.allclose(pi[actions], visits / visits.sum())
+
+
+def test_advance_reuses_the_played_subtree():
+    from core.board.board import Board
+    from training.encoder import ACTION_SIZE
+
+    class UniformNet:
+        def __call__(self, board):
+            return np.zeros(ACTION_SIZE, dtype=np.float32), np.float32(0.0)
+
+    board = Board()
+    m = MCTS(UniformNet(), action_size=ACTION_SIZE, sims=200, batch_size=1)
+    m.run(board)
+    assert m.last_run == {'sims': 200, 'reused_visits': 0, 'root_visits': 200, 'transpositions': 0}
+    tree = m.tree
+    actions, moves, visits = m.root_children()
+    k = int(visits.argmax())
+    child = int(tree.edge_child[int(tree.node_first[0]) + k])
+    carried = int(tree.node_N[child])
+    assert carried > 0
+
+    board.make_move(moves[k])
+    assert m.advance(int(actions[k]), board)
+    sub = m._next
+    assert sub.root_sign == -tree.root_sign
+    assert int(sub.node_N[0]) == carried
+    # statistics of the child's edges are carried over unchanged
+    s, c = int(tree.node_first[child]), int(tree.node_count[child])
+    t = int(sub.node_first[0])
+    assert np.array_equal(sub.edge_N[t:t + c], tree.edge_N[s:s + c])
+    assert np.array_equal(sub.edge_W[t:t + c], tree.edge_W[s:s + c])
+
+    m.run(board)
+    assert m.last_run == {'sims': 200, 'reused_visits': carried, 'root_visits': 200 + carried,
+                          'transpositions': 0}
+
+    # a run without advance(), or on another position, starts from scratch
+    m.run(board)
+    assert m.last_run['reused_visits'] == 0
+    m.advance(int(m.root_children()[0][0]), board)
+    m.run(Board())
+    assert m.last_run['reused_visits'] == 0
+
+
+def test_advance_to_follows_a_reply_seen_only_as_a_position():
+    from core.board.board import Board
+    from training.encoder import ACTION_SIZE
+
+    class UniformNet:
+        def __call__(self, board):
+            return np.zeros(ACTION_SIZE, dtype=np.float32), np.float32(0.0)
+
+    board = Board()
+    m = MCTS(UniformNet(), action_size=ACTION_SIZE, sims=100, batch_size=1)
+    m.run(board)
+    _, moves, visits = m.root_children()
+    reply = moves[int(visits.argmax())]
+    after = board.copy()
+    after.make_move(reply)
+    fen = board.to_fen()
+    assert m.advance_to(board, after)
+    assert board.to_fen() == fen
+    m.run(after)
+    assert m.last_run['reused_visits'] > 0
@@ -0,0 +1,92 @@
+import io
+import json
+
+import pytest
+
+from core.perft.epd import (
+    EXIT_BASELINE_DEPTH,
+    EXIT_MISMATCH,
+    EXIT_NPS_REGRESSION,
+    EXIT_OK,
+    iter_epd,
+    main,
+    nps_regression,
+    parse_epd_line,
+    run_suite,
+)
+
+STARTPOS = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+CASTLING = "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"
+
+
+def test_parse_epd_line():
+    fen, expected = parse_epd_line(f"{STARTPOS} ;D1 20 ;D2 400\n")
+    assert fen == STARTPOS
+    assert expected == {1: 20, 2: 400}
+
+    assert parse_epd_line("   ") is None
+    assert parse_epd_line("# comentario") is None
+
+    with pytest.raises(ValueError):
+        parse_epd_line(f"{STARTPOS} ;X1 20")
+
+
+def test_iter_epd_skips_blank_lines():
+    stream = io.StringIO(f"\n{STARTPOS} ;D1 20\n\n{CASTLING} ;D1 26\n")
+    items = list(iter_epd(stream))
+    assert [i for i, _, _ in items] == [0, 1]
+    assert items[1][1] == CASTLING
+
+
+def test_run_suite_reports_counts_in_order():
+    stream = io.StringIO(f"{STARTPOS} ;D1 20 ;D2 400 ;D3 8902\n{CASTLING} ;D1 26\n")
+    results = list(run_suite(stream, max_depth=2, workers=1))
+
+    assert [r["index"] for r in results] == [0, 1]
+    assert all(r["ok"] for r in results)
+    # depth 3 excluded by max_depth
+    assert [d["depth"] for d in results[0]["depths"]] == [1, 2]
+    assert results[0]["nodes"] == 420
+
+
+def test_run_suite_stops_at_first_mismatch():
+    stream = io.StringIO(f"{STARTPOS} ;D1 21 ;D2 400\n")
+    (res,) = run_suite(stream, max_depth=2, workers=1)
+    assert res["ok"] is False
+    assert len(res["depths"]) == 1
+    assert res["depths"][0]["nodes"] == 20
+
+
+def test_nps_regression_threshold():
+    res = {"fen": STARTPOS, "nps": 700}
+    assert nps_regression(res, {STARTPOS: 1000}, threshold=0.2) == pytest.approx(0.3)
+    assert nps_regression(res, {STARTPOS: 800}, threshold=0.2) is None
+    assert nps_regression(res, {}, threshold=0.2) is None
+
+
+def test_main_exit_codes_and_baseline(tmp_path):
+    suite = tmp_path / "suite.epd"
+    suite.write_text(f"{CASTLING} ;D1 26\n")
+    base = tmp_path / "nps.json"
+
+    out = io.StringIO()
+    rc = main([str(suite), "--depth", "1", "--workers", "1", "--save-baseline", str(base)], out=out)
+    assert rc == EXIT_OK
+    lines = [json.loads(l) for l in out.getvalue().splitlines()]
+    assert lines[-1]["summary"] is True
+    assert lines[-1]["passed"] == 1
+    saved = json.loads(base.read_text())
+    assert saved["max_depth"] == 1 and set(saved["nps"]) == {CASTLING}
+
+    # baseline medido com outra profundidade -> comparação recusada
+    rc = main([str(suite), "--depth", "2", "--workers", "1", "--baseline", str(base)], out=io.StringIO())
+    assert rc == EXIT_BASELINE_DEPTH
+
+    # baseline absurdamente alto -> regressão
+    base.write_text(json.dumps({"max_depth": 1, "nps": {CASTLING: 10 ** 12}}))
+    rc = main([str(suite), "--depth", "1", "--workers", "1", "--baseline", str(base)], out=io.StringIO())
+    assert rc == EXIT_NPS_REGRESSION
+
+    suite.write_text(f"{CASTLING} ;D1 27\n")
+    rc = main([str(suite), "--depth", "1", "--workers", "1"], out=io.StringIO())
+    assert rc == EXIT_MISMATCH
@@ -0,0 +1,109 @@
+import asyncio
+import random
+
+import pytest
+
+from core.board.board import Board
+from core.hash.polyglot import POLYGLOT_RANDOM_ARRAY, polyglot_key
+from core.moves.legal_movegen import generate_legal_moves
+from engine.book import ENTRY_STRUCT, PolyglotBook, decode_move, encode_move, open_book
+from utils.enums import PieceType
+
+
+def _play(board, *ucis):
+    for uci in ucis:
+        mv = next(m for m in generate_legal_moves(board) if m.to_uci() == uci)
+        board.make_move(mv)
+    return board
+
+
+def _write_book(path, entries):
+    # Polyglot exige entradas ordenadas por chave
+    with open(path, "wb") as fh:
+        for key, raw, weight in sorted(entries):
+            fh.write(ENTRY_STRUCT.pack(key, raw, weight, 0))
+    return str(path)
+
+
+def test_random_array_size():
+    assert len(POLYGLOT_RANDOM_ARRAY) == 781
+
+
+@pytest.mark.parametrize("moves, key", [
+    ((), 0x463b96181691fc9c),
+    (("e2e4",), 0x823c9b50fd114196),
+    (("e2e4", "d7d5"), 0x0756b94461c50fb0),
+    (("e2e4", "d7d5", "e4e5"), 0x662fafb965db29d4),
+    (("e2e4", "d7d5", "e4e5", "f7f5"), 0x22a48b5a8e47ff78),
+    (("e2e4", "d7d5", "e4e5", "f7f5", "e1e2"), 0x652a607ca3f242c1),
+    (("e2e4", "d7d5", "e4e5", "f7f5", "e1e2", "e8f7"), 0x00fdd303c946bdd9),
+])
+def test_polyglot_reference_keys(moves, key):
+    assert polyglot_key(_play(Board(), *moves)) == key
+
+
+def test_encode_decode_roundtrip_and_castling():
+    board = Board.from_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    for m in generate_legal_moves(board):
+        from_sq, to_sq, promo = decode_move(encode_move(m))
+        assert from_sq == m.from_sq
+        assert promo == m.promotion
+        if m.piece == PieceType.KING and (m.from_sq, m.to_sq) == (4, 6):
+            assert to_sq == 7  # e1g1 -> e1h1
+
+
+def test_book_probe_weighted_choice(tmp_path):
+    start = Board()
+    e4 = next(m for m in generate_legal_moves(start) if m.to_uci() == "e2e4")
+    d4 = next(m for m in generate_legal_moves(start) if m.to_uci() == "d2d4")
+    key = polyglot_key(start)
+    path = _write_book(tmp_path / "book.bin", [
+        (key, encode_move(e4), 30),
+        (key, encode_move(d4), 10),
+        (key, 0, 5),                      # a1a1: ilegal, ignorado
+        (key - 1, encode_move(e4), 1),    # outra posição
+        (key + 1, encode_move(d4), 1),
+    ])
+
+    with PolyglotBook(path) as book:
+        assert len(book) == 5
+        found = dict((m.to_uci(), w) for m, w in book.find_all(start))
+        assert found == {"e2e4": 30, "d2d4": 10}
+        assert [m.to_uci() for m, _ in book.find_all(start, minimum_weight=20)] == ["e2e4"]
+
+        rng = random.Random(1)
+        picks = [book.choose_move(start, rng=rng).to_uci() for _ in range(200)]
+        assert 100 < picks.count("e2e4") < 200
+
+        assert book.choose_move(_play(Board(), "a2a3")) is None
+
+
+def test_book_castling_entry(tmp_path):
+    board = Board.from_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    raw = (4 << 6) | 7  # e1h1 no formato Polyglot
+    path = _write_book(tmp_path / "castle.bin", [(polyglot_key(board), raw, 1)])
+    with PolyglotBook(path) as book:
+        (mv, _), = book.find_all(board)
+    assert mv.to_uci() == "e1g1"
+
+
+def test_empty_and_missing_book(tmp_path):
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    with PolyglotBook(str(empty)) as book:
+        assert len(book) == 0
+        assert book.choose_move(Board()) is None
+    assert open_book(str(tmp_path / "missing.bin")) is None
+    assert open_book(None) is None
+
+
+def test_engine_agent_plays_book_move(tmp_path):
+    from agents.engine_agent import EngineAgent
+
+    start = Board()
+    e4 = next(m for m in generate_legal_moves(start) if m.to_uci() == "e2e4")
+    path = _write_book(tmp_path / "book.bin", [(polyglot_key(start), encode_move(e4), 1)])
+
+    agent = EngineAgent(max_time_ms=10, max_depth=1, book_path=path)
+    mv = asyncio.run(agent.get_move(start))
+    assert mv.to_uci() == "e2e4"
@@ -0,0 +1,35 @@
+import pytest
+
+from core.board.board import Board
+from core.moves.san import parse_san, try_parse_san
+
+
+def _uci(fen, san):
+    return parse_san(Board.from_fen(fen), san).to_uci()
+
+
+def test_pawn_piece_and_capture_moves():
+    b = Board()
+    assert parse_san(b, "e4").to_uci() == "e2e4"
+    assert parse_san(b, "Nf3").to_uci() == "g1f3"
+    assert parse_san(b, "e2e4").to_uci() == "e2e4"  # UCI accepted too
+    assert _uci("rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2", "exd5") == "e4d5"
+
+
+def test_disambiguation_promotion_castling_and_suffixes():
+    assert _uci("4k3/8/8/8/8/8/8/R3K2R w - - 0 1", "Rad1") == "a1d1"
+    assert _uci("4k3/8/8/8/8/8/8/R3K2R w K - 0 1", "O-O") == "e1g1"
+    assert _uci("4k3/8/8/8/8/8/8/R3K2R w - - 0 1", "Rh8+") == "h1h8"
+    assert _uci("8/P6k/8/8/8/8/8/4K3 w - - 0 1", "a8=N") == "a7a8n"
+    assert _uci("8/P6k/8/8/8/8/8/4K3 w - - 0 1", "a8Q!") == "a7a8q"
+
+
+def test_invalid_ambiguous_and_illegal():
+    b = Board.from_fen("4k3/8/8/8/8/8/4K3/R6R w - - 0 1")
+    with pytest.raises(ValueError):
+        parse_san(b, "Rd1")  # both rooks can go there
+    with pytest.raises(ValueError):
+        parse_san(b, "Nf3")
+    with pytest.raises(ValueError):
+        parse_san(b, "zz")
+    assert try_parse_san(b, "O-O") is None
@@ -0,0 +1,68 @@
+import io
+import json
+
+from core.board.board import Board
+from engine import SearchLimits, iter_search, search_root
+from engine.analyze import main
+from engine.search import impl
+from engine.search.impl import SearchState
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+
+
+def test_stats_do_not_change_the_search():
+    plain = search_root(Board.from_fen(FEN), max_depth=3)
+    counted = search_root(Board.from_fen(FEN), max_depth=3, stats=True)
+    assert "stats" not in plain
+    assert counted["nodes"] == plain["nodes"]
+    assert counted["score"] == plain["score"]
+    assert counted["best_move"] == plain["best_move"]
+    assert counted["pv"] == plain["pv"]
+
+
+def test_stats_per_iteration_are_consistent():
+    res = search_root(Board.from_fen(FEN), max_depth=3, stats=True)
+    stats = res["stats"]
+    assert [s["depth"] for s in stats] == [1, 2, 3]
+    assert sum(s["nodes"] for s in stats) == res["nodes"]
+    assert stats[0]["ebf"] is None
+    assert stats[1]["ebf"] == round(stats[1]["nodes"] / stats[0]["nodes"], 3)
+    for s in stats:
+        assert 0 < s["qnodes"] < s["nodes"]
+        assert s["eval_calls"] == s["qnodes"]
+        assert s["tt_hits"] <= s["tt_probes"]
+        assert s["tt_cutoffs"] <= s["tt_hits"]
+        assert s["first_move_cutoffs"] <= s["beta_cutoffs"] <= s["tt_stores"]
+        assert s["movegen_calls"] > 0
+        assert set(s["time"]) == {"eval", "movegen", "tt", "quiescence", "total"}
+    assert stats[-1]["beta_cutoffs"] > 0
+    assert 0.0 < stats[-1]["first_move_cutoff_rate"] <= 1.0
+
+
+def test_stats_leave_state_and_impl_untouched():
+    state = SearchState(tt_size_mb=1)
+    tt = state.tt
+    alpha_beta = impl.alpha_beta
+    list(iter_search(Board.from_fen(FEN), SearchLimits(max_depth=2, multipv=2, stats=True),
+                     state=state))
+    assert state.tt is tt
+    assert impl.alpha_beta is alpha_beta
+    assert impl.alpha_beta.__globals__["evaluate"] is impl.evaluate
+
+
+def test_stats_out_writes_one_json_line_per_iteration():
+    out = io.StringIO()
+    res = search_root(Board.from_fen(FEN), max_depth=2, stats_out=out)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [l["depth"] for l in lines] == [1, 2]
+    assert all(l["stats"] is True for l in lines)
+    assert lines[-1]["nodes"] == res["stats"][-1]["nodes"]
+
+
+def test_analyze_stats_flag(tmp_path):
+    path = tmp_path / "pos.fen"
+    path.write_text(FEN + "\n")
+    out = io.StringIO()
+    main([str(path), "--depth", "2", "--workers", "1", "--stats"], out=out)
+    record = json.loads(out.getvalue().splitlines()[0])
+    assert [s["depth"] for s in record["stats"]] == [1, 2]
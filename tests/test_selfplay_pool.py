@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from training.encoder import INPUT_LAYOUT_VERSION
+from training.model import make_model
+from training.replay_buffer import CompactReplayBuffer, ReplayBuffer, encode_records
+from training.selfplay_pool import (completed_games, ingest_shards, iter_shard, run_selfplay,
+                                    shard_path, shard_paths, write_game)
+
+MODEL_KWARGS = {"channels": 8, "blocks": 1}
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    torch.manual_seed(0)
+    path = tmp_path / "model.pt"
+    torch.save({"state_dict": make_model(device="cpu", **MODEL_KWARGS).state_dict(),
+                "input_layout": INPUT_LAYOUT_VERSION}, path)
+    return str(path)
+
+
+def _run(checkpoint, out_dir, games, **kw):
+    kw.setdefault("workers", 1)
+    return run_selfplay(checkpoint, str(out_dir), games, sims=2, max_moves=4, model_kwargs=MODEL_KWARGS,
+                        report_every=0, log=lambda _: None, **kw)
+
+
+def _games(out_dir):
+    return {index: records for path in shard_paths(str(out_dir)) for index, _, records, _ in iter_shard(path)}
+
+
+def test_selfplay_writes_shards_and_resumes(checkpoint, tmp_path):
+    out = tmp_path / "shards"
+    summary = _run(checkpoint, out, 3)
+    assert summary["games"] == 3 and summary["completed"] == 3 and not summary["interrupted"]
+    assert summary["positions"] == sum(len(r) for r in _games(out).values()) > 0
+
+    again = _run(checkpoint, out, 5)
+    assert again["games"] == 2 and again["completed"] == 5
+    assert sorted(_games(out)) == [0, 1, 2, 3, 4]
+
+
+def test_game_is_reproducible_from_its_index(checkpoint, tmp_path):
+    _run(checkpoint, tmp_path / "a", 3)
+    _run(checkpoint, tmp_path / "b", 3, workers=2)
+    a, b = _games(tmp_path / "a"), _games(tmp_path / "b")
+    assert len(shard_paths(str(tmp_path / "b"))) == 2
+    for i in range(3):
+        assert a[i].tobytes() == b[i].tobytes()
+
+
+def test_torn_frame_is_dropped_and_replayed(tmp_path):
+    out = str(tmp_path)
+    rec = (np.zeros((13, 8, 8), np.float32), np.full(4, 0.25, np.float32), 1, 0.0, 1.0)
+    with open(shard_path(out, 0), "ab") as fh:
+        write_game(fh, 0, 1, encode_records([rec], 32))
+        write_game(fh, 1, -1, encode_records([rec, rec], 32))
+    size = os.path.getsize(shard_path(out, 0))
+    with open(shard_path(out, 0), "r+b") as fh:
+        fh.truncate(size - 7)
+
+    assert completed_games(out) == {0}
+    assert [i for i, _, _, _ in iter_shard(shard_path(out, 0))] == [0]
+    assert os.path.getsize(shard_path(out, 0)) < size - 7
+
+
+def test_ingest_into_compact_and_tuple_buffers(checkpoint, tmp_path):
+    out = tmp_path / "shards"
+    _run(checkpoint, out, 2)
+    compact = CompactReplayBuffer(str(tmp_path / "replay.bin"), capacity=100)
+    plain = ReplayBuffer(str(tmp_path / "replay.pkl"), capacity=100)
+    n = ingest_shards(str(out), compact)
+    assert ingest_shards(str(out), plain) == n == len(compact) == len(plain)
+    state, pi, player, step, final = plain.sample(1)[0]
+    assert np.asarray(state).shape == (13, 8, 8)
+    assert abs(float(np.sum(pi)) - 1.0) < 1e-4
+    compact.close()
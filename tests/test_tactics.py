@@ -0,0 +1,42 @@
+import io
+import json
+
+from engine import SearchLimits
+from engine.tactics import DEFAULT_SUITE, compare, main, run_suite, summarize
+
+MATE = '6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - bm Ra8#; id "m1";'
+AVOID = '4k3/8/4p3/3p4/8/8/8/3QK3 w - - am Qxd5; id "am1";'
+WRONG = '6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - bm h3; id "wrong";'
+
+
+def test_run_suite_bm_am_and_time_to_solution():
+    stream = io.StringIO("\n".join([MATE, AVOID, WRONG, "6k1/8/8/8/8/8/8/6K1 w - - bm Qh1;"]))
+    res = run_suite(stream, SearchLimits(max_depth=2))
+    by_id = {r["id"]: r for r in res}
+
+    assert by_id["m1"]["solved"] and by_id["m1"]["bm"] == ["a1a8"]
+    assert by_id["m1"]["found"]["depth"] == 1
+    assert by_id["am1"]["solved"] and by_id["am1"]["move"] != "d1d5"
+    assert not by_id["wrong"]["solved"] and by_id["wrong"]["found"] is None
+    assert "error" in res[3]
+
+    summary = summarize(res)
+    assert summary["solved"] == 2 and summary["errors"] == 1
+    assert sum(summary["histogram"].values()) == 2
+    assert summary["time_to_solution"]["max"] >= summary["time_to_solution"]["median"]
+
+
+def test_bundled_suite_is_solved_at_low_depth(tmp_path):
+    out_file = tmp_path / "run.json"
+    out = io.StringIO()
+    assert main([DEFAULT_SUITE, "--depth", "2", "--out", str(out_file)], out=out) == 0
+    tail = json.loads(out.getvalue().splitlines()[-1])
+    assert tail["summary"] is True and tail["errors"] == 0
+    assert tail["solved"] == tail["positions"] >= 8
+
+    report = json.loads(out_file.read_text())
+    worse = json.loads(json.dumps(report))
+    worse["summary"]["solved"] -= 1
+    worse["results"][0]["solved"] = False
+    assert compare(report, worse) == {"solved_delta": 1, "newly_solved": [report["results"][0]["id"]],
+                                      "newly_failed": []}
@@ -41,6 +41,8 @@ def test_trainer_saves_checkpoint(tmp_path, monkeypatch):
     # check file exists
     import os
     assert os.path.exists(latest)
+    from training.encoder import INPUT_LAYOUT_VERSION
+    assert torch.load(latest)['input_layout'] == INPUT_LAYOUT_VERSION
 
 
 def test_train_optimized_small_loop(tmp_path):
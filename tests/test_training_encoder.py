@@ -38,3 +38,76 @@ def test_encoder_has_action_size():
     assert hasattr(encoder, 'ACTION_SIZE')
     assert encoder.ACTION_SIZE == 20480
 
+
+
+def test_board_to_tensor_planes_follow_piece_order():
+    """Planes are WHITE PAWN..KING, BLACK PAWN..KING, side to move."""
+    from core.board.board import Board
+    from training.encoder import board_to_tensor
+
+    t = board_to_tensor(Board())
+    assert t[:12].sum(axis=(1, 2)).tolist() == [8, 2, 2, 2, 1, 1] * 2
+    assert t[0, 1].tolist() == [1] * 8          # white pawns on rank 2
+    assert t[5, 0, 4] == 1 and t[11, 7, 4] == 1  # kings on e1 / e8
+    assert not t[12].any()
+    b = Board.from_fen("4k3/8/8/8/8/8/8/4K3 b - - 0 1")
+    assert board_to_tensor(b)[12].all()
+
+
+def test_boards_to_tensor_fills_buffer_in_place_and_matches_single():
+    import pytest
+    from core.board.board import Board
+    from training.encoder import BOARD_SHAPE, BatchEncoder, board_to_tensor, boards_to_tensor
+
+    boards = [Board(), Board.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1")]
+    buf = np.full((4,) + BOARD_SHAPE, 7.0, dtype=np.float32)
+    view = boards_to_tensor(boards, buf)
+    assert view.shape == (2,) + BOARD_SHAPE and np.shares_memory(view, buf)
+    for i, b in enumerate(boards):
+        assert np.array_equal(buf[i], board_to_tensor(b))
+    assert (buf[2:] == 7.0).all()
+    with pytest.raises(ValueError):
+        boards_to_tensor(boards * 3, buf)
+
+    enc = BatchEncoder(capacity=1)
+    t = enc.encode_torch(boards)
+    assert tuple(t.shape) == (2,) + BOARD_SHAPE
+    assert np.shares_memory(t.numpy(), enc.buffer)
+    assert np.array_equal(t.numpy(), view)
+
+
+def test_board_to_tensor_mailbox_fallback():
+    from core.board.board import Board
+    from training.encoder import board_to_tensor
+
+    class MailboxOnly:
+        def __init__(self, board):
+            self.mailbox = board.mailbox
+            self.side_to_move = board.side_to_move
+
+    b = Board.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1")
+    assert np.array_equal(board_to_tensor(MailboxOnly(b)), board_to_tensor(b))
+
+
+def test_check_input_layout_refuses_other_layouts(tmp_path):
+    import warnings
+    import pytest
+    torch = pytest.importorskip('torch')
+    from agents.nn_agent import NeuralAgent
+    from training.encoder import INPUT_LAYOUT_VERSION, check_input_layout
+
+    sd = {'w': 1}
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert check_input_layout({'state_dict': sd, 'input_layout': INPUT_LAYOUT_VERSION}) is sd
+        assert check_input_layout({'model_state_dict': sd, 'input_layout': INPUT_LAYOUT_VERSION}) is sd
+    with pytest.warns(UserWarning, match='input_layout'):
+        assert check_input_layout(sd) is sd
+    with pytest.raises(ValueError, match='layout 1'):
+        check_input_layout({'state_dict': sd, 'input_layout': 1})
+
+    path = tmp_path / 'old.pt'
+    torch.save({'state_dict': {}, 'input_layout': INPUT_LAYOUT_VERSION - 1}, str(path))
+    with pytest.warns(UserWarning, match='not loading'):
+        agent = NeuralAgent(model_path=str(path), device='cpu', eval_cache_mb=0)
+    assert agent.model is None
@@ -23,3 +23,29 @@ def test_build_board_image_returns_pil_image():
     assert img is not None
     # PIL Image has size 8*tile_size square
     assert getattr(img, 'size', None) == (32 * 8, 32 * 8)
+
+
+def test_engine_progress_reaches_the_status_header():
+    pytest.importorskip('textual')
+    import asyncio
+    from core.board.board import Board
+    from interface.tui.main import ChessTUI
+    from interface.tui.players import choose_move
+    from interface.tui.renderer import PlayerStatsHeader
+
+    app = ChessTUI()
+    app.stats_header = PlayerStatsHeader()
+    lines = []
+
+    def on_info(info):
+        app.show_search_info('engine', info)
+        lines.append(app.stats_header.search_info)
+
+    asyncio.run(choose_move('engine', Board.from_fen("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"),
+                            max_time_ms=5000, max_depth=2, on_info=on_info))
+    assert [l.split()[2] for l in lines] == ['1', '2']
+    assert lines[-1].startswith('engine: depth 2') and 'pv a1a8' in lines[-1]
+    assert 'engine: depth 2' in str(app.stats_header.render().renderable)
+
+    app.show_search_info('engine', None)
+    assert app.stats_header.search_info == ''
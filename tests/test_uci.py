@@ -0,0 +1,128 @@
+import io
+import time
+
+from core.board.board import Board
+from core.moves.legal_movegen import generate_legal_moves
+from engine.uci import UCIEngine, allocate_time_ms, format_score, main, parse_go
+from engine.utils.constants import MATE_SCORE
+
+
+def _lines(out):
+    return out.getvalue().splitlines()
+
+
+def _bestmove(out):
+    return [l for l in _lines(out) if l.startswith("bestmove")]
+
+
+def test_handshake_and_options():
+    out = io.StringIO()
+    eng = UCIEngine(out=out)
+    eng.handle("uci")
+    eng.handle("isready")
+    eng.handle("setoption name Hash value 64")
+    eng.handle("setoption name Threads value 2")
+    eng.handle("setoption name Ponder value true")
+
+    lines = _lines(out)
+    assert lines[0].startswith("id name")
+    assert "uciok" in lines and lines[-1] == "readyok"
+    assert eng.options == {"Hash": 64, "Threads": 2, "Ponder": True, "MultiPV": 1}
+
+
+def test_position_startpos_and_fen_with_moves():
+    eng = UCIEngine(out=io.StringIO())
+    eng.handle("position startpos moves e2e4 e7e5 g1f3")
+    assert eng.board.side_to_move == 1
+    assert eng.board.mailbox[21] is not None  # f3
+
+    eng.handle("position fen 6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1 moves a1a2")
+    assert eng.board.mailbox[8] is not None  # a2
+
+
+def test_go_depth_emits_info_and_legal_bestmove():
+    out = io.StringIO()
+    eng = UCIEngine(out=out)
+    eng.handle("position fen 6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+    eng.handle("go depth 2")
+    eng.wait(30)
+
+    infos = [l for l in _lines(out) if l.startswith("info depth")]
+    assert [l.split()[2] for l in infos] == ["1", "2"]
+    assert "score mate 1" in infos[-1]
+    assert _bestmove(out) == ["bestmove a1a8"]
+
+
+def test_stop_interrupts_infinite_search_promptly():
+    out = io.StringIO()
+    eng = UCIEngine(out=out)
+    eng.handle("position startpos")
+    eng.handle("go infinite")
+    time.sleep(0.3)
+    assert _bestmove(out) == []
+
+    start = time.perf_counter()
+    eng.handle("stop")
+    assert time.perf_counter() - start < 1.0
+
+    (line,) = _bestmove(out)
+    legal = {m.to_uci() for m in generate_legal_moves(Board())}
+    assert line.split()[1] in legal
+
+
+def test_ponder_waits_for_ponderhit():
+    out = io.StringIO()
+    eng = UCIEngine(out=out)
+    eng.handle("position fen 6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+    eng.handle("go ponder depth 1 movetime 5000")
+    time.sleep(0.3)
+    # depth 1 already finished, but bestmove must wait for ponderhit
+    assert _bestmove(out) == []
+
+    eng.handle("ponderhit")
+    eng.wait(5)
+    assert _bestmove(out) == ["bestmove a1a8"]
+
+
+def test_multipv_reports_ranked_lines():
+    out = io.StringIO()
+    eng = UCIEngine(out=out)
+    eng.handle("setoption name MultiPV value 3")
+    eng.handle("position fen 6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+    eng.handle("go depth 2")
+    eng.wait(30)
+
+    infos = [l.split() for l in _lines(out) if l.startswith("info depth 2")]
+    assert [l[4] for l in infos] == ["1", "2", "3"]
+    assert infos[0][infos[0].index("pv") + 1] == "a1a8"
+    assert _bestmove(out) == ["bestmove a1a8"]
+
+
+def test_go_mate_uses_mate_solver():
+    out = io.StringIO()
+    eng = UCIEngine(out=out)
+    eng.handle("position fen r6k/6pp/7N/8/2Q5/8/8/6K1 w - - 0 1")
+    eng.handle("go mate 2")
+    eng.wait(30)
+
+    (info,) = [l for l in _lines(out) if l.startswith("info depth")]
+    assert "score mate 2" in info and info.endswith("pv c4g8 a8g8 h6f7")
+    assert _bestmove(out) == ["bestmove c4g8 ponder a8g8"]
+
+
+def test_main_reads_stdin_until_quit():
+    stdin = io.StringIO("uci\nposition startpos\ngo nodes 50\nisready\nquit\n")
+    out = io.StringIO()
+    assert main(stdin=stdin, stdout=out) == 0
+    assert len(_bestmove(out)) == 1
+
+
+def test_helpers():
+    assert parse_go(["wtime", "1000", "btime", "2000", "infinite"]) == {"wtime": 1000, "btime": 2000, "infinite": 1}
+    assert format_score(35) == "cp 35"
+    assert format_score(MATE_SCORE - 1) == "mate 1"
+    assert format_score(-(MATE_SCORE - 2)) == "mate -1"
+
+    assert allocate_time_ms({"movetime": 500}, True) == 470
+    assert allocate_time_ms({}, True) is None
+    assert allocate_time_ms({"wtime": 60000, "btime": 10}, True) > allocate_time_ms({"wtime": 60000, "btime": 10}, False)
@@ -103,3 +103,26 @@ def test_enpassant_toggle_reversibility():
     h = Zobrist.xor_enpassant(h, 24)
 
     assert h == 0
+
+def test_flat_tables_match_nested():
+    Zobrist.init(seed=99, force=True)
+
+    assert len(Zobrist.piece_square_flat) == 12 * 64
+    for idx in range(12):
+        for sq in range(64):
+            assert Zobrist.piece_square_flat[idx * 64 + sq] == Zobrist.piece_square[idx][sq]
+
+    assert len(Zobrist.castling_delta) == 16 * 16
+    for old in range(16):
+        for new in range(16):
+            h = Zobrist.xor_castling(Zobrist.xor_castling(0, old), new)
+            assert Zobrist.castling_delta[(old << 4) | new] == h
+        assert Zobrist.castling_delta[(old << 4) | old] == 0
+
+    Zobrist.init(force=True)
+
+def test_reset_clears_flat_tables():
+    Zobrist.reset()
+    assert Zobrist.piece_square_flat == ()
+    assert Zobrist.castling_delta == ()
+    Zobrist.init()
@@ -0,0 +1,90 @@
+"""
+Board encoder benchmark: boards/sec of training.encoder.
+
+Compares, on positions from random playouts:
+  loop   : the previous encoder (int8 planes filled square by square from the
+           mailbox, then converted to float32), kept below as
+           `loop_board_to_tensor` with its plane index corrected
+  single : board_to_tensor (bitboards -> np.unpackbits) per board + np.stack,
+           the way batch_predict used to build its input
+  batch  : boards_to_tensor into a preallocated (B,13,8,8) buffer
+  torch  : BatchEncoder.encode_torch, the batch path returning a tensor that
+           shares the buffer (what NetPredictor feeds the model)
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from core.board.board import Board
+from core.moves.legal_movegen import generate_legal_moves
+from training.encoder import BOARD_SHAPE, BatchEncoder, board_to_tensor, boards_to_tensor
+
+
+def loop_board_to_tensor(board):
+    planes = np.zeros(BOARD_SHAPE, dtype=np.int8)
+    for sq, entry in enumerate(board.mailbox):
+        if entry is None:
+            continue
+        color, ptype = entry
+        plane = int(ptype) + (0 if int(color) == 0 else 6)
+        planes[plane, sq >> 3, sq & 7] = 1
+    planes[12, :, :] = 1 if board.side_to_move else 0
+    return planes.astype(np.float32)
+
+
+def random_positions(count, max_plies=60, seed=0):
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        b = Board()
+        for _ in range(rng.randrange(max_plies)):
+            moves = list(generate_legal_moves(b))
+            if not moves:
+                break
+            b.make_move(rng.choice(moves))
+        boards.append(b)
+    return boards
+
+
+def _rate(fn, boards, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(boards) / best
+
+
+def bench_encoder(count: int = 2048, batch: int = 64, repeat: int = 5):
+    boards = random_positions(count)
+    chunks = [boards[i:i + batch] for i in range(0, count, batch)]
+    buf = np.empty((batch,) + BOARD_SHAPE, dtype=np.float32)
+    enc = BatchEncoder(batch)
+
+    for b in boards[:64]:
+        assert np.array_equal(board_to_tensor(b), loop_board_to_tensor(b))
+
+    rates = {
+        'loop': _rate(lambda: [np.stack([loop_board_to_tensor(b) for b in c]) for c in chunks], boards, repeat),
+        'single': _rate(lambda: [np.stack([board_to_tensor(b) for b in c]) for c in chunks], boards, repeat),
+        'batch': _rate(lambda: [boards_to_tensor(c, buf) for c in chunks], boards, repeat),
+    }
+    if enc.tensor is not None:
+        rates['torch'] = _rate(lambda: [enc.encode_torch(c) for c in chunks], boards, repeat)
+    print(f"boards={count} batch={batch}")
+    for name, rate in rates.items():
+        print(f"  {name:6s}: {rate:10,.0f} boards/s  {rate / rates['loop']:.1f}x")
+    return rates
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--boards', type=int, default=2048)
+    p.add_argument('--batch', type=int, default=64)
+    p.add_argument('--repeat', type=int, default=5)
+    args = p.parse_args()
+    bench_encoder(args.boards, args.batch, args.repeat)
@@ -0,0 +1,43 @@
+"""
+Make/unmake throughput benchmark.
+Replays every legal move of a few standard positions many times and reports
+make+unmake pairs per second (incremental Zobrist update included).
+"""
+
+import argparse
+import time
+from core.board.board import Board
+from core.moves.legal_movegen import generate_legal_moves
+
+POSITIONS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+]
+
+
+def bench_make_unmake(iterations: int = 200):
+    jobs = []
+    for fen in POSITIONS:
+        b = Board.from_fen(fen)
+        jobs.append((b, list(generate_legal_moves(b))))
+
+    pairs = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for b, moves in jobs:
+            for m in moves:
+                b.make_move(m)
+                b.unmake_move()
+            pairs += len(moves)
+    elapsed = time.perf_counter() - start
+    print(f"make/unmake: {pairs} pairs in {elapsed:.4f}s ({pairs / elapsed:,.0f} pairs/s)")
+    return pairs / elapsed
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--iterations', type=int, default=200)
+    args = p.parse_args()
+    bench_make_unmake(args.iterations)
@@ -0,0 +1,326 @@
+"""
+MCTS tree benchmark: simulations/sec of the array-backed tree (training.mcts)
+against the previous dict-of-nodes tree, kept below as `DictTreeMCTS`.
+
+Both run the same simulations on a synthetic position: a board that accepts
+any move and offers the same `--branching` legal moves everywhere, and a
+net returning fixed random priors with a cheap deterministic value. Net and
+movegen cost are therefore (nearly) zero and the numbers measure the tree
+itself: selection, expansion, backup and building the visit distribution.
+(The visit distributions differ slightly: the dict tree shared one N
+between a node and the edge leading to it, counting interior visits twice.)
+
+--batch B1,B2,... also runs the batched virtual-loss search with those
+batch sizes, on a board whose values depend on the moves played, and
+reports net calls, sims/sec and how far each visit distribution is from
+the sequential one (total variation distance, same best move).
+
+--reuse N plays N plies on a real Board, once with a fresh tree per move
+and once carrying the played subtree over (MCTS.advance), and reports the
+mean effective simulations (root visits) per move at the same budget.
+
+--transpositions compares net calls (total and distinct positions) with and
+without zobrist-keyed node sharing on an endgame and a middlegame position.
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from training.encoder import ACTION_SIZE, index_to_move, move_to_index
+from training.mcts import MCTS
+
+
+class _MutableMove:
+    # the dict tree builds a Move and then sets its piece from the mailbox
+    def __init__(self, from_sq, to_sq, piece=None, is_capture=False, promotion=None):
+        self.from_sq = from_sq
+        self.to_sq = to_sq
+        self.piece = piece
+        self.is_capture = is_capture
+        self.promotion = promotion
+
+
+class SyntheticBoard:
+    def __init__(self, moves):
+        self.mailbox = [(0, 1)] * 64
+        self._moves = moves
+
+    def copy(self):
+        return SyntheticBoard(self._moves)
+
+    def make_move(self, mv):
+        return
+
+    def unmake_move(self):
+        return
+
+    def generate_legal_moves(self):
+        return self._moves
+
+
+class SyntheticNet:
+    def __init__(self, seed=0):
+        rng = np.random.default_rng(seed)
+        self.logits = rng.standard_normal(ACTION_SIZE).astype(np.float32)
+        self.calls = 0
+
+    def __call__(self, board):
+        self.calls += 1
+        return self.logits, np.float32(math.sin(self.calls))
+
+
+class PathBoard(SyntheticBoard):
+    def __init__(self, moves, history=()):
+        super().__init__(moves)
+        self.history = history
+
+    def copy(self):
+        return PathBoard(self._moves, self.history)
+
+    def make_move(self, mv):
+        self.history = self.history + ((mv.from_sq, mv.to_sq),)
+
+    def unmake_move(self):
+        self.history = self.history[:-1]
+
+
+class PathNet(SyntheticNet):
+    """Value: a fixed score per first move (the "true" root values) plus
+    pseudo-random noise depending on the rest of the line."""
+
+    def __init__(self, moves, seed=0):
+        super().__init__(seed)
+        self.batches = 0
+        self.first = np.random.default_rng(seed + 1).uniform(-0.5, 0.5, 4096)
+        # priors over the full action space: keep the mass on the legal moves
+        self.logits[[move_to_index(m) for m in moves]] += 10.0
+
+    def __call__(self, board):
+        self.calls += 1
+        return self.logits, self._value(board)
+
+    def _value(self, board):
+        if not board.history:
+            return np.float32(0.0)
+        f, t = board.history[0]
+        noise = math.sin(hash(board.history) % 100003)
+        return np.float32(self.first[f * 64 + t] + 0.3 * noise)
+
+    def batch_predict(self, boards):
+        self.batches += 1
+        return [self.logits] * len(boards), [self._value(b) for b in boards]
+
+
+class _Sequential:
+    # hides batch_predict so MCTS takes the one-leaf-at-a-time path
+    def __init__(self, net):
+        self.net = net
+
+    def __call__(self, board):
+        return self.net(board)
+
+
+def synthetic_moves(branching=32, seed=0):
+    rng = np.random.default_rng(seed)
+    actions = rng.choice(4096, size=branching, replace=False)
+    return [_MutableMove(*index_to_move(int(a))[:2]) for a in actions]
+
+
+class DictTreeMCTS:
+    """The previous implementation (sequential path): node objects with a children dict."""
+
+    class Node:
+        def __init__(self):
+            self.N = 0
+            self.W = 0.0
+            self.Q = 0.0
+            self.P = 0.0
+            self.children = {}
+
+    def __init__(self, net, action_size, c_puct=1.0, sims=50):
+        self.net = net
+        self.action_size = action_size
+        self.c_puct = c_puct
+        self.sims = sims
+
+    def run(self, board):
+        root = self.Node()
+        pi_logits, _ = self.net(board)
+        self._expand(root, board, pi_logits)
+        for _ in range(self.sims):
+            self._simulate(root, board.copy())
+        visits = [root.children[a].N if a in root.children else 0 for a in range(self.action_size)]
+        s = sum(visits)
+        if s == 0:
+            return [1.0 / self.action_size] * self.action_size
+        return [v / s for v in visits]
+
+    def _expand(self, node, board, pi_logits):
+        pi = np.exp(pi_logits - pi_logits.max())
+        pi = pi / pi.sum()
+        for m in board.generate_legal_moves():
+            a = move_to_index(m)
+            if a not in node.children:
+                cn = self.Node()
+                cn.P = float(pi[a])
+                node.children[a] = cn
+
+    def _simulate(self, root, b):
+        path = []
+        node = root
+        while node.children:
+            best_a, best_ucb, best_child = None, -1e9, None
+            for a, child in node.children.items():
+                u = child.Q + self.c_puct * child.P * math.sqrt(node.N + 1) / (1 + child.N)
+                if u > best_ucb:
+                    best_ucb = u
+                    best_a = a
+                    best_child = child
+            path.append((node, best_a))
+            f, t, promo = index_to_move(best_a)
+            mv = _MutableMove(from_sq=f, to_sq=t, promotion=promo)
+            mv.piece = b.mailbox[f][1]
+            b.make_move(mv)
+            node = best_child
+        pi_logits, value = self.net(b)
+        self._expand(node, b, pi_logits)
+        v = float(value)
+        for parent, a in reversed(path):
+            child = parent.children[a]
+            child.N += 1
+            child.W += v
+            child.Q = child.W / child.N
+            parent.N += 1
+
+
+def _time(make, board, sims, repeat):
+    best = None
+    for _ in range(repeat):
+        mcts = make(SyntheticNet(), ACTION_SIZE, sims=sims)
+        start = time.perf_counter()
+        mcts.run(board)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_mcts(sims: int = 800, branching: int = 32, repeat: int = 3):
+    board = SyntheticBoard(synthetic_moves(branching))
+    t_old = _time(DictTreeMCTS, board, sims, repeat)
+    t_new = _time(MCTS, board, sims, repeat)
+    print(f"sims={sims} branching={branching}")
+    print(f"  dict tree : {sims / t_old:8.0f} sims/s ({t_old * 1000:.1f} ms)")
+    print(f"  array tree: {sims / t_new:8.0f} sims/s ({t_new * 1000:.1f} ms)  {t_old / t_new:.2f}x")
+    return t_old, t_new
+
+
+def bench_batched(sims: int = 800, branching: int = 32, batch_sizes=(8, 16, 32)):
+    moves = synthetic_moves(branching)
+    board = PathBoard(moves)
+    net = PathNet(moves)
+    start = time.perf_counter()
+    base = MCTS(_Sequential(net), ACTION_SIZE, sims=sims).run(board)
+    elapsed = time.perf_counter() - start
+    print(f"sequential: {net.calls} net calls, {sims / elapsed:.0f} sims/s")
+    for b in batch_sizes:
+        net = PathNet(moves)
+        start = time.perf_counter()
+        dist = MCTS(net, ACTION_SIZE, sims=sims, batch_size=b).run(board)
+        elapsed = time.perf_counter() - start
+        tvd = 0.5 * float(np.abs(dist - base).sum())
+        print(f"batch={b:3d}: {net.batches + net.calls} net calls, {sims / elapsed:.0f} sims/s, "
+              f"TVD {tvd:.3f}, same best move: {int(dist.argmax()) == int(base.argmax())}")
+    best = max(board.generate_legal_moves(), key=lambda m: net.first[m.from_sq * 64 + m.to_sq])
+    print(f"true best root move: {best.from_sq * 64 + best.to_sq}, "
+          f"sequential picked {int(base.argmax())}")
+
+
+def bench_real_board(sims: int = 800, repeat: int = 3):
+    """The array tree on a real Board (make/unmake descent, core movegen)."""
+    from core.board.board import Board
+    board = Board.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+    t = _time(MCTS, board, sims, repeat)
+    print(f"real board: {sims / t:8.0f} sims/s ({t * 1000:.1f} ms)")
+    return t
+
+
+class KeyNet(SyntheticNet):
+    """Real boards: fixed priors, a pseudo-random value per position (zobrist key)."""
+
+    def __call__(self, board):
+        self.calls += 1
+        return self.logits, np.float32(0.5 * math.sin(board.zobrist_key % 100003))
+
+
+class _CountingKeyNet(KeyNet):
+    def __init__(self, seed=0):
+        super().__init__(seed)
+        self.keys = set()
+
+    def __call__(self, board):
+        self.keys.add(board.zobrist_key)
+        return super().__call__(board)
+
+
+def bench_transpositions(sims: int = 800):
+    from core.board.board import Board
+    fens = ("8/8/8/4k3/8/8/3PK3/8 w - - 0 1",
+            "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+    for fen in fens:
+        print(fen)
+        for shared in (False, True):
+            net = _CountingKeyNet()
+            mcts = MCTS(net, ACTION_SIZE, sims=sims, transpositions=shared)
+            start = time.perf_counter()
+            mcts.run(Board.from_fen(fen))
+            elapsed = time.perf_counter() - start
+            print(f"  transpositions={'on ' if shared else 'off'}: {net.calls} net calls, "
+                  f"{len(net.keys)} distinct positions, {mcts.last_run['transpositions']} shared edges, "
+                  f"{sims / elapsed:.0f} sims/s")
+
+
+def bench_reuse(sims: int = 800, plies: int = 10):
+    from core.board.board import Board
+    for reuse in (False, True):
+        board = Board()
+        mcts = MCTS(KeyNet(), ACTION_SIZE, sims=sims, reuse_tree=reuse)
+        effective = []
+        start = time.perf_counter()
+        for _ in range(plies):
+            mcts.run(board)
+            actions, legal, visits = mcts.root_children()
+            if len(actions) == 0:
+                break
+            k = int(visits.argmax())
+            board.make_move(legal[k])
+            mcts.advance(int(actions[k]), board)
+            effective.append(mcts.last_run['root_visits'])
+        elapsed = time.perf_counter() - start
+        print(f"reuse={'on ' if reuse else 'off'}: {np.mean(effective):7.1f} effective sims/move "
+              f"(budget {sims}), {elapsed / len(effective) * 1000:.1f} ms/move")
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--sims', type=int, default=800)
+    p.add_argument('--branching', type=int, default=32)
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--batch', default=None, help="comma separated batch sizes, e.g. 8,16,32")
+    p.add_argument('--real', action='store_true', help="also time a real Board position")
+    p.add_argument('--reuse', type=int, default=0, metavar='PLIES',
+                   help="compare tree reuse on/off over PLIES plies of a real game")
+    p.add_argument('--transpositions', action='store_true',
+                   help="compare net calls with and without transposition sharing")
+    args = p.parse_args()
+    bench_mcts(args.sims, args.branching, args.repeat)
+    if args.real:
+        bench_real_board(args.sims, args.repeat)
+    if args.batch:
+        bench_batched(args.sims, args.branching, [int(b) for b in args.batch.split(',')])
+    if args.reuse:
+        bench_reuse(args.sims, args.reuse)
+    if args.transpositions:
+        bench_transpositions(args.sims)
@@ -0,0 +1,42 @@
+"""
+MultiPV cost benchmark.
+Searches a few positions to a fixed depth with K = 1..N lines and reports
+nodes and time relative to K = 1, to size K for batch labelling jobs.
+"""
+
+import argparse
+import time
+from core.board.board import Board
+from engine import search_root
+
+FENS = [
+    None,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1",
+]
+
+
+def bench_multipv(depth: int = 2, max_k: int = 4):
+    base = None
+    for k in range(1, max_k + 1):
+        nodes = 0
+        elapsed = 0.0
+        for fen in FENS:
+            b = Board() if fen is None else Board.from_fen(fen)
+            start = time.perf_counter()
+            res = search_root(b, max_depth=depth, multipv=k)
+            elapsed += time.perf_counter() - start
+            nodes += res['nodes']
+        if base is None:
+            base = (nodes, elapsed)
+        print(f"K={k}: {nodes} nodes in {elapsed:.3f}s "
+              f"({nodes / base[0]:.2f}x nodes, {elapsed / base[1]:.2f}x time)")
+    return base
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--depth', type=int, default=2)
+    p.add_argument('--max-k', type=int, default=4)
+    args = p.parse_args()
+    bench_multipv(args.depth, args.max_k)
@@ -0,0 +1,46 @@
+"""
+Time-to-depth benchmark for consecutive moves of one game.
+Plays a fixed opening line and, at each position, searches to a fixed depth
+with a fresh SearchState versus one SearchState reused across the game.
+"""
+
+import argparse
+import time
+from core.board.board import Board
+from core.moves.legal_movegen import generate_legal_moves
+from engine import search_root
+from engine.search.impl import SearchState
+
+LINE = ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6", "d2d3", "f8c5", "e1g1", "d7d6"]
+
+
+def _positions():
+    b = Board()
+    out = []
+    for uci in LINE:
+        out.append(b.copy())
+        mv = next(m for m in generate_legal_moves(b) if m.to_uci() == uci)
+        b.make_move(mv)
+    return out
+
+
+def bench_time_to_depth(depth: int = 3):
+    positions = _positions()
+    totals = {}
+    for label, state in (("fresh", None), ("persistent", SearchState())):
+        elapsed = 0.0
+        for b in positions:
+            start = time.perf_counter()
+            search_root(b, max_depth=depth, state=state)
+            elapsed += time.perf_counter() - start
+        totals[label] = elapsed
+        print(f"{label:>10}: {len(positions)} moves to depth {depth} in {elapsed:.3f}s")
+    print(f"speedup: {totals['fresh'] / totals['persistent']:.2f}x")
+    return totals
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--depth', type=int, default=3)
+    args = p.parse_args()
+    bench_time_to_depth(args.depth)
@@ -4,6 +4,7 @@ Requires torch.
 from __future__ import annotations
 from training.selfplay import SelfPlayWorker
 from training.model import make_model
+from training.encoder import check_input_layout
 from core.board.board import Board
 from .device import get_device
 
@@ -19,8 +20,8 @@ def play_match(ckptA, ckptB, games=20, sims=50):
     device = get_device()
     A = make_model(device=device, **cfg)
     B = make_model(device=device, **cfg)
-    A.load_state_dict(torch.load(ckptA, map_location=device))
-    B.load_state_dict(torch.load(ckptB, map_location=device))
+    A.load_state_dict(check_input_layout(torch.load(ckptA, map_location=device), ckptA))
+    B.load_state_dict(check_input_layout(torch.load(ckptB, map_location=device), ckptB))
     netA = net_predict_factory_from_model(A)
     netB = net_predict_factory_from_model(B)
 
@@ -4,7 +4,11 @@ Uses `core.moves.Move`/UCI for mapping. Action space: 4096 normal moves
 plus 4x for promotions -> total 20480.
 """
 from __future__ import annotations
-from typing import Tuple, Optional
+import warnings
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
 try:
     from core.moves.move import Move
     from utils.enums import PieceType
@@ -13,36 +17,154 @@ except Exception:
     PieceType = None
 
 
+# promotion piece <-> slot of the promotion block (built once, not per call)
+PROMOTION_SLOTS = {}
+if PieceType is not None:
+    PROMOTION_SLOTS = {
+        PieceType.QUEEN: 0,
+        PieceType.ROOK: 1,
+        PieceType.BISHOP: 2,
+        PieceType.KNIGHT: 3,
+    }
+SLOT_PROMOTIONS = {slot: piece for piece, slot in PROMOTION_SLOTS.items()}
+
 BOARD_SHAPE = (13, 8, 8)  # 12 piece planes + side-to-move
 ACTION_SIZE = 4096 * 5  # 4096 normal + 4x promotions
 
+# Version of the input planes layout, saved in checkpoints as 'input_layout'.
+# 2: WHITE PAWN..KING, BLACK PAWN..KING, side to move (see board_to_tensor).
+# Bump it whenever the planes change, so nets trained on another layout are
+# not silently fed positions they cannot read.
+INPUT_LAYOUT_VERSION = 2
+
+
+def check_input_layout(ckpt: Any, source: str = 'checkpoint') -> Any:
+    """Return the state_dict of checkpoint `ckpt` after checking its input layout.
+
+    `ckpt` is what torch.load returned: a dict with 'state_dict' (or
+    'model_state_dict') and 'input_layout', or a bare state_dict. Raises
+    ValueError when the recorded layout differs from INPUT_LAYOUT_VERSION;
+    warns when none is recorded (checkpoints saved before the version was,
+    which may use an older layout).
+    """
+    layout = ckpt.get('input_layout') if isinstance(ckpt, dict) else None
+    if layout is None:
+        warnings.warn(f"{source} records no input_layout; it may have been trained on an older "
+                      f"board encoding than layout {INPUT_LAYOUT_VERSION}", stacklevel=2)
+    elif layout != INPUT_LAYOUT_VERSION:
+        raise ValueError(f"{source} was trained on input layout {layout}, "
+                         f"this encoder produces layout {INPUT_LAYOUT_VERSION}")
+    if isinstance(ckpt, dict):
+        for key in ('state_dict', 'model_state_dict'):
+            if key in ckpt:
+                return ckpt[key]
+    return ckpt
+
 
 def board_to_tensor(board):
     """Convert a `board` (core board) to numpy tensor (C,H,W).
 
-    Expects `board.mailbox` and `board.side_to_move`.
+    Planes: WHITE PAWN..KING, BLACK PAWN..KING, then side to move; square
+    sq is planes[:, sq >> 3, sq & 7]. Built from `board.bitboards` when the
+    board has them, else from `board.mailbox`.
+    """
+    out = np.empty((1,) + BOARD_SHAPE, dtype=np.float32)
+    boards_to_tensor([board], out)
+    return out[0]
+
+
+def boards_to_tensor(boards: Sequence, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Encode `boards` into out[:len(boards)] (allocated if None) and return that view.
+
+    `out` is a float (B,13,8,8) array with B >= len(boards), filled in place.
+    The twelve piece bitboards of every board go through one uint64 array:
+    viewed as little-endian bytes each byte is one rank, and
+    np.unpackbits(bitorder='little') turns it into the 8 files of that rank.
     """
-    import numpy as np
-    planes = np.zeros(BOARD_SHAPE, dtype=np.int8)
-    # piece planes: order WHITE PAWN..KING, BLACK PAWN..KING
-    if hasattr(board, 'mailbox') and board.mailbox is not None:
-        for sq, entry in enumerate(board.mailbox):
-            if entry is None:
-                continue
-            color, ptype = entry
+    n = len(boards)
+    if out is None:
+        out = np.empty((n,) + BOARD_SHAPE, dtype=np.float32)
+    elif out.shape[0] < n or out.shape[1:] != BOARD_SHAPE:
+        raise ValueError(f"buffer of shape {out.shape} cannot hold {n} boards")
+    view = out[:n]
+    if n == 0:
+        return view
+    stm = np.fromiter((1 if getattr(b, 'side_to_move', 0) else 0 for b in boards), dtype=np.float32, count=n)
+    if all(hasattr(b, 'bitboards') for b in boards):
+        bbs = np.fromiter((bb for b in boards for row in b.bitboards for bb in row[:6]),
+                          dtype='<u8', count=12 * n)
+        return bitboards_to_planes(bbs.reshape(n, 12), stm, view)
+    for i, b in enumerate(boards):
+        _mailbox_planes(b, view[i])
+    view[:, 12] = stm[:, None, None]
+    return view
+
+
+def bitboards_to_planes(bitboards: np.ndarray, side_to_move: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Fill out[:n] from (n,12) piece bitboards (WHITE PAWN..BLACK KING) and n side-to-move flags."""
+    n = len(bitboards)
+    bbs = np.ascontiguousarray(bitboards, dtype='<u8')
+    bits = np.unpackbits(bbs.view(np.uint8).reshape(n, 12, 8, 1), axis=-1, bitorder='little')
+    out[:n, :12] = bits.reshape(n, 12, 8, 8)
+    out[:n, 12] = np.asarray(side_to_move, dtype=np.float32)[:, None, None]
+    return out[:n]
+
+
+def planes_to_bitboards(planes: np.ndarray) -> np.ndarray:
+    """Inverse of bitboards_to_planes for the piece planes: (n,13,8,8) -> (n,12) uint64."""
+    n = len(planes)
+    packed = np.packbits(np.asarray(planes)[:, :12] > 0.5, axis=-1, bitorder='little')
+    return np.ascontiguousarray(packed.reshape(n, 12, 8)).view('<u8').reshape(n, 12)
+
+
+class BatchEncoder:
+    """Reusable (capacity,13,8,8) float32 input buffer.
+
+    `encode(boards)` fills the first len(boards) planes in place and returns
+    that NumPy view; with torch available `tensor` is a CPU tensor sharing
+    the same memory, so `encode_torch` needs no copy either. Each call
+    overwrites the previous contents.
+    """
+
+    def __init__(self, capacity: int = 64, use_torch: bool = True):
+        self.buffer = np.zeros((max(1, capacity),) + BOARD_SHAPE, dtype=np.float32)
+        self.tensor = None
+        if use_torch:
             try:
-                idx = int(ptype) - 1
+                import torch
+                self.tensor = torch.from_numpy(self.buffer)
             except Exception:
-                continue
-            plane = idx + (0 if int(color) == 0 else 6)
-            r = sq >> 3
-            f = sq & 7
-            planes[plane, r, f] = 1
+                self.tensor = None
 
-    # side to move
-    stm = 1 if getattr(board, 'side_to_move', 0) else 0
-    planes[12, :, :] = stm
-    return planes.astype(np.float32)
+    def encode(self, boards: Sequence) -> np.ndarray:
+        if len(boards) > len(self.buffer):
+            self.__init__(max(len(boards), 2 * len(self.buffer)), self.tensor is not None)
+        return boards_to_tensor(boards, self.buffer)
+
+    def encode_torch(self, boards: Sequence):
+        """encode() as a torch tensor view of the buffer (requires torch)."""
+        self.encode(boards)
+        if self.tensor is None:
+            raise RuntimeError("BatchEncoder was built without torch")
+        return self.tensor[:len(boards)]
+
+
+def _mailbox_planes(board, planes: np.ndarray) -> None:
+    # boards without bitboards: one square at a time from the mailbox
+    planes[:12] = 0
+    mailbox = getattr(board, 'mailbox', None)
+    if mailbox is None:
+        return
+    for sq, entry in enumerate(mailbox):
+        if entry is None:
+            continue
+        color, ptype = entry
+        try:
+            plane = int(ptype) + (0 if int(color) == 0 else 6)
+        except Exception:
+            continue
+        if 0 <= plane < 12:
+            planes[plane, sq >> 3, sq & 7] = 1
 
 
 def move_to_index(move: 'Move') -> int:
@@ -52,13 +174,7 @@ def move_to_index(move: 'Move') -> int:
     base = move.from_sq * 64 + move.to_sq
     if getattr(move, 'promotion', None) is None:
         return base
-    promo_map = {
-        PieceType.QUEEN: 0,
-        PieceType.ROOK: 1,
-        PieceType.BISHOP: 2,
-        PieceType.KNIGHT: 3,
-    }
-    p = promo_map.get(move.promotion, 0)
+    p = PROMOTION_SLOTS.get(move.promotion, 0)
     return 4096 + base * 4 + p
 
 
@@ -74,8 +190,7 @@ def index_to_move(idx: int) -> Tuple[int, int, Optional['PieceType']]:
     p = rem % 4
     f = base // 64
     t = base % 64
-    rev = {0: PieceType.QUEEN, 1: PieceType.ROOK, 2: PieceType.BISHOP, 3: PieceType.KNIGHT}
-    return f, t, rev[p]
+    return f, t, SLOT_PROMOTIONS[p]
 
 
 def validate_mapping_roundtrip():
@@ -0,0 +1,109 @@
+"""Bounded cache of network evaluations keyed by position and model version.
+
+An entry holds the value and the policy logits of the legal moves only
+(action indices + logits, a few hundred bytes instead of the full
+ACTION_SIZE vector), keyed by (model version, zobrist key). Eviction is LRU
+under both an entry limit and an approximate memory cap; hit/miss/eviction
+counters are kept for tuning.
+
+Use it through `training.net.make_net_predictor(model, cache=EvalCache())`:
+the predictor answers from the cache when it can and only runs the model on
+the boards it misses, so MCTS, MCTSAgent and NeuralAgent use it unchanged.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from training.encoder import move_to_index
+
+# logit given to actions that are not legal in the cached position
+MASKED_LOGIT = -1e9
+
+# rough per-entry cost of the dict slot, key tuple, entry tuple and array headers
+ENTRY_OVERHEAD = 400
+
+
+class EvalCache:
+    """LRU cache of (legal actions, legal logits, value) per (model version, zobrist key).
+
+    Args:
+        max_entries: maximum number of positions kept
+        max_bytes: approximate memory cap for the cached arrays
+    """
+
+    def __init__(self, max_entries: int = 200_000, max_bytes: int = 64 << 20):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self._entries: 'OrderedDict[Tuple[Hashable, int], Tuple[np.ndarray, np.ndarray, float]]' = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, version: Hashable, key: int) -> Optional[Tuple[np.ndarray, np.ndarray, float]]:
+        """(actions, logits, value) for the position, or None; counts the hit or miss."""
+        k = (version, key)
+        entry = self._entries.get(k)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(k)
+        self.hits += 1
+        return entry
+
+    def put(self, version: Hashable, key: int, actions: np.ndarray, logits: np.ndarray, value: float) -> None:
+        k = (version, key)
+        old = self._entries.pop(k, None)
+        if old is not None:
+            self.nbytes -= _entry_bytes(old)
+        entry = (actions, logits, float(value))
+        self._entries[k] = entry
+        self.nbytes += _entry_bytes(entry)
+        while self._entries and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, dropped = self._entries.popitem(last=False)
+            self.nbytes -= _entry_bytes(dropped)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.nbytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def legal_actions(board) -> Optional[np.ndarray]:
+    """Sorted unique action indices of the legal moves of `board`; None if they cannot be listed."""
+    try:
+        if hasattr(board, 'generate_legal_moves'):
+            moves = board.generate_legal_moves()
+        else:
+            from core.moves.legal_movegen import generate_legal_moves
+            moves = generate_legal_moves(board)
+        return np.unique(np.fromiter((move_to_index(m) for m in moves), dtype=np.int64))
+    except Exception:
+        return None
+
+
+def expand_logits(actions: np.ndarray, logits: np.ndarray, size: int) -> np.ndarray:
+    """Full policy vector of `size` with the cached logits and MASKED_LOGIT elsewhere."""
+    out = np.full(size, MASKED_LOGIT, dtype=np.float32)
+    out[actions] = logits
+    return out
+
+
+def _entry_bytes(entry) -> int:
+    return entry[0].nbytes + entry[1].nbytes + ENTRY_OVERHEAD
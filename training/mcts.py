@@ -1,11 +1,53 @@
-"""Simple MCTS with neural network prior (PUCT).
-Not heavily optimized; suitable for self-play workers.
+"""MCTS with neural network prior (PUCT) over an array-backed tree.
+
+The tree lives in preallocated NumPy arrays (see MCTSTree): selection at a
+node is one vectorized PUCT argmax over its contiguous child edges instead
+of a Python loop over a dict of node objects, and `run()` returns the root
+visit distribution as a NumPy vector.
+
+Values: the net predicts White's expected outcome (the self-play target).
+Edge statistics are kept from the point of view of the player making the
+move, so backup alternates the sign of the leaf value ply by ply and PUCT
+maximises Q at every level.
+
+Batched search (nets with `batch_predict`): each round descends up to
+`batch_size` times, adding a virtual loss along every path so the next
+descent is pushed towards a different leaf, evaluates the distinct leaves
+in one batch_predict call, then removes the virtual losses and backs up the
+real values. Rounds repeat until `sims` leaves have been evaluated.
+
+A position without legal moves (mate, stalemate) becomes a terminal node
+with no children: simulations reaching it back up the exact result (a loss
+for the side to move if it is in check, else a draw) without calling the
+net. Only boards that cannot list their moves get an edge per action.
+
+Descent plays the Move objects cached on the edges at expansion with
+make_move on the searched board itself and unwinds with unmake_move once
+the leaf is done; the batched search copies only the leaves it sends to
+the net. Boards without unmake_move are searched on a copy per simulation.
+
+Tree reuse: after a move is played, advance() keeps the subtree below it
+(visits, values and priors included) as the starting tree of the next
+run(), which then adds `sims` new simulations on top of the carried ones;
+last_run reports both. The subtree is copied into a fresh compact tree so
+memory does not grow over a game.
+
+Transpositions (optional): with `transpositions=True` the tree keeps a
+bounded table zobrist key -> node, and an edge selected for the first time
+is linked to the existing node of its position when there is one. Transposed
+positions then share one expansion (priors, one net evaluation) and their
+node visit count, and the search is a DAG. Backup stays per path: each
+simulation updates exactly the edges it went through and their parents, so
+no statistic is counted twice whatever the number of paths into a node. A
+descent that reaches a node already on its own path (a repetition) stops
+there and backs up a draw without calling the net.
 """
 from __future__ import annotations
 import math
-import random
-from collections import defaultdict
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
 from training.encoder import index_to_move, move_to_index, ACTION_SIZE
 try:
     from core.moves.move import Move
@@ -19,283 +61,571 @@ except Exception:
     _core_generate_legal_moves = None
 
 
-class MCTSNode:
-    def __init__(self):
-        self.N = 0
-        self.W = 0.0
-        self.Q = 0.0
-        self.P = 0.0
-        self.children: Dict[int, 'MCTSNode'] = {}
+class MCTSTree:
+    """Search tree stored in growable NumPy arrays.
+
+    Nodes (indexed by node id):
+        node_N     visits that passed through the node towards a child
+        node_first first child edge
+        node_count number of child edges (-1 while the node is not expanded)
+    Edges (indexed by edge id):
+        edge_N, edge_W, edge_P  visits, total value and prior of the move
+        edge_Q                  mean value W / N (0 while unvisited)
+        edge_action             action index (training.encoder)
+        edge_child              node id reached by the move (-1 until selected)
+        edge_move               legal Move object of the edge (None if the node
+                                was expanded over every action)
+
+    The children of a node are the edges node_first .. node_first+node_count-1.
+    Node 0 is the root; root_sign is +1 if White moves there, -1 for Black;
+    root_key is the zobrist key of the root position when known.
+
+    `table` (zobrist key -> node, at most `table_size` entries) is None unless
+    transpositions are shared; `transpositions` counts the edges linked to an
+    existing node through it.
+    """
+
+    def __init__(self, capacity: int = 1024, table_size: int = 0):
+        capacity = max(1, capacity)
+        self.node_N = np.zeros(capacity, dtype=np.float64)
+        self.node_first = np.zeros(capacity, dtype=np.int64)
+        self.node_count = np.full(capacity, -1, dtype=np.int64)
+        self.edge_N = np.zeros(capacity, dtype=np.float64)
+        self.edge_W = np.zeros(capacity, dtype=np.float64)
+        self.edge_Q = np.zeros(capacity, dtype=np.float64)
+        self.edge_P = np.zeros(capacity, dtype=np.float64)
+        self.edge_action = np.zeros(capacity, dtype=np.int64)
+        self.edge_child = np.full(capacity, -1, dtype=np.int64)
+        self.edge_move: List[Any] = []
+        self.num_nodes = 0
+        self.num_edges = 0
+        self.root_sign = 1
+        self.root_key = None
+        self.table: Optional[Dict[int, int]] = {} if table_size > 0 else None
+        self.table_size = table_size
+        self.transpositions = 0
+        self.add_node()
+
+    # ------------------------------------------------------------
+    # Allocation
+    # ------------------------------------------------------------
+    def add_node(self) -> int:
+        if self.num_nodes == len(self.node_N):
+            size = 2 * len(self.node_N)
+            self.node_N = _grow(self.node_N, size, 0)
+            self.node_first = _grow(self.node_first, size, 0)
+            self.node_count = _grow(self.node_count, size, -1)
+        node = self.num_nodes
+        self.num_nodes += 1
+        return node
+
+    def expand(self, node: int, actions: np.ndarray, priors: np.ndarray,
+               moves: Optional[List[Any]] = None) -> None:
+        """Give an unexpanded `node` one child edge per action (no-op if already expanded).
+
+        `moves` are the Move objects behind `actions`, kept for the descent.
+        """
+        if self.node_count[node] >= 0:
+            return
+        k = len(actions)
+        if self.num_edges + k > len(self.edge_N):
+            size = max(2 * len(self.edge_N), self.num_edges + k)
+            self.edge_N = _grow(self.edge_N, size, 0)
+            self.edge_W = _grow(self.edge_W, size, 0)
+            self.edge_Q = _grow(self.edge_Q, size, 0)
+            self.edge_P = _grow(self.edge_P, size, 0)
+            self.edge_action = _grow(self.edge_action, size, 0)
+            self.edge_child = _grow(self.edge_child, size, -1)
+        s = self.num_edges
+        self.edge_action[s:s + k] = actions
+        self.edge_P[s:s + k] = priors
+        self.node_first[node] = s
+        self.node_count[node] = k
+        self.edge_move.extend(moves if moves is not None else [None] * k)
+        self.num_edges += k
+
+    def children(self, node: int) -> Tuple[np.ndarray, List[Any], np.ndarray]:
+        """(actions, Move objects, visit counts) of the child edges of `node`."""
+        k = max(0, int(self.node_count[node]))
+        s = int(self.node_first[node])
+        return self.edge_action[s:s + k], self.edge_move[s:s + k], self.edge_N[s:s + k]
+
+    def subtree(self, node: int, capacity: int = 1024) -> 'MCTSTree':
+        """Copy of the subtree rooted at `node` (which becomes node 0), statistics included.
+
+        Shared nodes are copied once, so a DAG stays a DAG.
+        """
+        out = MCTSTree(capacity, self.table_size)
+        out.root_sign = self.root_sign
+        queue = [(node, 0)]
+        copied = {node: 0}
+        i = 0
+        while i < len(queue):
+            old, new = queue[i]
+            i += 1
+            out.node_N[new] = self.node_N[old]
+            k = int(self.node_count[old])
+            if k < 0:
+                continue
+            s = int(self.node_first[old])
+            out.expand(new, self.edge_action[s:s + k], self.edge_P[s:s + k], self.edge_move[s:s + k])
+            t = int(out.node_first[new])
+            out.edge_N[t:t + k] = self.edge_N[s:s + k]
+            out.edge_W[t:t + k] = self.edge_W[s:s + k]
+            out.edge_Q[t:t + k] = self.edge_Q[s:s + k]
+            for j in np.flatnonzero(self.edge_child[s:s + k] >= 0):
+                old_child = int(self.edge_child[s + j])
+                c = copied.get(old_child)
+                if c is None:
+                    c = copied[old_child] = out.add_node()
+                    queue.append((old_child, c))
+                out.edge_child[t + j] = c
+        if self.table is not None:
+            out.table = {key: copied[n] for key, n in self.table.items() if n in copied}
+        return out
+
+    def child(self, edge: int, key: Optional[int] = None) -> int:
+        """Node reached through `edge`, allocated on first use.
+
+        With a table, `key` (zobrist key of the position after the move)
+        links the edge to the node already holding that position, if any.
+        """
+        c = self.edge_child[edge]
+        if c < 0:
+            if self.table is not None and key is not None:
+                c = self.table.get(key, -1)
+                if c >= 0:
+                    self.transpositions += 1
+                else:
+                    c = self.add_node()
+                    if len(self.table) < self.table_size:
+                        self.table[key] = c
+            else:
+                c = self.add_node()
+            self.edge_child[edge] = c
+        return int(c)
+
+    def register_root(self, key: Optional[int]) -> None:
+        """Record the root position's key (in the table too, when there is one)."""
+        self.root_key = key
+        if self.table is not None and key is not None and len(self.table) < self.table_size:
+            self.table.setdefault(key, 0)
+
+    # ------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------
+    def select(self, node: int, c_puct: float) -> int:
+        """Edge maximising Q + c_puct * P * sqrt(N_parent + 1) / (1 + N); -1 if none."""
+        k = self.node_count[node]
+        if k <= 0:
+            return -1
+        s = self.node_first[node]
+        e = s + k
+        u = self.edge_P[s:e] * (c_puct * math.sqrt(self.node_N[node] + 1))
+        u /= self.edge_N[s:e] + 1
+        u += self.edge_Q[s:e]
+        return int(s + u.argmax())
+
+    def backup(self, path: List[Tuple[int, int]], value: float) -> None:
+        """Add one visit along `path` [(parent node, edge), ...] from the root.
+
+        `value` is White's point of view; each edge receives it from the
+        point of view of the side that played it.
+        """
+        if not path:
+            return
+        parents, edges = zip(*path)
+        edges = np.asarray(edges)
+        signs = np.ones(len(edges))
+        signs[1::2] = -1.0
+        self.edge_N[edges] += 1
+        self.edge_W[edges] += (self.root_sign * value) * signs
+        self.edge_Q[edges] = self.edge_W[edges] / self.edge_N[edges]
+        self.node_N[np.asarray(parents)] += 1
+
+    def add_virtual_loss(self, path: List[Tuple[int, int]], loss: float) -> None:
+        """Count a pending visit along `path` as a loss for every mover."""
+        self._virtual(path, 1, -loss)
+
+    def revert_virtual_loss(self, path: List[Tuple[int, int]], loss: float) -> None:
+        self._virtual(path, -1, loss)
+
+    def _virtual(self, path, visits, value) -> None:
+        if not path:
+            return
+        parents, edges = zip(*path)
+        edges = np.asarray(edges)
+        self.edge_N[edges] += visits
+        self.edge_W[edges] += value
+        n = self.edge_N[edges]
+        self.edge_Q[edges] = np.divide(self.edge_W[edges], n, out=np.zeros(len(edges)), where=n > 0)
+        self.node_N[np.asarray(parents)] += visits
+
+    def visit_distribution(self, node: int, size: int) -> np.ndarray:
+        """Normalised child visit counts as a float32 vector of `size` (uniform if unvisited)."""
+        out = np.zeros(size, dtype=np.float32)
+        k = self.node_count[node]
+        if k > 0:
+            s = self.node_first[node]
+            out[self.edge_action[s:s + k]] = self.edge_N[s:s + k]
+        total = out.sum()
+        if total == 0:
+            out[:] = 1.0 / size
+            return out
+        return out / total
 
 
 class MCTS:
-    def __init__(self, net_predict, action_size: int, c_puct=1.0, sims=50):
+    """PUCT search from the net's priors and values.
+
+    Args:
+        net_predict: callable board -> (policy logits, value); if it also has
+            `batch_predict(boards)` the batched virtual-loss search is used
+        action_size: size of the returned visit distribution
+        c_puct: exploration constant
+        sims: leaf evaluations per run()
+        batch_size: max distinct leaves per batch_predict call
+        virtual_loss: value charged to each pending edge while its leaf waits
+        reuse_tree: let advance() carry the subtree of the played move over
+            to the next run()
+        transpositions: share nodes between transposed positions (boards
+            need a zobrist_key)
+        table_size: max positions in the transposition table
+    """
+
+    def __init__(self, net_predict, action_size: int, c_puct=1.0, sims=50, batch_size=8,
+                 virtual_loss=1.0, reuse_tree=True, transpositions=False, table_size=1 << 18):
         self.net = net_predict
         self.action_size = action_size
         self.c_puct = c_puct
         self.sims = sims
+        self.batch_size = max(1, int(batch_size))
+        self.virtual_loss = virtual_loss
+        self.reuse_tree = reuse_tree
+        self.table_size = int(table_size) if transpositions else 0
+        self.tree: Optional[MCTSTree] = None
+        # statistics of the last run(): sims, reused_visits, root_visits, transpositions
+        self.last_run = {'sims': 0, 'reused_visits': 0, 'root_visits': 0, 'transpositions': 0}
+        self._next: Optional[MCTSTree] = None  # subtree kept by advance()
+        self._base: Optional[MCTSTree] = None  # tree advance() starts from
 
-    def run(self, board):
-        root = MCTSNode()
-        # get priors from net
-        # net expects a board-like object; net wrapper should accept board
-        state = board
-        pi_logits, _ = self.net(state)
-        # expect pi_logits as numpy or torch
-        if hasattr(pi_logits, 'detach'):
-            import torch
-            pi = torch.softmax(pi_logits, dim=-1).cpu().numpy()
-        else:
-            import numpy as np
-            pi = np.exp(pi_logits - pi_logits.max())
-            pi = pi / pi.sum()
-
-        # Only create root children for legal moves (mask illegal actions)
-        # obtain legal moves from board if it exposes the method,
-        # otherwise fall back to core.moves.legal_movegen.generate_legal_moves
-        legal_moves = []
-        try:
-            if hasattr(board, 'generate_legal_moves'):
-                legal_moves = list(board.generate_legal_moves())
-            elif _core_generate_legal_moves is not None:
-                legal_moves = list(_core_generate_legal_moves(board))
-        except Exception:
-            legal_moves = []
-
-        if legal_moves:
-            for m in legal_moves:
-                try:
-                    a = move_to_index(m)
-                except Exception:
-                    continue
-                if a is None or a < 0 or a >= min(len(pi), self.action_size):
-                    continue
-                node = MCTSNode()
-                node.P = float(pi[a])
-                root.children[a] = node
-        else:
-            # fallback: if we cannot enumerate legal moves, include all actions
-            for a in range(min(len(pi), self.action_size)):
-                node = MCTSNode()
-                node.P = float(pi[a])
-                root.children[a] = node
+    def run(self, board) -> np.ndarray:
+        """Run `sims` simulations from `board`; returns the root visit distribution.
 
-        # If the net supports batched prediction, use a batched simulation path
-        if hasattr(self.net, 'batch_predict'):
-            # collect leaves first, then evaluate in batch
-            leaves = []  # list of (node, path, board)
-            for _ in range(self.sims):
-                try:
-                    node, path, leaf_board = self._descend_to_leaf(root, board.copy())
-                    if node is None:
-                        continue
-                    leaves.append((node, path, leaf_board))
-                except Exception:
-                    continue
+        Starts from the subtree kept by advance() when it matches `board`.
+        The tree is kept in `self.tree`; root_children() gives its root moves.
+        """
+        tree, self._next = self._next, None
+        key = getattr(board, 'zobrist_key', None)
+        if tree is None or (tree.root_key is not None and key is not None and tree.root_key != key):
+            tree = MCTSTree(capacity=max(1024, 2 * self.sims), table_size=self.table_size)
+        self.tree = self._base = tree
+        tree.register_root(key)
+        shared = tree.transpositions
+        tree.root_sign = -1 if getattr(board, 'side_to_move', 0) == 1 else 1
+        reused = int(tree.node_N[0])
+        if tree.node_count[0] < 0:
+            # net expects a board-like object; net wrapper should accept board
+            pi_logits, _ = self.net(board)
+            self._expand(tree, 0, board, pi_logits)
 
-            if leaves:
-                boards = [leaf[2] for leaf in leaves]
-                # net.batch_predict should return (pi_logits_list, values_list)
-                try:
-                    pi_list, v_list = self.net.batch_predict(boards)
-                except Exception:
-                    # fallback to sequential
-                    pi_list, v_list = [], []
-                    for b in boards:
-                        p, vv = self.net(b)
-                        pi_list.append(p)
-                        v_list.append(vv)
-
-                # process each leaf result
-                for (node, path, _), pi_logits, value in zip(leaves, pi_list, v_list):
-                    # normalise and expand
-                    if hasattr(pi_logits, 'detach'):
-                        import torch
-                        pi = torch.softmax(pi_logits, dim=-1).cpu().numpy()
-                        v = float(value.detach().cpu().item())
-                    else:
-                        import numpy as np
-                        pi = np.exp(pi_logits - pi_logits.max())
-                        pi = pi / pi.sum()
-                        v = float(value)
-
-                    # restrict expansion at the leaf to legal moves when possible
-                    leaf_board = _  # renamed for clarity
-                    legal_at_leaf = []
-                    try:
-                        if hasattr(leaf_board, 'generate_legal_moves'):
-                            legal_at_leaf = list(leaf_board.generate_legal_moves())
-                        elif _core_generate_legal_moves is not None:
-                            legal_at_leaf = list(_core_generate_legal_moves(leaf_board))
-                    except Exception:
-                        legal_at_leaf = []
-
-                    if legal_at_leaf:
-                        for m2 in legal_at_leaf:
-                            try:
-                                a = move_to_index(m2)
-                            except Exception:
-                                continue
-                            if a is None or a < 0 or a >= min(self.action_size, len(pi)):
-                                continue
-                            if a not in node.children:
-                                cn = MCTSNode()
-                                cn.P = float(pi[a])
-                                node.children[a] = cn
-                    else:
-                        for a in range(min(self.action_size, len(pi))):
-                            if a not in node.children:
-                                cn = MCTSNode()
-                                cn.P = float(pi[a])
-                                node.children[a] = cn
-
-                    # backup
-                    for parent, a in reversed(path):
-                        child = parent.children.get(a)
-                        if child is None:
-                            continue
-                        child.N += 1
-                        child.W += v
-                        child.Q = child.W / child.N
-                        parent.N += 1
+        inplace = hasattr(board, 'unmake_move')
+        if hasattr(self.net, 'batch_predict'):
+            self._run_batched(tree, board, inplace)
         else:
             for _ in range(self.sims):
-                self._simulate(root, board.copy())
+                self._simulate(tree, board if inplace else board.copy())
 
-        # return visit distribution
-        visits = [root.children[a].N if a in root.children else 0 for a in range(self.action_size)]
-        s = sum(visits)
-        if s == 0:
-            return [1.0 / self.action_size] * self.action_size
-        return [v / s for v in visits]
+        self.last_run = {'sims': self.sims, 'reused_visits': reused,
+                         'root_visits': int(tree.node_N[0]),
+                         'transpositions': tree.transpositions - shared}
+        return tree.visit_distribution(0, self.action_size)
 
-    def _simulate(self, root: MCTSNode, board):
-        path = []
-        node = root
-        b = board
-        # descent
-        while True:
-            if not node.children:
-                break
-            # select
-            best_a, best_ucb, best_child = None, -1e9, None
-            for a, child in node.children.items():
-                u = child.Q + self.c_puct * child.P * math.sqrt(node.N + 1) / (1 + child.N)
-                if u > best_ucb:
-                    best_ucb = u
-                    best_a = a
-                    best_child = child
-            if best_child is None:
-                break
-            path.append((node, best_a))
-            # apply move
-            # translate action index to Move and apply using core Board.make_move
+    def advance(self, action: int, board=None) -> bool:
+        """Re-root at the root child reached by `action` (a move just played).
+
+        Call once per ply played since the last run(): after our own move and
+        again after the opponent's reply. `board`, the position after the
+        move, lets run() check the subtree against the position it gets.
+        Returns False (and drops the tree) if the move was never searched.
+        """
+        tree = self._next if self._next is not None else self._base
+        self._next = self._base = None
+        if tree is None or not self.reuse_tree:
+            return False
+        actions, _, _ = tree.children(0)
+        hits = np.flatnonzero(actions == action)
+        if len(hits) == 0:
+            return False
+        child = int(tree.edge_child[int(tree.node_first[0]) + int(hits[0])])
+        if child < 0:
+            return False
+        sub = tree.subtree(child, capacity=max(1024, 2 * self.sims))
+        sub.root_sign = -tree.root_sign
+        sub.root_key = getattr(board, 'zobrist_key', None) if board is not None else None
+        self._next = sub
+        return True
+
+    def advance_to(self, prev_board, board) -> bool:
+        """advance() through the root move leading from `prev_board` (the root
+        position) to `board`, found by zobrist key; for callers that only see
+        positions, e.g. the opponent's reply. `prev_board` is left unchanged.
+        """
+        tree = self._next if self._next is not None else self._base
+        key = getattr(board, 'zobrist_key', None)
+        if tree is None or key is None or not hasattr(prev_board, 'unmake_move'):
+            self.reset()
+            return False
+        actions, moves, _ = tree.children(0)
+        for a, mv in zip(actions, moves):
+            if mv is None:
+                continue
             try:
-                f, t, promo = index_to_move(best_a)
-                if Move is None:
-                    return
-                mv = Move(from_sq=f, to_sq=t, piece=None, is_capture=False, promotion=promo)
-                # core Board.make_move expects piece filled; try to fill from mailbox
-                cell = b.mailbox[f]
-                if cell is None:
-                    return
-                color, ptype = cell
-                mv.piece = ptype
-                b.make_move(mv)
+                prev_board.make_move(mv)
             except Exception:
-                return
-            node = best_child
-
-        # expand and evaluate
-        pi_logits, value = self.net(b)
-        if hasattr(pi_logits, 'detach'):
-            import torch
-            pi = torch.softmax(pi_logits, dim=-1).cpu().numpy()
-            v = float(value.detach().cpu().item())
-        else:
-            import numpy as np
-            pi = np.exp(pi_logits - pi_logits.max())
-            pi = pi / pi.sum()
-            v = float(value)
-
-        # add children - restrict to legal moves when possible
-        # same fallback for expansion: prefer board.generate_legal_moves,
-        # otherwise use core generator if available
-        legal_here = []
-        try:
-            if hasattr(b, 'generate_legal_moves'):
-                legal_here = list(b.generate_legal_moves())
-            elif _core_generate_legal_moves is not None:
-                legal_here = list(_core_generate_legal_moves(b))
-        except Exception:
-            legal_here = []
-
-        if legal_here:
-            for m2 in legal_here:
+                continue
+            try:
+                hit = prev_board.zobrist_key == key
+            finally:
+                prev_board.unmake_move()
+            if hit:
+                return self.advance(int(a), board)
+        self.reset()
+        return False
+
+    def reset(self) -> None:
+        """Forget any kept subtree (e.g. at the start of a new game)."""
+        self._next = self._base = None
+
+    def root_children(self) -> Tuple[np.ndarray, List[Any], np.ndarray]:
+        """(legal actions, their Move objects, visit counts) at the root of the last run()."""
+        if self.tree is None:
+            return np.zeros(0, dtype=np.int64), [], np.zeros(0)
+        return self.tree.children(0)
+
+    def _run_batched(self, tree: MCTSTree, board, inplace: bool = False) -> None:
+        spent = 0
+        while spent < self.sims:
+            leaves = []  # list of (node, path, leaf board, its legal moves)
+            pending = set()
+            while len(leaves) < self.batch_size and spent < self.sims:
+                b = board if inplace else board.copy()
                 try:
-                    a = move_to_index(m2)
+                    node, path, _ = self._descend_to_leaf(tree, b)
                 except Exception:
+                    node = None
+                if node is None:
+                    spent += 1
                     continue
-                if a is None or a < 0 or a >= min(self.action_size, len(pi)):
-                    continue
-                if a not in node.children:
-                    cn = MCTSNode()
-                    cn.P = float(pi[a])
-                    node.children[a] = cn
-        else:
-            for a in range(min(self.action_size, len(pi))):
-                if a not in node.children:
-                    cn = MCTSNode()
-                    cn.P = float(pi[a])
-                    node.children[a] = cn
-
-        # backup
-        for parent, a in reversed(path):
-            child = parent.children.get(a)
-            if child is None:
+                try:
+                    if tree.node_count[node] >= 0:
+                        # repetition (a draw) or mate/stalemate: nothing to evaluate
+                        tree.backup(path, _known_value(tree, node, b))
+                        spent += 1
+                        continue
+                    if node in pending:
+                        # virtual loss could not steer away: evaluate what we have
+                        break
+                    legal_here = _legal_moves(b)
+                    if legal_here is not None and not legal_here:
+                        tree.expand(node, np.zeros(0, dtype=np.int64), np.zeros(0))
+                        tree.backup(path, _terminal_value(b))
+                        spent += 1
+                        continue
+                    pending.add(node)
+                    tree.add_virtual_loss(path, self.virtual_loss)
+                    leaves.append((node, path, b.copy() if inplace else b, legal_here))
+                    spent += 1
+                finally:
+                    if inplace:
+                        _unwind(b, len(path))
+            if not leaves:
                 continue
-            child.N += 1
-            child.W += v
-            child.Q = child.W / child.N
-            parent.N += 1
-
-    def _descend_to_leaf(self, root: MCTSNode, board):
-        """Descend the tree from root to a leaf without evaluating the leaf.
-        Returns (node, path, board) where node is the leaf node (may have no children yet),
-        path is the list of (parent, action) pairs, and board is the board at leaf.
+
+            boards = [leaf[2] for leaf in leaves]
+            # net.batch_predict should return (pi_logits_list, values_list)
+            try:
+                pi_list, v_list = self.net.batch_predict(boards)
+            except Exception:
+                # fallback to sequential
+                pi_list, v_list = [], []
+                for b in boards:
+                    p, vv = self.net(b)
+                    pi_list.append(p)
+                    v_list.append(vv)
+
+            for (node, path, leaf_board, legal_here), pi_logits, value in zip(leaves, pi_list, v_list):
+                tree.revert_virtual_loss(path, self.virtual_loss)
+                self._expand(tree, node, leaf_board, pi_logits, legal_here)
+                tree.backup(path, _scalar(value))
+
+    def _simulate(self, tree: MCTSTree, board):
+        """One simulation on `board` (left as it was found when it has unmake_move)."""
+        node, path, b = self._descend_to_leaf(tree, board)
+        if node is None:
+            return
+        try:
+            if tree.node_count[node] >= 0:
+                # repetition (a draw) or mate/stalemate: nothing to evaluate
+                tree.backup(path, _known_value(tree, node, b))
+                return
+            legal_here = _legal_moves(b)
+            if legal_here is not None and not legal_here:
+                tree.expand(node, np.zeros(0, dtype=np.int64), np.zeros(0))
+                tree.backup(path, _terminal_value(b))
+                return
+            # expand and evaluate
+            pi_logits, value = self.net(b)
+            self._expand(tree, node, b, pi_logits, legal_here)
+            tree.backup(path, _scalar(value))
+        finally:
+            _unwind(b, len(path))
+
+    def _descend_to_leaf(self, tree: MCTSTree, board):
+        """Descend the tree from the root to a leaf without evaluating the leaf.
+
+        The path's moves are made on `board`; the caller unwinds them.
+        Returns (node, path, board) where node is the leaf node (may not be
+        expanded yet) and path is the list of (parent node, edge) pairs;
+        (None, None, None), with the board restored, if a move could not be
+        applied. With transpositions the leaf may be an expanded node already
+        on the path (a repetition).
         """
         path = []
-        node = root
-        b = board
-        # descent
+        node = 0
+        on_path = {0} if tree.table is not None else None
         while True:
-            if not node.children:
-                break
-            # select
-            best_a, best_ucb, best_child = None, -1e9, None
-            for a, child in node.children.items():
-                u = child.Q + self.c_puct * child.P * math.sqrt(node.N + 1) / (1 + child.N)
-                if u > best_ucb:
-                    best_ucb = u
-                    best_a = a
-                    best_child = child
-            if best_child is None:
+            edge = tree.select(node, self.c_puct)
+            if edge < 0:
                 break
-            path.append((node, best_a))
-            # apply move
+            mv = tree.edge_move[edge]
+            if mv is None:
+                mv = _action_to_move(board, int(tree.edge_action[edge]))
             try:
-                f, t, promo = index_to_move(best_a)
-                if Move is None:
-                    return None, None, None
-                mv = Move(from_sq=f, to_sq=t, piece=None, is_capture=False, promotion=promo)
-                cell = b.mailbox[f]
-                if cell is None:
-                    return None, None, None
-                color, ptype = cell
-                mv.piece = ptype
-                b.make_move(mv)
+                if mv is None:
+                    raise ValueError("no move for action")
+                board.make_move(mv)
             except Exception:
+                _unwind(board, len(path))
                 return None, None, None
-            node = best_child
+            path.append((node, edge))
+            if on_path is None:
+                node = tree.child(edge)
+                continue
+            node = tree.child(edge, getattr(board, 'zobrist_key', None))
+            if node in on_path:
+                break
+            on_path.add(node)
+        return node, path, board
+
+    def _expand(self, tree: MCTSTree, node: int, board, pi_logits, legal_here=None) -> None:
+        """Create the children of `node`: legal moves when they can be enumerated, else every action.
+
+        Priors are the softmax of the logits of those actions only. A
+        position whose move list is empty (mate, stalemate) becomes a
+        terminal node without children.
+        """
+        if tree.node_count[node] >= 0:
+            return
+        logits = _to_numpy(pi_logits)
+        limit = min(self.action_size, len(logits))
+        if legal_here is None:
+            legal_here = _legal_moves(board)
+        moves = None
+        if legal_here is not None:
+            by_action = {}
+            for m in legal_here:
+                try:
+                    a = move_to_index(m)
+                except Exception:
+                    continue
+                if a is None or a < 0 or a >= limit:
+                    continue
+                by_action.setdefault(a, m)
+            actions = np.fromiter(by_action, dtype=np.int64, count=len(by_action))
+            moves = list(by_action.values())
+        else:
+            actions = np.arange(limit, dtype=np.int64)
+        tree.expand(node, actions, _softmax(logits[actions]), moves)
+
+
+def _grow(arr: np.ndarray, size: int, fill) -> np.ndarray:
+    out = np.full(size, fill, dtype=arr.dtype)
+    out[:len(arr)] = arr
+    return out
+
+
+def _to_numpy(pi_logits) -> np.ndarray:
+    # expect pi_logits as numpy or torch (CPU tensors convert without a copy)
+    if hasattr(pi_logits, 'detach'):
+        return pi_logits.detach().cpu().numpy()
+    return np.asarray(pi_logits)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    if len(logits) == 0:
+        return np.zeros(0)
+    pi = np.exp(logits - logits.max())
+    return pi / pi.sum()
+
+
+def _scalar(value) -> float:
+    if hasattr(value, 'detach'):
+        return float(value.detach().cpu().item())
+    return float(value)
+
+
+def _legal_moves(board) -> Optional[List[Any]]:
+    # prefer board.generate_legal_moves, otherwise use core generator if available;
+    # None when the board cannot list its moves
+    try:
+        if hasattr(board, 'generate_legal_moves'):
+            return list(board.generate_legal_moves())
+        if _core_generate_legal_moves is not None:
+            return list(_core_generate_legal_moves(board))
+    except Exception:
+        pass
+    return None
+
+
+def _terminal_value(board) -> float:
+    """White's result at a position without legal moves: the side to move is mated if in check, else stalemate."""
+    try:
+        side = board.side_to_move
+        mated = board.is_in_check(side)
+    except Exception:
+        return 0.0
+    if not mated:
+        return 0.0
+    return -1.0 if int(side) == 0 else 1.0
+
+
+def _known_value(tree: MCTSTree, node: int, board) -> float:
+    # an expanded leaf: a repetition on the path (draw) or a terminal node
+    return _terminal_value(board) if tree.node_count[node] == 0 else 0.0
+
+
+def _unwind(board, plies: int) -> None:
+    unmake = getattr(board, 'unmake_move', None)
+    if unmake is not None:
+        for _ in range(plies):
+            unmake()
+
+
+def _action_to_move(board, action: int):
+    """Move for an action index on `board` (piece from the mailbox); None if impossible.
 
-        return node, path, b
+    Only needed for nodes expanded without a legal move list.
+    """
+    if Move is None:
+        return None
+    try:
+        f, t, promo = index_to_move(action)
+        cell = board.mailbox[f]
+    except Exception:
+        return None
+    if cell is None:
+        return None
+    _, ptype = cell
+    return Move(from_sq=f, to_sq=t, piece=ptype, is_capture=board.mailbox[t] is not None,
+                promotion=promo)
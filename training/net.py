@@ -2,49 +2,120 @@
 The MCTS implementation checks for a `batch_predict` attribute on the net
 callable; this module exposes `make_net_predictor(model)` which returns an
 object that can be called with a board and also supports `batch_predict(boards)`.
+
+With an `EvalCache` (training.eval_cache) positions are looked up by
+zobrist key and model version first and the model only runs on the boards
+that miss. Cached results come back as NumPy arrays: the full logits vector
+with illegal actions masked, and the value as a float.
 """
 from __future__ import annotations
-from typing import Iterable, List, Tuple
+from typing import Hashable, Iterable, List, Optional, Tuple
 
+import numpy as np
 import torch
 
+from training.encoder import BatchEncoder
+from training.eval_cache import EvalCache, expand_logits, legal_actions
+
 
 class NetPredictor:
-    def __init__(self, model):
+    """Board -> (policy logits, value) wrapper around a model.
+
+    Args:
+        model: torch module mapping a (B, C, H, W) batch to (logits, values)
+        cache: optional EvalCache shared by every call
+        model_version: cache key of the weights; by default it is derived
+            from the model identity and the in-place version counters of its
+            parameters and buffers, so optimizer steps and load_state_dict
+            invalidate cached evaluations automatically
+    """
+
+    def __init__(self, model, cache: Optional[EvalCache] = None, model_version: Optional[Hashable] = None):
         self.model = model
+        self.cache = cache
+        self._model_version = model_version
+        # length of the logits vector rebuilt on cache hits (taken from the model's output)
+        from training.encoder import ACTION_SIZE
+        self._policy_size = ACTION_SIZE
+        self._encoder = BatchEncoder()
         # infer device from model parameters
         try:
             self.device = next(model.parameters()).device
         except Exception:
             self.device = torch.device('cpu')
 
-    def __call__(self, board):
-        # lazy import to avoid circulars
-        from training.encoder import board_to_tensor
+    @property
+    def model_version(self) -> Hashable:
+        if self._model_version is not None:
+            return self._model_version
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return id(self.model), sum(t._version for t in tensors)
 
-        x = board_to_tensor(board)
-        t = torch.tensor(x[None], dtype=torch.float32, device=self.device)
-        pi, v = self.model(t)
+    def __call__(self, board):
+        if self.cache is not None:
+            pis, vs = self.batch_predict([board])
+            return pis[0], vs[0]
+        pi, v = self.model(self._encode([board]))
         return pi[0].detach(), v[0].detach()
 
     def batch_predict(self, boards: Iterable) -> Tuple[List, List]:
         """Predict priors and values for a list of board objects in a single
         batched model call. Returns two lists: pi_logits_list and values_list.
         """
-        from training.encoder import board_to_tensor
-
-        xs = [board_to_tensor(b) for b in boards]
-        if len(xs) == 0:
+        if self.cache is not None:
+            return self._cached_predict(list(boards))
+        boards = list(boards)
+        if len(boards) == 0:
             return [], []
-        import numpy as np
-        arr = np.stack(xs, axis=0)
-        t = torch.tensor(arr, dtype=torch.float32, device=self.device)
-        pi_batch, v_batch = self.model(t)
+        pi_batch, v_batch = self.model(self._encode(boards))
         # return lists of detached tensors (MCTS handles torch tensors)
         pi_list = [p.detach() for p in pi_batch]
         v_list = [vv.detach() for vv in v_batch]
         return pi_list, v_list
 
+    def _encode(self, boards: List) -> torch.Tensor:
+        """Input batch for `boards`, encoded into the reused buffer (no copy on CPU)."""
+        return self._encoder.encode_torch(boards).to(self.device)
+
+    def _cached_predict(self, boards: List) -> Tuple[List, List]:
+        """batch_predict through the cache: the model only sees the misses."""
+        version = self.model_version
+        pis: List = [None] * len(boards)
+        vs: List = [None] * len(boards)
+        missed = []
+        for i, b in enumerate(boards):
+            key = getattr(b, 'zobrist_key', None)
+            entry = self.cache.get(version, key) if key is not None else None
+            if entry is None:
+                missed.append(i)
+                continue
+            actions, logits, value = entry
+            pis[i] = expand_logits(actions, logits, self._policy_size)
+            vs[i] = np.float32(value)
+        if not missed:
+            return pis, vs
+
+        t = self._encode([boards[i] for i in missed])
+        with torch.no_grad():
+            pi_batch, v_batch = self.model(t)
+        pi_np = pi_batch.detach().float().cpu().numpy()
+        self._policy_size = pi_np.shape[1]
+        v_np = v_batch.detach().float().cpu().numpy().reshape(len(missed), -1)[:, 0]
+        for row, i in enumerate(missed):
+            b = boards[i]
+            key = getattr(b, 'zobrist_key', None)
+            actions = legal_actions(b) if key is not None else None
+            if actions is not None and len(actions):
+                actions = actions[actions < pi_np.shape[1]]
+                logits = pi_np[row, actions].copy()
+                self.cache.put(version, key, actions, logits, float(v_np[row]))
+                pis[i] = expand_logits(actions, logits, pi_np.shape[1])
+            else:
+                pis[i] = pi_np[row].copy()
+            vs[i] = np.float32(v_np[row])
+        return pis, vs
+
+
+def make_net_predictor(model, cache: Optional[EvalCache] = None, model_version: Optional[Hashable] = None):
+    return NetPredictor(model, cache=cache, model_version=model_version)
 
-def make_net_predictor(model):
-    return NetPredictor(model)
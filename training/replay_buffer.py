@@ -1,11 +1,32 @@
-"""Persistent circular replay buffer using torch.save (pickle-backed).
+"""Replay buffers.
+
+ReplayBuffer: persistent circular buffer using torch.save (pickle-backed).
 Stores tuples (state_np, pi_np, player, outcome)
+
+CompactReplayBuffer: on-disk ring of fixed-size records, memory-mapped.
+A record is the twelve piece bitboards plus side to move, castling rights
+and en-passant square, the top-K (action, probability) pairs of the policy,
+the player and both rewards: a few hundred bytes instead of the ~80 KB of a
+float32 state plus a dense 20480-float policy. add() writes one record in
+place (O(1), nothing is rewritten); sample() reads `batch_size` random
+records and decodes them into training arrays on demand.
+
+File layout (little-endian):
+    header : <8s I I I Q Q -> signature, version, top_k, record size,
+                              capacity, records ever written
+    records: capacity x record (see record_dtype)
 """
 from __future__ import annotations
 import collections
 import os
+import random
+import struct
 import torch
-from typing import Deque, Tuple
+from typing import Deque, List, Tuple
+
+import numpy as np
+
+from training.encoder import ACTION_SIZE, BOARD_SHAPE, bitboards_to_planes, planes_to_bitboards
 
 
 class ReplayBuffer:
@@ -37,3 +58,195 @@ class ReplayBuffer:
 
     def __len__(self):
         return len(self.buf)
+
+
+SIGNATURE = b"XAIREPLY"
+VERSION = 1
+_HEADER = struct.Struct("<8sIIIQQ")
+_COUNT_OFFSET = _HEADER.size - 8
+
+
+def record_dtype(top_k: int) -> np.dtype:
+    """NumPy dtype of one compact record keeping `top_k` policy entries."""
+    return np.dtype([
+        ('bitboards', '<u8', (12,)),   # WHITE PAWN..KING, BLACK PAWN..KING
+        ('side', 'u1'),
+        ('castling', 'u1'),
+        ('ep', 'i1'),                  # en-passant square, -1 if none
+        ('player', 'i1'),
+        ('n_policy', '<u2'),
+        ('actions', '<u2', (top_k,)),
+        ('probs', '<f4', (top_k,)),
+        ('step_reward', '<f4'),
+        ('final_reward', '<f4'),
+    ])
+
+
+class CompactReplayBuffer:
+    """Memory-mapped ring buffer of compact training records.
+
+    Args:
+        path: buffer file, created if missing and reopened (resumed) otherwise
+        capacity: number of records kept; the oldest are overwritten
+        top_k: policy entries kept per record (the most visited actions)
+
+    add() takes the items self-play produces, (state, pi, player, step_reward,
+    final_reward) or (state, pi, player, outcome); 4-field items store the
+    outcome as both rewards, so any step/final weighting summing to 1 trains
+    on the outcome. add_board() records the position from a Board (castling
+    and en passant included, which the state tensor does not carry).
+    """
+
+    def __init__(self, path: str, capacity: int = 100_000, top_k: int = 32):
+        self.path = path
+        self.capacity = int(capacity)
+        self.top_k = int(top_k)
+        self.dtype = record_dtype(self.top_k)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        size = _HEADER.size + self.capacity * self.dtype.itemsize
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as fh:
+                fh.write(_HEADER.pack(SIGNATURE, VERSION, self.top_k, self.dtype.itemsize, self.capacity, 0))
+                fh.truncate(size)
+        else:
+            with open(path, "rb") as fh:
+                head = fh.read(_HEADER.size)
+            if len(head) < _HEADER.size:
+                raise ValueError(f"truncated replay buffer: {path}")
+            sig, version, top_k, record_size, cap, _ = _HEADER.unpack(head)
+            if sig != SIGNATURE or version != VERSION:
+                raise ValueError(f"not a v{VERSION} replay buffer: {path}")
+            if (top_k, record_size, cap) != (self.top_k, self.dtype.itemsize, self.capacity):
+                raise ValueError(f"replay buffer {path} has capacity={cap}, top_k={top_k}; "
+                                 f"requested capacity={self.capacity}, top_k={self.top_k}")
+            if os.path.getsize(path) != size:
+                raise ValueError(f"truncated replay buffer: {path}")
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r+")
+        self._count = self._mm[_COUNT_OFFSET:_HEADER.size].view('<u8')
+        self._records = self._mm[_HEADER.size:].view(self.dtype)
+
+    @property
+    def written(self) -> int:
+        """Records ever added (the ring holds the last `capacity` of them)."""
+        return int(self._count[0])
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    # ------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------
+    def add(self, item: Tuple) -> None:
+        self.add_records(encode_records([item], self.top_k))
+
+    def add_board(self, board, pi, player, step_reward: float, final_reward: float) -> None:
+        rec = np.zeros(1, dtype=self.dtype)
+        rec['bitboards'][0] = [bb for row in board.bitboards for bb in row[:6]]
+        rec['side'] = 1 if board.side_to_move else 0
+        rec['castling'] = int(getattr(board, 'castling_rights', 0) or 0)
+        ep = getattr(board, 'en_passant_square', None)
+        rec['ep'] = -1 if ep is None else int(ep)
+        _fill_targets(rec[0], pi, player, step_reward, final_reward, self.top_k)
+        self.add_records(rec)
+
+    def add_records(self, records: np.ndarray) -> None:
+        """Append already encoded records (record_dtype(top_k)), e.g. from self-play shards."""
+        records = records[-self.capacity:]
+        n = len(records)
+        if n == 0:
+            return
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self._records[start:start + first] = records[:first]
+        self._records[:n - first] = records[first:]
+        # the count is bumped last: records are visible only once complete
+        self._count[0] += n
+
+    # ------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------
+    def sample_arrays(self, batch_size: int) -> Tuple[np.ndarray, ...]:
+        """(states, pis, players, step_rewards, final_rewards) of random distinct records.
+
+        states is (B,13,8,8) float32 and pis (B, ACTION_SIZE) float32, the
+        kept policy entries renormalised to sum to 1.
+        """
+        n = len(self)
+        idx = np.sort(np.fromiter(random.sample(range(n), min(batch_size, n)), dtype=np.int64))
+        return decode_records(self._records[idx])
+
+    def decode(self, rec: np.ndarray) -> Tuple[np.ndarray, ...]:
+        return decode_records(rec)
+
+    def sample_tensors(self, batch_size: int, device=None) -> Tuple[torch.Tensor, ...]:
+        """sample_arrays() as torch tensors on `device`."""
+        return tuple(torch.from_numpy(a).to(device) if device is not None else torch.from_numpy(a)
+                     for a in self.sample_arrays(batch_size))
+
+    def sample(self, batch_size: int) -> List[Tuple]:
+        """Random records as (state, pi, player, step_reward, final_reward) tuples (ReplayBuffer API)."""
+        states, pis, players, step, final = self.sample_arrays(batch_size)
+        return [(states[i], pis[i], int(players[i]), float(step[i]), float(final[i]))
+                for i in range(len(states))]
+
+    def save(self) -> None:
+        self._mm.flush()
+
+    def close(self) -> None:
+        self.save()
+        # dropping the last references unmaps the file
+        del self._records, self._count, self._mm
+
+
+
+def encode_records(items, top_k: int) -> np.ndarray:
+    """Compact records of replay items (state, pi, player, step_reward, final_reward)
+    or (state, pi, player, outcome); 4-field items store the outcome as both rewards.
+    """
+    items = list(items)
+    recs = np.zeros(len(items), dtype=record_dtype(top_k))
+    if not items:
+        return recs
+    planes = np.stack([np.asarray(it[0], dtype=np.float32).reshape(BOARD_SHAPE) for it in items])
+    recs['bitboards'] = planes_to_bitboards(planes)
+    recs['side'] = planes[:, 12].reshape(len(items), -1).any(axis=1)
+    recs['ep'] = -1
+    for rec, it in zip(recs, items):
+        step_reward, final_reward = (it[3], it[4]) if len(it) >= 5 else (it[3], it[3])
+        _fill_targets(rec, it[1], it[2], step_reward, final_reward, top_k)
+    return recs
+
+
+def decode_records(rec: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """(states, pis, players, step_rewards, final_rewards) training arrays of compact records."""
+    b = len(rec)
+    top_k = rec.dtype['actions'].shape[0]
+    states = np.empty((b,) + BOARD_SHAPE, dtype=np.float32)
+    bitboards_to_planes(rec['bitboards'], rec['side'], states)
+    pis = np.zeros((b, ACTION_SIZE), dtype=np.float32)
+    keep = np.arange(top_k) < rec['n_policy'][:, None]
+    rows = np.nonzero(keep)[0]
+    pis[rows, rec['actions'][keep]] = rec['probs'][keep]
+    totals = pis.sum(axis=1, keepdims=True)
+    np.divide(pis, totals, out=pis, where=totals > 0)
+    return (states, pis, rec['player'].astype(np.int64),
+            rec['step_reward'].astype(np.float32), rec['final_reward'].astype(np.float32))
+
+
+def _fill_targets(rec, pi, player, step_reward, final_reward, top_k: int) -> None:
+    # policy: the top_k most visited actions
+    if hasattr(pi, 'detach'):
+        pi = pi.detach().cpu().numpy()
+    pi = np.asarray(pi, dtype=np.float32).reshape(-1)
+    nz = np.flatnonzero(pi > 0)
+    if len(nz) > top_k:
+        nz = nz[np.argpartition(pi[nz], -top_k)[-top_k:]]
+    k = len(nz)
+    rec['n_policy'] = k
+    rec['actions'][:k] = nz
+    rec['probs'][:k] = pi[nz]
+    rec['player'] = int(player)
+    rec['step_reward'] = float(step_reward)
+    rec['final_reward'] = float(final_reward)
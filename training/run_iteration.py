@@ -20,6 +20,7 @@ def run_iteration(
     eval_games: int = 200,
     eval_sims: int = 80,
     eval_threshold: float = 0.55,
+    book_path: str = None,
 ):
     """Run one complete training iteration."""
     print(f"\n{'='*70}")
@@ -49,7 +50,8 @@ def run_iteration(
         model = make_model(device=device, channels=64, blocks=6)
         from .net import make_net_predictor
         net = make_net_predictor(model)
-        worker = SelfPlayWorker(net, mcts_sims=selfplay_sims)
+        from engine.book import open_book
+        worker = SelfPlayWorker(net, mcts_sims=selfplay_sims, book=open_book(book_path))
         buf = ReplayBuffer(
             os.path.join(agent_dir, 'checkpoints/replay.pt'),
             capacity=200_000
@@ -132,6 +134,7 @@ def main():
     p.add_argument('--eval-games', type=int, default=20)
     p.add_argument('--eval-sims', type=int, default=50)
     p.add_argument('--eval-threshold', type=float, default=0.55)
+    p.add_argument('--book', help='Polyglot .bin opening book for self-play openings')
     args = p.parse_args()
 
     ok = run_iteration(
@@ -144,6 +147,7 @@ def main():
         eval_games=args.eval_games,
         eval_sims=args.eval_sims,
         eval_threshold=args.eval_threshold,
+        book_path=args.book,
     )
     sys.exit(0 if ok else 1)
 
@@ -3,22 +3,47 @@ Includes reward shaping for incremental feedback during training.
 """
 from __future__ import annotations
 import time
-from training.encoder import board_to_tensor, move_to_index, index_to_move, ACTION_SIZE
-from core.moves.legal_movegen import generate_legal_moves
+
+import numpy as np
+
+from training.encoder import board_to_tensor, index_to_move, ACTION_SIZE
 from core.moves.move import Move
 
 
+def adjudicate(board):
+    """Game result from White's view (1, 0, -1) if a bitbase covers `board`, else None."""
+    from engine.bitbase import probe
+    try:
+        result = probe(board)
+    except Exception:
+        return None
+    if result is None:
+        return None
+    return result if int(board.side_to_move) == 0 else -result
+
+
 class SelfPlayWorker:
-    def __init__(self, net_predict, mcts_sims=50, use_reward_shaping=True):
+    def __init__(self, net_predict, mcts_sims=50, use_reward_shaping=True, book=None, adjudicate=True,
+                 reuse_tree=True):
         """
         Args:
             net_predict: network predictor
             mcts_sims: number of MCTS simulations per move
             use_reward_shaping: if True, calculate incremental rewards; else use only final outcome
+            book: optional opening book (engine.book.PolyglotBook); book moves are played
+                  without MCTS and produce no training records
+            adjudicate: end the game as soon as an endgame bitbase (engine.bitbase)
+                  knows the result, instead of playing it out up to max_moves
+            reuse_tree: start each move's search from the subtree of the move
+                  just played (see last_game_stats for the effective simulations)
         """
+        self.book = book
+        self.adjudicate = adjudicate
         self.net = net_predict
         from training.mcts import MCTS
-        self.mcts = MCTS(net_predict, action_size=ACTION_SIZE, sims=mcts_sims)
+        self.mcts = MCTS(net_predict, action_size=ACTION_SIZE, sims=mcts_sims, reuse_tree=reuse_tree)
+        # per game: searched moves, sims budget, mean carried and effective root visits
+        self.last_game_stats = {}
         self.use_reward_shaping = use_reward_shaping
         
         if use_reward_shaping:
@@ -30,58 +55,67 @@ class SelfPlayWorker:
     def play_game(self, board, temperature=1.0, max_moves=512):
         records = []
         move_count = 0
+        in_book = self.book is not None
+        outcome = None
+        self.mcts.reset()
+        reused, effective = [], []
         while move_count < max_moves:
+            if self.adjudicate:
+                outcome = adjudicate(board)
+                if outcome is not None:
+                    break
+
+            if in_book:
+                book_move = self.book.choose_move(board)
+                if book_move is not None:
+                    board.make_move(book_move)
+                    move_count += 1
+                    continue
+                in_book = False
+
             pi = self.mcts.run(board)
+            reused.append(self.mcts.last_run['reused_visits'])
+            effective.append(self.mcts.last_run['root_visits'])
             # store state and pi
             state = board_to_tensor(board)
-            
-            # select move among legal moves (temperature)
-            legal_moves = list(generate_legal_moves(board))
-            legal_indices = []
-            for m in legal_moves:
-                idx = move_to_index(m)
-                if idx is not None:
-                    legal_indices.append(idx)
 
-            if not legal_indices:
+            # select among the root's legal moves, as expanded by the search
+            legal_indices, legal_moves, _ = self.mcts.root_children()
+            if len(legal_indices) == 0:
                 # no legal moves -> terminal
                 break
 
+            probs = pi[legal_indices]
             if temperature == 0 or move_count > 20:
                 # argmax among legal indices
-                a = max(legal_indices, key=lambda i: pi[i])
+                chosen = int(np.argmax(probs))
             else:
                 import random
-                probs = [pi[i] for i in legal_indices]
-                total = sum(probs)
+                total = float(probs.sum())
                 if total <= 0:
                     # fallback uniform
-                    probs = [1.0 / len(probs)] * len(probs)
+                    probs = np.full(len(probs), 1.0 / len(probs))
                 else:
-                    probs = [p / total for p in probs]
-                r = random.random()
-                cum = 0.0
-                chosen = 0
-                for idx, p in enumerate(probs):
-                    cum += p
-                    if r <= cum:
-                        chosen = idx
-                        break
-                a = legal_indices[chosen]
-            
-            # apply move by index (board must implement make_move_index)
-            # translate index -> Move and apply using core Board.make_move
+                    probs = probs / total
+                chosen = int(np.searchsorted(np.cumsum(probs), random.random()))
+                chosen = min(chosen, len(probs) - 1)
+            a = int(legal_indices[chosen])
+
+            # apply the cached Move (rebuilt from the index only if the root
+            # was expanded without a legal move list)
             try:
-                f, t, promo = index_to_move(a)
-                cell = board.mailbox[f]
-                if cell is None:
-                    outcome = -1 if board.side_to_move else 1
-                    # Convert records to 5-field format before returning
-                    final_reward = self.reward_shaper.calculate_final_reward(outcome) if self.reward_shaper else float(outcome)
-                    records_with_final = [(state, pi, player, step_reward, final_reward) for state, pi, player, step_reward in records]
-                    return records_with_final, outcome
-                _, ptype = cell
-                mv = Move(from_sq=f, to_sq=t, piece=ptype, is_capture=False, promotion=promo)
+                mv = legal_moves[chosen]
+                if mv is None:
+                    f, t, promo = index_to_move(a)
+                    cell = board.mailbox[f]
+                    if cell is None:
+                        outcome = -1 if board.side_to_move else 1
+                        # Convert records to 5-field format before returning
+                        final_reward = self.reward_shaper.calculate_final_reward(outcome) if self.reward_shaper else float(outcome)
+                        records_with_final = [(state, pi, player, step_reward, final_reward) for state, pi, player, step_reward in records]
+                        return records_with_final, outcome
+                    _, ptype = cell
+                    mv = Move(from_sq=f, to_sq=t, piece=ptype, is_capture=False, promotion=promo)
                 
                 # Capture player BEFORE move (since side_to_move changes after make_move)
                 player = board.side_to_move
@@ -97,6 +131,7 @@ class SelfPlayWorker:
                         )
                 else:
                     board.make_move(mv)
+                self.mcts.advance(a, board)
                 
                 # Store record with step reward (will be updated with final outcome later)
                 # Record: (state, pi, player, step_reward)
@@ -115,12 +150,20 @@ class SelfPlayWorker:
             if getattr(board, 'is_game_over', lambda: False)():
                 break
 
-        # determine outcome
-        if hasattr(board, 'game_result'):
-            outcome = board.game_result()
-        else:
-            outcome = 0
+        # determine outcome (unless adjudicated)
+        if outcome is None:
+            if hasattr(board, 'game_result'):
+                outcome = board.game_result()
+            else:
+                outcome = 0
         
+        self.last_game_stats = {
+            'searched_moves': len(effective),
+            'sims': self.mcts.sims,
+            'mean_reused_visits': float(np.mean(reused)) if reused else 0.0,
+            'mean_effective_sims': float(np.mean(effective)) if effective else 0.0,
+        }
+
         # Convert outcome to final reward and update all records
         final_reward = self.reward_shaper.calculate_final_reward(outcome) if self.reward_shaper else float(outcome)
         
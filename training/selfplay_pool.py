@@ -0,0 +1,389 @@
+"""Multi-process self-play writing sharded game records.
+
+Usage:
+  python -m training.selfplay_pool CKPT OUT_DIR --games 200 --workers 4 --sims 50
+
+Each worker process loads the checkpoint once, plays the games assigned to
+it and appends every finished game to its own shard OUT_DIR/shard_NN.bin.
+Game i is always seeded with (seed, i), so a game replays the same way
+whichever worker plays it.
+
+Shard format: a sequence of frames, one per game (little-endian):
+    header : <4s I I i I  -> b"GAME", game index, record count, outcome,
+                             crc32 of the payload
+    payload: record count x training.replay_buffer.record_dtype(top_k)
+A frame is written with a single write followed by fsync. A torn frame at
+the end of a shard (crash mid-write) fails the length or crc check. Readers
+stop there, and the next run truncates the shard to its valid prefix.
+
+Resume: games whose frame is already in a shard are skipped, so rerunning
+the same command after a crash plays only the missing games.
+
+Shutdown: the first SIGINT/SIGTERM asks the workers to stop after their
+current game (finished games are kept). A second one terminates them.
+
+Progress lines report games done, games/hour and positions/sec.
+ingest_shards() copies the records of every shard into a replay buffer.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import queue as queue_mod
+import random
+import signal
+import struct
+import sys
+import time
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from training.replay_buffer import decode_records, encode_records, record_dtype
+
+FRAME_MAGIC = b"GAME"
+_FRAME = struct.Struct("<4sIIiI")
+TOP_K = 32
+
+
+def shard_path(out_dir: str, worker: int) -> str:
+    return os.path.join(out_dir, f"shard_{worker:02d}.bin")
+
+
+def shard_paths(out_dir: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(out_dir, "shard_*.bin")))
+
+
+# ------------------------------------------------------------
+# Shards
+# ------------------------------------------------------------
+def write_game(fh, game_index: int, outcome: int, records: np.ndarray) -> None:
+    """Append one game frame to an open shard and make it durable."""
+    payload = records.tobytes()
+    fh.write(_FRAME.pack(FRAME_MAGIC, game_index, len(records), int(outcome), zlib.crc32(payload)) + payload)
+    fh.flush()
+    os.fsync(fh.fileno())
+
+
+def iter_shard(path: str, top_k: int = TOP_K) -> Iterator[Tuple[int, int, np.ndarray, int]]:
+    """Yield (game index, outcome, records, end offset) for each complete frame of a shard."""
+    dtype = record_dtype(top_k)
+    with open(path, "rb") as fh:
+        data = fh.read()
+    pos = 0
+    while pos + _FRAME.size <= len(data):
+        magic, index, count, outcome, crc = _FRAME.unpack_from(data, pos)
+        end = pos + _FRAME.size + count * dtype.itemsize
+        if magic != FRAME_MAGIC or end > len(data):
+            return
+        payload = data[pos + _FRAME.size:end]
+        if zlib.crc32(payload) != crc:
+            return
+        yield index, outcome, np.frombuffer(payload, dtype=dtype), end
+        pos = end
+
+
+def repair_shard(path: str, top_k: int = TOP_K) -> Set[int]:
+    """Truncate a shard after its last complete frame; returns the game indices it holds."""
+    done, valid = set(), 0
+    for index, _, _, end in iter_shard(path, top_k):
+        done.add(index)
+        valid = end
+    if os.path.getsize(path) != valid:
+        with open(path, "r+b") as fh:
+            fh.truncate(valid)
+    return done
+
+
+def completed_games(out_dir: str, top_k: int = TOP_K) -> Set[int]:
+    """Indices of the games already stored in the shards of `out_dir` (repairing torn tails)."""
+    done: Set[int] = set()
+    for path in shard_paths(out_dir):
+        done |= repair_shard(path, top_k)
+    return done
+
+
+def ingest_shards(out_dir: str, buffer, top_k: int = TOP_K) -> int:
+    """Add every stored game of `out_dir` to `buffer`; returns the number of positions.
+
+    Compact buffers (add_records) receive the records as they are; others get
+    decoded (state, pi, player, step_reward, final_reward) tuples.
+    """
+    added = 0
+    for path in shard_paths(out_dir):
+        for _, _, records, _ in iter_shard(path, top_k):
+            if hasattr(buffer, "add_records") and buffer.top_k == top_k:
+                buffer.add_records(records)
+            else:
+                states, pis, players, steps, finals = decode_records(records)
+                for i in range(len(records)):
+                    buffer.add((states[i], pis[i], int(players[i]), float(steps[i]), float(finals[i])))
+            added += len(records)
+    return added
+
+
+# ------------------------------------------------------------
+# Workers
+# ------------------------------------------------------------
+def _load_model(cfg: Dict):
+    import torch
+    from training.encoder import check_input_layout
+    from training.model import make_model
+
+    model = make_model(device="cpu", **cfg.get("model_kwargs", {}))
+    ckpt = torch.load(cfg["checkpoint"], map_location="cpu")
+    model.load_state_dict(check_input_layout(ckpt, cfg["checkpoint"]))
+    model.eval()
+    return model
+
+
+def play_games(worker: int, games: List[int], cfg: Dict, events, stop) -> None:
+    """Worker body: play `games` (indices), append each to this worker's shard.
+
+    `events` receives ("game", worker, index, positions, outcome, seconds)
+    per finished game and ("done", worker) at the end; `stop` is checked
+    between games.
+    """
+    import torch
+    from core.board.board import Board
+    from training.eval_cache import EvalCache
+    from training.net import make_net_predictor
+    from training.selfplay import SelfPlayWorker
+
+    torch.set_num_threads(cfg.get("threads", 1))
+    net = make_net_predictor(_load_model(cfg), cache=EvalCache())
+    book = None
+    if cfg.get("book_path"):
+        from engine.book import open_book
+        book = open_book(cfg["book_path"])
+    sp = SelfPlayWorker(net, mcts_sims=cfg["sims"], book=book)
+    with open(shard_path(cfg["out_dir"], worker), "ab") as fh:
+        for index in games:
+            if stop.is_set():
+                break
+            seed = cfg["seed"] * 1_000_003 + index
+            random.seed(seed)
+            np.random.seed(seed % (1 << 32))
+            torch.manual_seed(seed)
+            start = time.perf_counter()
+            with torch.no_grad():
+                recs, outcome = sp.play_game(Board(), temperature=cfg["temperature"], max_moves=cfg["max_moves"])
+            outcome = int(outcome or 0)
+            write_game(fh, index, outcome, encode_records(recs, cfg["top_k"]))
+            events.put(("game", worker, index, len(recs), outcome, time.perf_counter() - start))
+    events.put(("done", worker))
+
+
+def _worker_main(worker: int, games: List[int], cfg: Dict, events, stop) -> None:
+    # the orchestrator owns Ctrl-C: workers only watch the stop event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    play_games(worker, games, cfg, events, stop)
+
+
+class _Progress:
+    def __init__(self, total: int, already: int, log: Callable[[str], None], every: float):
+        self.total, self.already, self.log, self.every = total, already, log, every
+        self.games = self.positions = 0
+        self.outcomes = {1: 0, 0: 0, -1: 0}
+        self.start = self.last = time.perf_counter()
+
+    def game(self, positions: int, outcome: int) -> None:
+        self.games += 1
+        self.positions += positions
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        now = time.perf_counter()
+        if now - self.last >= self.every or self.already + self.games == self.total:
+            self.last = now
+            self.log(self.line())
+
+    def summary(self) -> Dict:
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return {
+            "games": self.games,
+            "positions": self.positions,
+            "completed": self.already + self.games,
+            "total": self.total,
+            "seconds": round(elapsed, 3),
+            "games_per_hour": round(self.games * 3600.0 / elapsed, 1),
+            "positions_per_sec": round(self.positions / elapsed, 2),
+            "white_wins": self.outcomes.get(1, 0),
+            "draws": self.outcomes.get(0, 0),
+            "black_wins": self.outcomes.get(-1, 0),
+        }
+
+    def line(self) -> str:
+        s = self.summary()
+        return (f"[selfplay] {s['completed']}/{s['total']} games, {s['games_per_hour']:.0f} games/h, "
+                f"{s['positions_per_sec']:.1f} positions/s")
+
+
+# ------------------------------------------------------------
+# Orchestrator
+# ------------------------------------------------------------
+def run_selfplay(
+    checkpoint: str,
+    out_dir: str,
+    num_games: int,
+    workers: int = 2,
+    sims: int = 50,
+    max_moves: int = 200,
+    temperature: float = 1.0,
+    seed: int = 0,
+    book_path: Optional[str] = None,
+    model_kwargs: Optional[Dict] = None,
+    top_k: int = TOP_K,
+    report_every: float = 30.0,
+    log: Callable[[str], None] = print,
+) -> Dict:
+    """Play games 0..num_games-1 not yet in the shards of `out_dir`; returns a summary.
+
+    workers <= 1 plays in this process. The summary has games/positions
+    played by this run, games_per_hour, positions_per_sec, outcome counts,
+    `completed` (all stored games) and `interrupted`.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    done = completed_games(out_dir, top_k)
+    todo = [i for i in range(num_games) if i not in done]
+    progress = _Progress(num_games, num_games - len(todo), log, report_every)
+    if done:
+        log(f"[selfplay] resuming: {len(done)} games already in {out_dir}")
+    cfg = {"checkpoint": checkpoint, "out_dir": out_dir, "sims": sims, "max_moves": max_moves,
+           "temperature": temperature, "seed": seed, "book_path": book_path,
+           "model_kwargs": model_kwargs or {}, "top_k": top_k}
+    workers = max(1, min(workers, len(todo))) if todo else 1
+    interrupted = False
+
+    if not todo:
+        pass
+    elif workers <= 1:
+        stop = _InlineStop()
+        with _on_stop_signals(stop.set):
+            play_games(0, todo, cfg, _InlineEvents(progress), stop)
+        interrupted = stop.is_set()
+    else:
+        _load_model(cfg)  # a bad checkpoint (e.g. another input layout) fails here, not in every worker
+        interrupted = _run_pool(todo, workers, cfg, progress, log)
+
+    summary = progress.summary()
+    summary["interrupted"] = interrupted
+    log(progress.line() + (" (interrupted)" if interrupted else ""))
+    return summary
+
+
+def _run_pool(todo: List[int], workers: int, cfg: Dict, progress: _Progress,
+              log: Callable[[str], None]) -> bool:
+    import multiprocessing as mp
+
+    ctx = mp.get_context("spawn")
+    events = ctx.Queue()
+    stop = ctx.Event()
+    procs = []
+    for w in range(workers):
+        p = ctx.Process(target=_worker_main, args=(w, todo[w::workers], cfg, events, stop),
+                        name=f"selfplay-{w}")
+        p.start()
+        procs.append(p)
+
+    signals = [0]
+
+    def _on_signal():
+        signals[0] += 1
+        if signals[0] == 1:
+            log("[selfplay] stopping after the current games (signal again to abort)")
+            stop.set()
+        else:
+            for p in procs:
+                p.terminate()
+
+    running = dict(enumerate(procs))
+    with _on_stop_signals(_on_signal):
+        while running:
+            try:
+                msg = events.get(timeout=1.0)
+            except queue_mod.Empty:
+                for wid, p in list(running.items()):
+                    if not p.is_alive():
+                        if p.exitcode not in (0, None) and signals[0] < 2:
+                            log(f"[selfplay] worker {wid} exited with code {p.exitcode}")
+                        running.pop(wid)
+                continue
+            if msg[0] == "game":
+                progress.game(msg[3], msg[4])
+            elif msg[0] == "done":
+                running.pop(msg[1], None)
+    for p in procs:
+        p.join()
+    return stop.is_set()
+
+
+class _InlineStop:
+    def __init__(self):
+        self._set = False
+
+    def set(self) -> None:
+        self._set = True
+
+    def is_set(self) -> bool:
+        return self._set
+
+
+class _InlineEvents:
+    """Queue stand-in for workers=1: updates the progress directly."""
+
+    def __init__(self, progress: _Progress):
+        self.progress = progress
+
+    def put(self, msg) -> None:
+        if msg[0] == "game":
+            self.progress.game(msg[3], msg[4])
+
+
+class _on_stop_signals:
+    """Route SIGINT/SIGTERM to `handler` (main thread only) for the duration of a block."""
+
+    def __init__(self, handler: Callable[[], None]):
+        self.handler = handler
+        self.saved = {}
+
+    def __enter__(self):
+        try:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                self.saved[sig] = signal.signal(sig, lambda *_: self.handler())
+        except ValueError:
+            # not the main thread: signals stay with their current handlers
+            pass
+        return self
+
+    def __exit__(self, *exc):
+        for sig, old in self.saved.items():
+            signal.signal(sig, old)
+        return False
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Multi-process self-play into sharded game records")
+    p.add_argument("checkpoint")
+    p.add_argument("out_dir")
+    p.add_argument("--games", type=int, default=100)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--sims", type=int, default=50)
+    p.add_argument("--max-moves", type=int, default=200)
+    p.add_argument("--temperature", type=float, default=1.0)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--book", help="Polyglot .bin opening book")
+    p.add_argument("--channels", type=int, default=64)
+    p.add_argument("--blocks", type=int, default=6)
+    p.add_argument("--report-every", type=float, default=30.0, help="seconds between progress lines")
+    args = p.parse_args(argv)
+
+    summary = run_selfplay(args.checkpoint, args.out_dir, args.games, workers=args.workers, sims=args.sims,
+                           max_moves=args.max_moves, temperature=args.temperature, seed=args.seed,
+                           book_path=args.book, model_kwargs={"channels": args.channels, "blocks": args.blocks},
+                           report_every=args.report_every)
+    return 1 if summary["interrupted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
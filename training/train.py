@@ -6,7 +6,7 @@ import torch
 import torch.nn as nn
 from training.config import TrainConfig
 from training.model import make_model
-from training.replay_buffer import ReplayBuffer
+from training.replay_buffer import CompactReplayBuffer, ReplayBuffer
 from training.train_optimized import train_loop_with_grad_accum
 from training.metadata_utils import update_metadata
 
@@ -47,8 +47,11 @@ def main():
         action_size=cfg.action_size,
     )
 
-    # Load replay buffer
-    buffer = ReplayBuffer(cfg.replay_path, capacity=cfg.replay_capacity)
+    # Load replay buffer (.bin: memory-mapped compact records)
+    if cfg.replay_path.endswith('.bin'):
+        buffer = CompactReplayBuffer(cfg.replay_path, capacity=cfg.replay_capacity)
+    else:
+        buffer = ReplayBuffer(cfg.replay_path, capacity=cfg.replay_capacity)
     if len(buffer) == 0:
         print("[Warning] Replay buffer is empty. Add samples before training.")
 
@@ -9,6 +9,7 @@ import json
 import time
 from typing import Dict, Any, Optional
 from training.config import TrainConfig
+from training.encoder import INPUT_LAYOUT_VERSION, check_input_layout
 from training.replay_buffer import ReplayBuffer
 from training.batch_sampler import DynamicBatchSampler
 from .device import get_device
@@ -29,6 +30,7 @@ class CheckpointManager:
             'model_state_dict': model.state_dict(),
             'optimizer_state_dict': optimizer.state_dict(),
             'metrics': metrics or {},
+            'input_layout': INPUT_LAYOUT_VERSION,
         }
         if scaler is not None:
             ckpt['scaler_state_dict'] = scaler.state_dict()
@@ -59,7 +61,7 @@ class CheckpointManager:
         map_loc = device if device is not None else 'cpu'
         ckpt = torch.load(path, map_location=map_loc)
         
-        model.load_state_dict(ckpt['model_state_dict'])
+        model.load_state_dict(check_input_layout(ckpt, path))
         optimizer.load_state_dict(ckpt['optimizer_state_dict'])
         if scaler is not None and 'scaler_state_dict' in ckpt:
             scaler.load_state_dict(ckpt['scaler_state_dict'])
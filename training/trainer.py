@@ -7,6 +7,7 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import numpy as np
+from training.encoder import INPUT_LAYOUT_VERSION
 from training.replay_buffer import ReplayBuffer
 
 
@@ -33,25 +34,17 @@ def train_loop(model: nn.Module, buffer: ReplayBuffer, cfg: dict, device=None):
 
     best_win = -1.0
     for it in range(iters):
-        batch = buffer.sample(bsz)
-        if not batch:
-            continue
-        
-        # Handle both old format (state, pi, player, outcome) and new format (state, pi, player, step_reward, final_reward)
-        has_step_rewards = len(batch[0]) >= 5
-        
-        # fast tensor creation via numpy stacking
-        states = torch.tensor(np.array([b[0] for b in batch]), dtype=torch.float32, device=device)
-        pis = torch.tensor(np.array([b[1] for b in batch]), dtype=torch.float32, device=device)
-        
-        if has_step_rewards:
-            step_rewards = torch.tensor(np.array([b[3] for b in batch]), dtype=torch.float32, device=device)
-            final_rewards = torch.tensor(np.array([b[4] for b in batch]), dtype=torch.float32, device=device)
-            # Combine step and final rewards
+        if hasattr(buffer, 'sample_tensors'):
+            # compact buffer: decoded straight into batch tensors
+            states, pis, _, step_rewards, final_rewards = buffer.sample_tensors(bsz, device)
+            if len(states) == 0:
+                continue
             outcomes = weight_step_reward * step_rewards + weight_final_reward * final_rewards
         else:
-            # Fallback to old format (just final outcome)
-            outcomes = torch.tensor(np.array([b[3] for b in batch]), dtype=torch.float32, device=device)
+            batch = buffer.sample(bsz)
+            if not batch:
+                continue
+            states, pis, outcomes = _batch_tensors(batch, device, weight_step_reward, weight_final_reward)
 
         opt.zero_grad()
         pi_logits, v = model(states)
@@ -66,5 +59,25 @@ def train_loop(model: nn.Module, buffer: ReplayBuffer, cfg: dict, device=None):
     # checkpoint: latest + optional best promotion left to eval loop
     os.makedirs(cfg['ckpt_dir'], exist_ok=True)
     latest = os.path.join(cfg['ckpt_dir'], f"latest.pt")
-    torch.save(model.state_dict(), latest)
+    torch.save({'state_dict': model.state_dict(), 'input_layout': INPUT_LAYOUT_VERSION}, latest)
     return latest
+
+
+def _batch_tensors(batch, device, weight_step_reward, weight_final_reward):
+    """(states, pis, outcomes) tensors from a list of replay tuples."""
+    # Handle both old format (state, pi, player, outcome) and new format (state, pi, player, step_reward, final_reward)
+    has_step_rewards = len(batch[0]) >= 5
+
+    # fast tensor creation via numpy stacking
+    states = torch.tensor(np.array([b[0] for b in batch]), dtype=torch.float32, device=device)
+    pis = torch.tensor(np.array([b[1] for b in batch]), dtype=torch.float32, device=device)
+
+    if has_step_rewards:
+        step_rewards = torch.tensor(np.array([b[3] for b in batch]), dtype=torch.float32, device=device)
+        final_rewards = torch.tensor(np.array([b[4] for b in batch]), dtype=torch.float32, device=device)
+        # Combine step and final rewards
+        outcomes = weight_step_reward * step_rewards + weight_final_reward * final_rewards
+    else:
+        # Fallback to old format (just final outcome)
+        outcomes = torch.tensor(np.array([b[3] for b in batch]), dtype=torch.float32, device=device)
+    return states, pis, outcomes